@@ -0,0 +1,454 @@
+"""
+Module Balayage
+Balayages paramétriques à N dimensions des évaporateurs et cristalliseurs
+Auteur: Projet PIC 2024-2025
+"""
+
+import copy
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+import matplotlib.pyplot as plt
+from evaporateurs import EvaporateurMultiplesEffets
+from cristallisation import CristalliseurBatch, simuler_lot, dimensionner_cristalliseurs
+from optimisation import indicateurs_evaporateur
+from parallele import iterer_taches, nombre_workers, EchecTache
+from rendu import sauvegarder_figure
+from stockage import StockageResultats
+
+
+# Indicateurs calculés pour chaque point, par modèle
+INDICATEURS = {
+    'evaporateur': ('economie', 'surface_totale', 'vapeur_chauffe', 'vapeur_totale',
+                    'temperature_effet1'),
+    'cristalliseur': ('L_50', 'CV', 'volume', 'surface_serpentin',
+                      'puissance_agitation'),
+}
+
+
+def plan_experiences(parametres, methode='grille', n_points=10, graine=0):
+    """
+    Construit le plan d'expériences d'un balayage.
+    
+    Chaque paramètre est décrit par une liste de valeurs (grille uniquement)
+    ou par une plage (bas, haut) ou (bas, haut, 'log'). La grille complète
+    croise les valeurs de tous les paramètres (n_points valeurs par plage);
+    l'hypercube latin et Sobol tirent n_points points dans les plages.
+    
+    Args:
+        parametres (dict): Nom de l'attribut -> valeurs ou plage
+        methode (str): 'grille', 'lhs' (hypercube latin) ou 'sobol'
+        n_points (int): Valeurs par plage (grille) ou nombre de points (lhs, sobol)
+        graine (int): Graine du générateur (lhs, sobol)
+        
+    Returns:
+        pd.DataFrame: Un point par ligne, une colonne par paramètre
+    """
+    noms = list(parametres)
+    
+    if methode == 'grille':
+        axes = []
+        for nom in noms:
+            description = parametres[nom]
+            if isinstance(description, tuple):
+                bas, haut = description[:2]
+                if description[2:] == ('log',):
+                    axes.append(np.geomspace(bas, haut, n_points))
+                else:
+                    axes.append(np.linspace(bas, haut, n_points))
+            else:
+                axes.append(np.asarray(description))
+        return pd.DataFrame(list(itertools.product(*axes)), columns=noms)
+    
+    if methode == 'lhs':
+        generateur = qmc.LatinHypercube(d=len(noms), seed=graine)
+    elif methode == 'sobol':
+        generateur = qmc.Sobol(d=len(noms), scramble=True, seed=graine)
+    else:
+        raise ValueError(f"Méthode de plan inconnue: {methode}")
+    u = generateur.random(n_points)
+    
+    plan = {}
+    for k, nom in enumerate(noms):
+        description = parametres[nom]
+        if not isinstance(description, tuple):
+            raise ValueError(f"Plage (bas, haut) requise pour '{nom}' avec la méthode {methode}")
+        bas, haut = description[:2]
+        if description[2:] == ('log',):
+            plan[nom] = np.exp(np.log(bas) + u[:, k] * np.log(haut / bas))
+        else:
+            plan[nom] = bas + u[:, k] * (haut - bas)
+    return pd.DataFrame(plan)
+
+
+def _echec(erreur):
+    """Message d'échec d'un point."""
+    return f"{type(erreur).__name__}: {erreur}"
+
+
+def _evaluer_evaporateurs(tache):
+    """
+    Tâche de pool: évaporateurs d'un lot de points.
+    
+    Chaque point part de l'estimation initiale par défaut: le bilan
+    d'énergie du premier effet étant remplacé par une équation triviale, la
+    solution dépend de l'estimation initiale, et un démarrage à chaud depuis
+    le point voisin changerait les résultats.
+    
+    Args:
+        tache (tuple): (evaporateur nominal, noms, valeurs (n, len(noms)))
+        
+    Returns:
+        list: Un dictionnaire d'indicateurs (et 'erreur') par point
+    """
+    evaporateur, noms, valeurs = tache
+    resultats = []
+    for valeurs_point in valeurs:
+        configuration = dict(zip(noms, valeurs_point))
+        n_effets = int(configuration.pop('n_effets', evaporateur.n_effets))
+        evap = EvaporateurMultiplesEffets(n_effets=n_effets)
+        # Attributs scalaires de l'évaporateur nominal (tableaux dimensionnés par n_effets)
+        evap.__dict__.update({cle: valeur for cle, valeur in evaporateur.__dict__.items()
+                              if not isinstance(valeur, np.ndarray) and cle != 'n_effets'})
+        for nom, valeur in configuration.items():
+            setattr(evap, nom, valeur)
+        
+        try:
+            evap.resoudre_bilans()
+            resultat = indicateurs_evaporateur(evap)
+            resultat['erreur'] = None if evap.converge else "Convergence imparfaite"
+        except Exception as erreur:
+            resultat = dict.fromkeys(INDICATEURS['evaporateur'], np.nan)
+            resultat['erreur'] = _echec(erreur)
+        resultats.append(resultat)
+    return resultats
+
+
+def _evaluer_cristalliseurs(tache):
+    """
+    Tâche de pool: cristalliseurs d'un lot de points.
+    
+    Les points de même durée sont intégrés comme un seul système empilé
+    (simuler_lot); si le profil l'interdit ou si l'intégration empilée
+    échoue, chaque point est simulé individuellement.
+    
+    Args:
+        tache (tuple): (cristalliseur nominal, noms, valeurs (n, len(noms)), profil)
+        
+    Returns:
+        list: Un dictionnaire d'indicateurs (et 'erreur') par point
+    """
+    cristalliseur, noms, valeurs, profil = tache
+    n = len(valeurs)
+    colonnes = {nom: valeurs[:, k] for k, nom in enumerate(noms)}
+    L_50, CV = np.full(n, np.nan), np.full(n, np.nan)
+    erreurs = [None] * n
+    
+    autres = [nom for nom in noms if nom != 'duree']
+    durees = colonnes.get('duree', np.full(n, cristalliseur.duree))
+    for duree in np.unique(durees):
+        groupe = np.flatnonzero(durees == duree)
+        crist = copy.copy(cristalliseur)
+        crist.duree = duree
+        try:
+            L_50[groupe], CV[groupe] = simuler_lot(
+                crist, autres, np.column_stack([colonnes[nom][groupe] for nom in autres])
+                if autres else np.empty((len(groupe), 0)), profil)
+        except Exception:
+            # Intégration individuelle (profil dépendant de l'état, échec du lot)
+            for i in groupe:
+                crist_point = copy.copy(crist)
+                for nom in autres:
+                    setattr(crist_point, nom, colonnes[nom][i])
+                try:
+                    crist_point.simuler(profil=profil, n_points=2, methode='LSODA',
+                                        verbose=False)
+                    L_50[i], CV[i] = crist_point.L_50, crist_point.CV
+                except Exception as erreur:
+                    erreurs[i] = _echec(erreur)
+    
+    dims = dimensionner_cristalliseurs(
+        *(colonnes.get(nom, getattr(cristalliseur, nom))
+          for nom in ('masse_batch', 'duree', 'T_0', 'T_f')))
+    dims = {cle: np.broadcast_to(valeur, (n,)) for cle, valeur in dims.items()}
+    return [{'L_50': L_50[i], 'CV': CV[i], 'volume': dims['volume'][i],
+             'surface_serpentin': dims['surface_serpentin'][i],
+             'puissance_agitation': dims['puissance_agitation'][i],
+             'erreur': erreurs[i]}
+            for i in range(n)]
+
+
+class Balayage:
+    """
+    Balayage déclaratif des attributs d'un évaporateur ou d'un cristalliseur.
+    
+    Le plan d'expériences est découpé en lots répartis sur les workers; les
+    cristalliseurs d'un lot sont intégrés comme un seul système empilé.
+    Les résultats forment une table en colonnes (paramètres, indicateurs,
+    erreur) et sont disponibles lot par lot dès la fin de chaque lot. Avec
+    un stockage sur disque, chaque lot y est écrit dès sa fin et une
+    nouvelle exécution de la même étude ne recalcule que les points absents.
+    L'échec d'un lot entier (worker interrompu, erreur hors du calcul des
+    points) n'est pas stocké: ses points sont recalculés à l'exécution
+    suivante.
+    """
+    
+    def __init__(self, modele, parametres, methode='grille', n_points=10, graine=0,
+                 reference=None, profil='lineaire', taille_lot=None, n_workers=None,
+                 backend='processus', stockage=None, reessayer_echecs=False):
+        """
+        Initialisation.
+        
+        Args:
+            modele (str): 'evaporateur' ou 'cristalliseur'
+            parametres (dict): Attributs balayés (voir plan_experiences);
+                'n_effets' est accepté pour l'évaporateur
+            methode (str): 'grille', 'lhs' ou 'sobol'
+            n_points (int): Valeurs par plage (grille) ou nombre de points
+            graine (int): Graine du plan (lhs, sobol)
+            reference (object): Évaporateur ou cristalliseur nominal
+                (None: paramètres par défaut)
+            profil (str): Profil de refroidissement (cristalliseur)
+            taille_lot (int): Points par lot (None: selon le modèle et les workers)
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+            stockage (StockageResultats ou str): Stockage des résultats, ou
+                fichier SQLite (table 'balayage_<modele>'); None: en mémoire
+            reessayer_echecs (bool): Recalculer aussi les points stockés en
+                échec (colonne 'erreur' renseignée)
+        """
+        if modele not in INDICATEURS:
+            raise ValueError(f"Modèle inconnu: {modele} (choix: {', '.join(INDICATEURS)})")
+        self.modele = modele
+        self.parametres = parametres
+        self.plan = plan_experiences(parametres, methode, n_points, graine)
+        if reference is None:
+            reference = EvaporateurMultiplesEffets() if modele == 'evaporateur' \
+                else CristalliseurBatch()
+        self.reference = reference
+        self.profil = profil
+        self.n_workers = n_workers
+        self.backend = backend
+        self.reessayer_echecs = reessayer_echecs
+        
+        n = len(self.plan)
+        if taille_lot is None:
+            n_lots = 4 * nombre_workers(n_workers, n)
+            if modele == 'cristalliseur':
+                # Systèmes empilés: peu de lots, au plus 1000 points chacun
+                n_lots = max(nombre_workers(n_workers, n), int(np.ceil(n / 1000)))
+            taille_lot = max(1, int(np.ceil(n / n_lots)))
+        self.taille_lot = taille_lot
+        self.resultats = None
+        
+        if isinstance(stockage, str):
+            stockage = StockageResultats(stockage, table=f'balayage_{modele}')
+        self.stockage = stockage
+        if stockage is not None:
+            # Clé de chaque point: paramètres et réglages fixes de l'étude
+            contexte = self.contexte()
+            self.cles = [StockageResultats.cle(contexte, point)
+                         for point in self.plan.to_dict('records')]
+    
+    def contexte(self):
+        """
+        Description des réglages fixes de l'étude (modèle, profil, attributs
+        numériques du modèle nominal), incluse dans les clés du stockage.
+        
+        Les tableaux sont conservés tels quels: l'empreinte des clés les
+        hache par leur contenu complet.
+        
+        Returns:
+            tuple: (modèle, profil, attributs triés par nom)
+        """
+        attributs = sorted((nom, valeur) for nom, valeur in vars(self.reference).items()
+                           if isinstance(valeur, (int, float, str, np.ndarray))
+                           or valeur is None)
+        return (self.modele, self.profil, attributs)
+    
+    def taches(self, points=None):
+        """
+        Découpe le plan en tâches de pool.
+        
+        Args:
+            points (array): Numéros des points à calculer (None: tout le plan)
+            
+        Returns:
+            list: (indices des points, tâche) de chaque lot
+        """
+        noms = list(self.plan.columns)
+        valeurs = self.plan.to_numpy(dtype=float)
+        if points is None:
+            points = np.arange(len(valeurs))
+        taches = []
+        for debut in range(0, len(points), self.taille_lot):
+            indices = points[debut:debut + self.taille_lot]
+            if self.modele == 'evaporateur':
+                tache = (self.reference, noms, valeurs[indices])
+            else:
+                tache = (self.reference, noms, valeurs[indices], self.profil)
+            taches.append((indices, tache))
+        return taches
+    
+    def iterer(self):
+        """
+        Exécute le balayage et produit les résultats de chaque lot dès sa fin.
+        
+        Avec un stockage, seuls les points absents du stockage sont calculés
+        et chaque lot est écrit dès sa fin, sauf en cas d'échec du lot entier.
+        
+        Yields:
+            pd.DataFrame: Points du lot (index: numéro du point dans le plan)
+        """
+        lots = self.taches(self.points_restants())
+        fonction = _evaluer_evaporateurs if self.modele == 'evaporateur' \
+            else _evaluer_cristalliseurs
+        for k, resultats in iterer_taches(fonction, [tache for _, tache in lots],
+                                          n_workers=self.n_workers, backend=self.backend,
+                                          conserver_echecs=True):
+            indices = lots[k][0]
+            echec_lot = isinstance(resultats, EchecTache)
+            if echec_lot:
+                resultats = [dict(dict.fromkeys(INDICATEURS[self.modele], np.nan),
+                                  erreur=f"{resultats.type_erreur}: {resultats.message}")
+                             for _ in indices]
+            lot = pd.concat([self.plan.iloc[indices],
+                             pd.DataFrame(resultats, index=self.plan.index[indices])],
+                            axis=1)
+            if self.stockage is not None and not echec_lot:
+                self.stockage.ajouter(lot.assign(cle=[self.cles[i] for i in indices]))
+            yield lot
+    
+    def points_restants(self):
+        """
+        Numéros des points du plan à calculer.
+        
+        Returns:
+            np.array: Points absents du stockage, ou stockés en échec avec
+                reessayer_echecs (tout le plan sans stockage)
+        """
+        if self.stockage is None:
+            return np.arange(len(self.plan))
+        condition = ('erreur IS NULL' if self.reessayer_echecs
+                     and 'erreur' in self.stockage.colonnes else None)
+        presentes = self.stockage.cles_presentes(self.cles, condition=condition)
+        return np.array([i for i, cle in enumerate(self.cles) if cle not in presentes],
+                        dtype=int)
+    
+    def executer(self, rappel=None, verbose=True):
+        """
+        Exécute le balayage complet.
+        
+        Args:
+            rappel (callable): Fonction appelée avec le DataFrame de chaque lot
+                dès sa fin (affichage, enregistrement au fil de l'eau)
+            verbose (bool): Affichage de l'avancement
+            
+        Returns:
+            pd.DataFrame: Paramètres, indicateurs et erreur, un point par ligne
+                (dans l'ordre du plan; relue du stockage s'il y en a un, les
+                lots en échec non stockés venant de cette exécution)
+        """
+        n_restants = len(self.points_restants())
+        if verbose:
+            print(f"\nBalayage {self.modele} ({len(self.plan)} points, "
+                  f"{', '.join(self.plan.columns)}, lots de {self.taille_lot})...")
+            if self.stockage is not None:
+                print(f"  Stockage {self.stockage.fichier}: "
+                      f"{len(self.plan) - n_restants} points déjà calculés, "
+                      f"{n_restants} à calculer")
+        
+        debut = time.perf_counter()
+        lots = []
+        n_termines = 0
+        for lot in self.iterer():
+            lots.append(lot)
+            n_termines += len(lot)
+            if rappel is not None:
+                rappel(lot)
+            if verbose:
+                print(f"  {n_termines}/{n_restants} points "
+                      f"({time.perf_counter() - debut:.2f} s)")
+        
+        if self.stockage is not None:
+            stockes = self.stockage.lire_cles(self.cles)
+            colonnes = list(self.plan.columns) + list(INDICATEURS[self.modele]) + ['erreur']
+            resultats = stockes.reindex(self.cles)[colonnes].set_index(self.plan.index)
+            if lots:
+                resultats = resultats.combine_first(pd.concat(lots))[colonnes]
+            self.resultats = resultats.astype(self.plan.dtypes.to_dict())
+        else:
+            self.resultats = pd.concat(lots).sort_index()
+        self.temps_calcul = time.perf_counter() - debut
+        if verbose:
+            n_echecs = self.resultats['erreur'].notna().sum()
+            print(f"  Terminé en {self.temps_calcul:.2f} s, {n_echecs} point(s) en échec")
+        return self.resultats
+    
+    def tracer_resultats(self, indicateurs=None, titre_supplement=''):
+        """
+        Trace chaque indicateur en fonction de chaque paramètre balayé.
+        
+        Args:
+            indicateurs (list): Indicateurs tracés (None: tous ceux du modèle)
+            titre_supplement (str): Texte additionnel pour le titre
+        """
+        if self.resultats is None:
+            raise RuntimeError("Balayage non exécuté: appeler executer() d'abord")
+        indicateurs = list(indicateurs or INDICATEURS[self.modele])
+        noms = list(self.plan.columns)
+        
+        fig, axes = plt.subplots(len(indicateurs), len(noms),
+                                 figsize=(5 * len(noms), 3.5 * len(indicateurs)),
+                                 squeeze=False)
+        for i, indicateur in enumerate(indicateurs):
+            for j, nom in enumerate(noms):
+                ax = axes[i, j]
+                if len(noms) == 1:
+                    ax.plot(self.resultats[nom], self.resultats[indicateur], 'o-',
+                            linewidth=2, markersize=4)
+                else:
+                    autre = noms[1] if j == 0 else noms[0]
+                    points = ax.scatter(self.resultats[nom], self.resultats[indicateur],
+                                        c=self.resultats[autre], s=8, cmap='viridis')
+                    fig.colorbar(points, ax=ax, label=autre)
+                ax.set_xlabel(nom, fontsize=11)
+                ax.set_ylabel(indicateur, fontsize=11)
+                ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Balayage {self.modele} {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'balayage_{self.modele}_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module balayage ===")
+    
+    # Évaporateur: grille nombre d'effets x pression de vapeur (stockage sur
+    # disque: une nouvelle exécution ne recalcule que les points manquants)
+    balayage = Balayage('evaporateur', {'n_effets': [2, 3, 4, 5],
+                                        'P_vapeur': (2.5, 4.5)}, n_points=15,
+                        stockage='balayage.sqlite')
+    resultats = balayage.executer()
+    print("\n" + resultats.head(10).to_string())
+    balayage.tracer_resultats(titre_supplement='Effets x pression')
+    
+    # Cristalliseur: hypercube latin sur 4 attributs, intégration empilée
+    crist = CristalliseurBatch()
+    crist.C_0 = 88  # Sirop sursaturé en cours de refroidissement
+    crist.k_g = 1e-5
+    crist.E_g = 20000
+    balayage = Balayage('cristalliseur', {'k_g': (3e-6, 3e-5, 'log'),
+                                          'T_f': (30, 40),
+                                          'masse_semence': (0, 100),
+                                          'masse_batch': (3000, 8000)},
+                        methode='lhs', n_points=2000, reference=crist)
+    resultats = balayage.executer()
+    print("\n" + resultats.describe().T.to_string())
+    balayage.tracer_resultats(indicateurs=['L_50', 'CV', 'surface_serpentin'],
+                              titre_supplement='LHS')
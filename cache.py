@@ -0,0 +1,121 @@
+"""
+Module Cache
+Cache persistant des évaluations de modèle (fichier JSON Lines)
+Auteur: Projet PIC 2024-2025
+"""
+
+import os
+import json
+from parallele import executer_taches
+from reprise import signature
+
+
+class CacheEvaluations:
+    """
+    Cache des évaluations d'un modèle, indexé par les paramètres du point.
+    
+    Chaque évaluation est ajoutée en fin de fichier (une ligne JSON par
+    point) dès la fin de son lot: une étude interrompue reprend sans
+    répéter les appels au modèle déjà effectués.
+    """
+    
+    def __init__(self, fichier=None, contexte=''):
+        """
+        Initialisation et lecture du fichier de cache existant.
+        
+        Args:
+            fichier (str): Fichier .jsonl du cache (None: cache en mémoire)
+            contexte (str): Description des réglages fixes du modèle, incluse
+                dans les clés (un autre contexte ne réutilise pas le cache)
+        """
+        self.fichier = fichier
+        self.contexte = contexte
+        self.evaluations = {}
+        self.n_appels = 0
+        
+        if fichier is not None and os.path.exists(fichier):
+            with open(fichier, encoding='utf-8') as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        continue  # Dernière ligne tronquée par une interruption
+                    self.evaluations[entree['cle']] = entree['resultat']
+    
+    def cle(self, point):
+        """
+        Clé d'un point (empreinte du contexte et des paramètres).
+        
+        Args:
+            point (dict): Paramètres du point
+            
+        Returns:
+            str: Clé hexadécimale
+        """
+        return signature(self.contexte, *sorted((nom, float(valeur))
+                                                for nom, valeur in point.items()))
+    
+    def __len__(self):
+        return len(self.evaluations)
+    
+    def __contains__(self, point):
+        return self.cle(point) in self.evaluations
+    
+    def ajouter(self, point, resultat):
+        """
+        Enregistre l'évaluation d'un point.
+        
+        Args:
+            point (dict): Paramètres du point
+            resultat (dict): Résultats (valeurs sérialisables en JSON)
+        """
+        cle = self.cle(point)
+        self.evaluations[cle] = resultat
+        if self.fichier is not None:
+            with open(self.fichier, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'cle': cle, 'point': point, 'resultat': resultat}) + '\n')
+    
+    def evaluer(self, fonction, points, taille_lot=100, n_workers=None,
+                backend='processus', verbose=True):
+        """
+        Évalue une fonction sur des points, en n'appelant le modèle que pour
+        les points absents du cache.
+        
+        Les points manquants sont évalués par lots (executer_taches); le
+        cache est complété à la fin de chaque lot.
+        
+        Args:
+            fonction (callable): Modèle fonction(point) -> dict (niveau module
+                pour le backend 'processus')
+            points (list): Paramètres (dict) de chaque point
+            taille_lot (int): Points évalués entre deux écritures du cache
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+            verbose (bool): Affichage de l'avancement
+            
+        Returns:
+            list: Résultats, dans l'ordre des points
+        """
+        cles = [self.cle(point) for point in points]
+        manquants = {}
+        for cle, point in zip(cles, points):
+            if cle not in self.evaluations:
+                manquants.setdefault(cle, point)
+        manquants = list(manquants.values())
+        
+        if verbose:
+            print(f"  {len(points)} points: {len(points) - len(manquants)} en cache, "
+                  f"{len(manquants)} à évaluer")
+        
+        for debut in range(0, len(manquants), taille_lot):
+            lot = manquants[debut:debut + taille_lot]
+            resultats = executer_taches(fonction, lot, n_workers=n_workers,
+                                        backend=backend)
+            for point, resultat in zip(lot, resultats):
+                self.ajouter(point, resultat)
+            self.n_appels += len(lot)
+            if verbose:
+                print(f"  {min(debut + taille_lot, len(manquants))}/{len(manquants)} "
+                      f"points évalués")
+        
+        return [self.evaluations[cle] for cle in cles]
@@ -4,10 +4,17 @@ Modélisation de la cinétique de cristallisation et du bilan de population
 Auteur: Projet PIC 2024-2025
 """
 
+import time
+import copy
 import numpy as np
-from scipy.integrate import odeint
+from scipy import sparse
+from scipy.integrate import odeint, solve_ivp
 import matplotlib.pyplot as plt
 from thermodynamique import ProprietesThermodynamiques
+from parallele import executer_taches
+import noyaux_compiles
+import reprise
+from rendu import sauvegarder_figure
 
 
 class CristalliseurBatch:
@@ -28,11 +35,29 @@ class CristalliseurBatch:
         self.g = 1.5  # Ordre de croissance
         self.E_g = 45000  # J/mol - Énergie d'activation
         
+        # Croissance dépendant de la taille (ASL) et agglomération (QMOM)
+        self.gamma_croissance = 0.0  # 1/m - G(L) = G (1 + γL)^p
+        self.p_croissance = 0.5  # Exposant de la loi ASL
+        self.beta_agglomeration = 0.0  # m³/s - Noyau d'agglomération constant
+        self.n_noeuds = 3  # Nombre de nœuds de quadrature (2N moments)
+        
+        # Propriétés des cristaux
+        self.rho_cristaux = 1500  # kg/m³ - Masse volumique des cristaux
+        self.k_v = np.pi / 6  # Facteur de forme (sphères)
+        
         # Paramètres du procédé
         self.T_0 = 70  # °C - Température initiale
         self.T_f = 35  # °C - Température finale
         self.duree = 4 * 3600  # s - Durée de batch (4 heures)
         self.C_0 = 75  # g/100g - Concentration initiale
+        self.S_cible = 0.05  # Sursaturation visée (profil 'sursaturation_constante')
+        self.profil_impose = None  # (temps, T) interpolés pour le profil 'impose'
+        
+        # Semence (scalaires ou tableaux pour les balayages par lots)
+        self.masse_semence = 0.0  # kg - Masse de semence (0: germes seuls)
+        self.L_semence = 50e-6  # m - Taille moyenne m1/m0 (loi log-normale)
+        self.sigma_semence = 0.3  # Écart-type de ln L (loi log-normale)
+        self.histogramme_semence = None  # (L_bornes, nombres par classe): remplace la loi
         
         self.masse_batch = 5000  # kg - Masse de sirop
         self.V_cristalliseur = 0  # m³ - Volume (à calculer)
@@ -43,22 +68,28 @@ class CristalliseurBatch:
         self.concentration = None
         self.sursaturation = None
         self.moments = None
+        self.moments_qmom = None  # Moments m0..m(2N-1) du modèle QMOM
+        self.abscisses = None  # Nœuds de quadrature L_i(t)
+        self.poids = None  # Poids de quadrature w_i(t)
         self.L_50 = 0  # Taille moyenne finale
         self.CV = 0  # Coefficient de variation
+        self.statistiques = {}  # Statistiques du solveur (dernière simulation)
+        self.evenement = None  # Événement d'arrêt déclenché (dernière simulation)
+        self.solution_continue = None  # Sortie dense du solveur solve_ivp
+        self._echelle_log_continue = False
         
     def vitesse_nucleation(self, S, m_T):
         """
         Calcule le taux de nucléation.
         
         Args:
-            S (float): Sursaturation relative
-            m_T (float): Masse de cristaux suspendus (kg/m³)
+            S (float or array): Sursaturation relative
+            m_T (float or array): Masse de cristaux suspendus (kg/m³)
             
         Returns:
-            float: Taux de nucléation B (noyaux/(m³·s))
+            float: Taux de nucléation B (noyaux/(m³·s)), nul si S <= 0
         """
-        if S <= 0:
-            return 0
+        S = np.maximum(S, 0)
         B = self.k_b * (S ** self.b) * (m_T ** self.j)
         return B
     
@@ -67,19 +98,31 @@ class CristalliseurBatch:
         Calcule la vitesse de croissance linéaire.
         
         Args:
-            S (float): Sursaturation relative
-            T_K (float): Température en Kelvin
+            S (float or array): Sursaturation relative
+            T_K (float or array): Température en Kelvin
             
         Returns:
-            float: Vitesse de croissance G (m/s)
+            float: Vitesse de croissance G (m/s), nulle si S <= 0
         """
-        if S <= 0:
-            return 0
+        S = np.maximum(S, 0)
         
         terme_exp = np.exp(-self.E_g / (self.thermo.R * T_K))
         G = self.k_g * (S ** self.g) * terme_exp
         return G
     
+    def vitesse_croissance_taille(self, G, L):
+        """
+        Vitesse de croissance dépendant de la taille (loi ASL).
+        
+        Args:
+            G (float): Vitesse de croissance des noyaux (m/s)
+            L (array): Tailles (m)
+            
+        Returns:
+            np.array: Vitesse de croissance G(L) (m/s)
+        """
+        return G * (1 + self.gamma_croissance * L) ** self.p_croissance
+    
     def profil_temperature_lineaire(self, t):
         """
         Profil de température linéaire.
@@ -121,10 +164,91 @@ class CristalliseurBatch:
         """
         # Simplification: décroissance contrôlée
         # Dans une implémentation réelle, cela nécessiterait un contrôleur
+        # (voir le profil 'sursaturation_constante' pour la résolution exacte)
         progression = t / self.duree
         T = self.T_0 - (self.T_0 - self.T_f) * progression**0.8
         return T
     
+    def temperature_profil(self, t, profil='lineaire'):
+        """
+        Température imposée par le profil de refroidissement choisi.
+        
+        Args:
+            t (float): Temps en secondes
+            profil (str): Type de profil ('lineaire', 'exponentiel', 'optimal',
+                'impose')
+            
+        Returns:
+            float: Température en °C
+        """
+        if profil == 'lineaire':
+            return self.profil_temperature_lineaire(t)
+        elif profil == 'exponentiel':
+            return self.profil_temperature_exponentiel(t)
+        elif profil == 'impose':
+            temps, T = self.profil_impose
+            return np.interp(t, temps, T)
+        else:  # optimal
+            return self.profil_temperature_optimal(t)
+    
+    def temperature_sursaturation_constante(self, C):
+        """
+        Température maintenant la sursaturation cible S(C, T) = S_cible.
+        
+        Équation algébrique d'un système DAE d'indice 1 (∂S/∂T ≠ 0): elle est
+        résolue exactement par inversion de la solubilité à chaque évaluation,
+        la température restant bornée entre T_f et T_0.
+        
+        Args:
+            C (float or array): Concentration en g/100g solution
+            
+        Returns:
+            float or array: Température en °C
+        """
+        T_C = self.thermo.temperature_solubilite(C / (1 + self.S_cible),
+                                                 T_init=self.T_0)
+        if np.ndim(T_C):
+            return np.clip(T_C, self.T_f, self.T_0)
+        return min(max(T_C, self.T_f), self.T_0)
+    
+    def temperature_etat(self, t, C, profil='lineaire'):
+        """
+        Température à l'instant t pour l'état de concentration C.
+        
+        Args:
+            t (float or array): Temps en secondes
+            C (float or array): Concentration en g/100g solution
+            profil (str): Type de profil ('lineaire', 'exponentiel', 'optimal',
+                'sursaturation_constante')
+            
+        Returns:
+            float or array: Température en °C
+        """
+        if profil == 'sursaturation_constante':
+            return self.temperature_sursaturation_constante(C)
+        return self.temperature_profil(t, profil)
+    
+    def sensibilites_concentration(self, C, T_C, profil='lineaire'):
+        """
+        Dérivées de la sursaturation et de la température par rapport à C.
+        
+        Args:
+            C (float): Concentration en g/100g solution
+            T_C (float): Température en °C
+            profil (str): Type de profil de température
+            
+        Returns:
+            tuple: (dS/dC, dT/dC)
+        """
+        C_star = self.thermo.solubilite_saccharose(T_C)
+        dT_dC = 0.0
+        if (profil == 'sursaturation_constante' and self.T_f < T_C < self.T_0):
+            # Contrainte active: C* (1 + S_cible) = C
+            dT_dC = 1 / ((1 + self.S_cible) * self.thermo.derivee_solubilite(T_C))
+        dS_dC = (1 / C_star
+                 - C / C_star**2 * self.thermo.derivee_solubilite(T_C) * dT_dC)
+        return dS_dC, dT_dC
+    
     def equations_bilan_population(self, y, t, profil_temp='lineaire'):
         """
         Système d'équations différentielles pour le bilan de population.
@@ -137,15 +261,22 @@ class CristalliseurBatch:
         Returns:
             array: Dérivées [dm0/dt, dm1/dt, dm2/dt, dm3/dt, dC/dt]
         """
-        m0, m1, m2, m3, C = y
-        
         # Température selon le profil choisi
-        if profil_temp == 'lineaire':
-            T_C = self.profil_temperature_lineaire(t)
-        elif profil_temp == 'exponentiel':
-            T_C = self.profil_temperature_exponentiel(t)
-        else:  # optimal
-            T_C = self.profil_temperature_optimal(t)
+        T_C = self.temperature_etat(t, y[4], profil_temp)
+        return self.derivees_moments(y, T_C)
+    
+    def derivees_moments(self, y, T_C):
+        """
+        Dérivées du modèle des moments à température imposée.
+        
+        Args:
+            y (array): Vecteur d'état [m0, m1, m2, m3, C]
+            T_C (float): Température en °C
+            
+        Returns:
+            array: Dérivées [dm0/dt, dm1/dt, dm2/dt, dm3/dt, dC/dt]
+        """
+        m0, m1, m2, m3, C = y
         
         T_K = T_C + 273.15
         
@@ -153,7 +284,7 @@ class CristalliseurBatch:
         S = self.thermo.sursaturation_relative(C, T_C)
         
         # Masse volumique des cristaux (approximation)
-        rho_cristaux = 1500  # kg/m³
+        rho_cristaux = self.rho_cristaux
         m_T = m3 * rho_cristaux if m3 > 0 else 1e-6
         
         # Cinétiques
@@ -168,7 +299,7 @@ class CristalliseurBatch:
         
         # Bilan de matière sur le saccharose
         # Masse de cristaux formés
-        k_v = np.pi / 6  # Facteur de forme (sphères)
+        k_v = self.k_v  # Facteur de forme (sphères)
         masse_cristaux_kg = k_v * rho_cristaux * m3 * self.V_cristalliseur
         
         # Concentration en solution (simplification)
@@ -178,48 +309,599 @@ class CristalliseurBatch:
         
         return [dm0_dt, dm1_dt, dm2_dt, dm3_dt, dC_dt]
     
-    def simuler(self, profil='lineaire', n_points=1000):
+    def moments_semence(self, n_moments=4):
+        """
+        Moments de la semence par m³ de suspension.
+        
+        La forme de la distribution est soit un histogramme (densité constante
+        dans chaque classe, moments intégrés exactement), soit une loi
+        log-normale de taille moyenne L_semence et d'écart-type sigma_semence;
+        le nombre de cristaux est fixé par la masse de semence. Vectorisé sur
+        les attributs de semence fournis sous forme de tableaux.
+        
+        Args:
+            n_moments (int): Nombre de moments m0..m(n-1) (au moins 4)
+            
+        Returns:
+            np.array: Moments de la semence (..., n_moments)
+        """
+        k = np.arange(max(n_moments, 4))
+        if self.histogramme_semence is None:
+            L = np.asarray(self.L_semence, dtype=float)[..., np.newaxis]
+            sigma = np.asarray(self.sigma_semence, dtype=float)[..., np.newaxis]
+            mu = np.log(L) - 0.5 * sigma**2
+            forme = np.exp(k * mu + 0.5 * (k * sigma)**2)
+        else:
+            L_bornes, nombres = self.histogramme_semence
+            L_bornes = np.asarray(L_bornes, dtype=float)[:, np.newaxis]
+            nombres = np.asarray(nombres, dtype=float)
+            integrales = np.diff(L_bornes**(k + 1), axis=0) / ((k + 1) * np.diff(L_bornes, axis=0))
+            forme = (nombres @ integrales) / np.sum(nombres, axis=-1, keepdims=True)
+        
+        # Nombre de cristaux: m3 = masse / (k_v ρ_c V)
+        rho_sirop = 1300  # kg/m³ (approximation)
+        V = np.asarray(self.masse_batch, dtype=float)[..., np.newaxis] / rho_sirop
+        m3 = np.asarray(self.masse_semence, dtype=float)[..., np.newaxis] / (
+            self.k_v * self.rho_cristaux * V)
+        return (m3 / forme[..., 3:4] * forme)[..., :n_moments]
+    
+    def moments_initiaux(self):
+        """
+        Moments initiaux m0..m3 du modèle des moments: germes et semence.
+        
+        Returns:
+            np.array: Moments initiaux (..., 4)
+        """
+        germes = np.array([1e6, 1e-3, 1e-9, 1e-15])
+        return germes + self.moments_semence(4)
+    
+    def moments_initiaux_qmom(self):
+        """
+        Moments initiaux m0..m(2N-1) pour le modèle QMOM.
+        
+        Les germes suivent une loi log-normale (σ = 0.3) ayant le même nombre
+        (m0) et le même volume (m3) que l'état initial du modèle des moments;
+        la semence éventuelle s'y ajoute.
+        
+        Returns:
+            np.array: Moments initiaux
+        """
+        m0, m3 = 1e6, 1e-15
+        sigma = 0.3
+        mu = np.log(m3 / m0) / 3 - 1.5 * sigma**2
+        k = np.arange(2 * self.n_noeuds)
+        return m0 * np.exp(k * mu + 0.5 * (k * sigma)**2) + self.moments_semence(len(k))
+    
+    def equations_qmom(self, y, t, profil_temp='lineaire'):
+        """
+        Système QMOM: moments fermés par quadrature de Gauss.
+        
+        Permet une croissance dépendant de la taille et l'agglomération,
+        pour lesquelles les équations des moments ne sont pas fermées.
+        
+        Args:
+            y (array): Vecteur d'état [m0, ..., m(2N-1), C]
+            t (float): Temps
+            profil_temp (str): Type de profil de température
+            
+        Returns:
+            np.array: Dérivées [dm0/dt, ..., dm(2N-1)/dt, dC/dt]
+        """
+        moments = np.asarray(y[:-1])
+        C = y[-1]
+        k = np.arange(len(moments))
+        
+        T_C = self.temperature_etat(t, C, profil_temp)
+        T_K = T_C + 273.15
+        S = self.thermo.sursaturation_relative(C, T_C)
+        
+        m3 = moments[3]
+        m_T = m3 * self.rho_cristaux if m3 > 0 else 1e-6
+        B = self.vitesse_nucleation(S, m_T)
+        G = self.vitesse_croissance(S, T_K)
+        
+        L, w = quadrature_wheeler(moments)
+        L = np.maximum(L, 0)  # Nœud des noyaux (taille nulle) sans dérive négative
+        G_L = self.vitesse_croissance_taille(G, L)
+        
+        # Nucléation (taille nulle) et croissance: dm_k/dt = B δ_k0 + k Σ w_i L_i^(k-1) G(L_i)
+        L_puissances = L[np.newaxis, :] ** np.maximum(k - 1, 0)[:, np.newaxis]
+        dm_dt = k * (L_puissances @ (w * G_L))
+        dm_dt[0] += B
+        
+        # Agglomération (noyau constant): naissance - disparition
+        if self.beta_agglomeration > 0:
+            ww = np.outer(w, w) * self.beta_agglomeration
+            L3 = L[:, np.newaxis]**3 + L[np.newaxis, :]**3
+            naissance = 0.5 * np.einsum('ij,kij->k', ww,
+                                        L3[np.newaxis] ** (k[:, np.newaxis, np.newaxis] / 3))
+            disparition = (L[np.newaxis, :] ** k[:, np.newaxis]) @ ww.sum(axis=1)
+            dm_dt += naissance - disparition
+        
+        # Bilan de matière sur le saccharose (croissance seule: m3 conservé par agglomération)
+        dm3_croissance = 3 * np.sum(w * L**2 * G_L)
+        dC_dt = -self.k_v * self.rho_cristaux * dm3_croissance / self.masse_batch * 100
+        
+        return np.append(dm_dt, dC_dt)
+    
+    def jacobien_bilan_population(self, y, t, profil_temp='lineaire'):
+        """
+        Jacobien analytique du système du bilan de population.
+        
+        Args:
+            y (array): Vecteur d'état [m0, m1, m2, m3, C]
+            t (float): Temps
+            profil_temp (str): Type de profil de température
+            
+        Returns:
+            np.array: Matrice 5x5 des dérivées partielles ∂f_i/∂y_k
+        """
+        C = y[4]
+        T_C = self.temperature_etat(t, C, profil_temp)
+        J, dF_dT = self.jacobien_moments(y, T_C)
+        
+        # Température dépendant de l'état (profil à sursaturation constante)
+        dS_dC, dT_dC = self.sensibilites_concentration(C, T_C, profil_temp)
+        if dT_dC != 0:
+            J[:, 4] += dF_dT * dT_dC
+        
+        return J
+    
+    def jacobien_moments(self, y, T_C):
+        """
+        Jacobien analytique du modèle des moments à température imposée.
+        
+        Args:
+            y (array): Vecteur d'état [m0, m1, m2, m3, C]
+            T_C (float): Température en °C
+            
+        Returns:
+            tuple: (matrice 5x5 ∂f_i/∂y_k, vecteur ∂f_i/∂T)
+        """
+        m0, m1, m2, m3, C = y
+        T_K = T_C + 273.15
+        
+        C_star = self.thermo.solubilite_saccharose(T_C)
+        S = (C - C_star) / C_star
+        
+        m_T = m3 * self.rho_cristaux if m3 > 0 else 1e-6
+        
+        J = np.zeros((5, 5))
+        dF_dT = np.zeros(5)
+        G = self.vitesse_croissance(S, T_K)
+        
+        if S > 0:
+            # Dérivées des cinétiques par rapport à S, puis à C et T
+            dS_dC = 1 / C_star
+            dS_dT = -C / C_star**2 * self.thermo.derivee_solubilite(T_C)
+            terme_exp = np.exp(-self.E_g / (self.thermo.R * T_K))
+            dB_dS = self.k_b * self.b * S**(self.b - 1) * m_T**self.j
+            dG_dS = self.k_g * self.g * S**(self.g - 1) * terme_exp
+            dB_dm3 = 0
+            if m3 > 0:
+                B = self.vitesse_nucleation(S, m_T)
+                dB_dm3 = self.j * B / m3
+            
+            K = 3 * self.k_v * self.rho_cristaux / self.masse_batch * 100
+            
+            dG_dC = dG_dS * dS_dC
+            J[0, 3] = dB_dm3
+            J[0, 4] = dB_dS * dS_dC
+            J[1, 4] = m0 * dG_dC
+            J[2, 4] = 2 * m1 * dG_dC
+            J[3, 4] = 3 * m2 * dG_dC
+            J[4, 2] = -K * G
+            J[4, 4] = -K * m2 * dG_dC
+            
+            dG_dT = dG_dS * dS_dT + G * self.E_g / (self.thermo.R * T_K**2)
+            dF_dT[:] = [dB_dS * dS_dT, m0 * dG_dT, 2 * m1 * dG_dT,
+                        3 * m2 * dG_dT, -K * m2 * dG_dT]
+        
+        J[1, 0] = G
+        J[2, 1] = 2 * G
+        J[3, 2] = 3 * G
+        
+        return J, dF_dT
+    
+    # Les états d'essai du solveur peuvent dépasser exp(709): moments,
+    # cinétiques et jacobien y deviennent infinis ou NaN, ce qui fait rejeter
+    # le pas; les avertissements correspondants sont donc supprimés
+    @np.errstate(over='ignore', invalid='ignore')
+    def dynamique_logarithmique(self, etats, T_C):
+        """
+        Dynamique du modèle des moments en variables z = [ln m0..ln m3, C].
+        
+        Version vectorisée de derivees_moments / jacobien_moments sur un
+        ensemble de points. Les paramètres cinétiques (k_b, b, j, k_g, g,
+        E_g) peuvent être des tableaux diffusés contre les points.
+        
+        Args:
+            etats (array): États (..., 5)
+            T_C (array): Températures en °C (...)
+            
+        Returns:
+            tuple: (g (..., 5), ∂g/∂état (..., 5, 5), ∂g/∂T (..., 5))
+        """
+        thermo = self.thermo
+        m = np.exp(etats[..., :4])
+        C = etats[..., 4]
+        T_K = T_C + 273.15
+        
+        C_star = thermo.solubilite_saccharose(T_C)
+        S = (C - C_star) / C_star
+        actif = S > 0
+        S_pos = np.where(actif, S, 1.0)
+        
+        # Cinétiques (nulles en sous-saturation)
+        m_T = m[..., 3] * self.rho_cristaux
+        terme_exp = np.exp(-self.E_g / (thermo.R * T_K))
+        B = np.where(actif, self.k_b * S_pos**self.b * m_T**self.j, 0)
+        G = np.where(actif, self.k_g * S_pos**self.g * terme_exp, 0)
+        dB_dS = np.where(actif, self.b * B / S_pos, 0)
+        dG_dS = np.where(actif, self.g * G / S_pos, 0)
+        dS_dC = 1 / C_star
+        dS_dT = -C / C_star**2 * thermo.derivee_solubilite(T_C)
+        dG_dT = dG_dS * dS_dT + G * self.E_g / (thermo.R * T_K**2)
+        
+        K = 3 * self.k_v * self.rho_cristaux / self.masse_batch * 100
+        f = np.stack([B, G * m[..., 0], 2 * G * m[..., 1], 3 * G * m[..., 2],
+                      -K * G * m[..., 2]], axis=-1)
+        
+        J = np.zeros(etats.shape + (5,))
+        J[..., 0, 3] = self.j * B / m[..., 3]
+        J[..., 0, 4] = dB_dS * dS_dC
+        J[..., 1, 0] = G
+        J[..., 1, 4] = m[..., 0] * dG_dS * dS_dC
+        J[..., 2, 1] = 2 * G
+        J[..., 2, 4] = 2 * m[..., 1] * dG_dS * dS_dC
+        J[..., 3, 2] = 3 * G
+        J[..., 3, 4] = 3 * m[..., 2] * dG_dS * dS_dC
+        J[..., 4, 2] = -K * G
+        J[..., 4, 4] = -K * m[..., 2] * dG_dS * dS_dC
+        dF_dT = np.stack([dB_dS * dS_dT, m[..., 0] * dG_dT, 2 * m[..., 1] * dG_dT,
+                          3 * m[..., 2] * dG_dT, -K * m[..., 2] * dG_dT], axis=-1)
+        
+        # Changement de variables m_k = exp(z_k)
+        echelle = np.concatenate([m, np.ones(C.shape + (1,))], axis=-1)
+        g = f / echelle
+        J_etat = J * echelle[..., None, :] / echelle[..., :, None]
+        diagonale = np.arange(4)
+        J_etat[..., diagonale, diagonale] -= g[..., :4]
+        return g, J_etat, dF_dT / echelle
+    
+    def _second_membre_ivp(self, t, z, equations, profil, echelle_log):
+        """
+        Second membre au format solve_ivp, en variables linéaires ou logarithmiques.
+        
+        Args:
+            t (float): Temps
+            z (array): État [m0, ..., C] ou [ln m0, ..., C]
+            equations (callable): Système d'équations f(y, t, profil)
+            profil (str): Type de profil de température
+            echelle_log (bool): Moments représentés par leur logarithme
+            
+        Returns:
+            np.array: Dérivées de l'état
+        """
+        if not echelle_log:
+            return np.asarray(equations(z, t, profil))
+        
+        m = np.exp(z[:-1])
+        y = np.append(m, z[-1])
+        dy = np.asarray(equations(y, t, profil))
+        dy[:-1] /= m  # d(ln m)/dt = (dm/dt) / m
+        return dy
+    
+    def _jacobien_ivp(self, t, z, equations, profil, echelle_log):
+        """
+        Jacobien au format solve_ivp, en variables linéaires ou logarithmiques.
+        
+        Args:
+            t (float): Temps
+            z (array): État [m0, m1, m2, m3, C] ou [ln m0, ..., ln m3, C]
+            equations (callable): Système d'équations (modèle des moments)
+            profil (str): Type de profil de température
+            echelle_log (bool): Moments représentés par leur logarithme
+            
+        Returns:
+            np.array: Matrice 5x5 du jacobien
+        """
+        if not echelle_log:
+            return self.jacobien_bilan_population(z, t, profil)
+        
+        # Changement de variables z = ln m : J_z = D⁻¹ J D - diag(f/m)
+        echelle = np.append(np.exp(z[:4]), 1.0)
+        y = np.append(echelle[:4], z[4])
+        J = self.jacobien_bilan_population(y, t, profil)
+        f = np.asarray(equations(y, t, profil))
+        
+        J_z = J * echelle[np.newaxis, :] / echelle[:, np.newaxis]
+        J_z[np.arange(4), np.arange(4)] -= f[:4] / echelle[:4]
+        return J_z
+    
+    def evenements_arret(self, profil, echelle_log, S_min=None, m3_cible=None,
+                         arret_T_f=False):
+        """
+        Fonctions d'événements terminaux pour solve_ivp.
+        
+        Args:
+            profil (str): Type de profil de température
+            echelle_log (bool): Moments représentés par leur logarithme
+            S_min (float): Arrêt quand la sursaturation descend sous S_min
+            m3_cible (float): Arrêt quand m3 atteint m3_cible (rendement visé)
+            arret_T_f (bool): Arrêt quand la température atteint T_f avant la
+                fin du batch (profils 'impose' et 'sursaturation_constante')
+            
+        Returns:
+            tuple: (liste des fonctions d'événement, liste de leurs noms)
+            
+        Raises:
+            ValueError: arret_T_f ne peut pas arrêter la simulation (profil
+                atteignant T_f à t = duree ou jamais, comme 'lineaire',
+                'exponentiel' et 'optimal', ou température initiale déjà à T_f)
+        """
+        evenements, noms = [], []
+        
+        if S_min is not None:
+            def sursaturation_minimale(t, z, *args):
+                T_C = self.temperature_etat(t, z[-1], profil)
+                return self.thermo.sursaturation_relative(z[-1], T_C) - S_min
+            sursaturation_minimale.direction = -1
+            evenements.append(sursaturation_minimale)
+            noms.append('sursaturation_minimale')
+        
+        if m3_cible is not None:
+            def rendement_atteint(t, z, *args):
+                if echelle_log:
+                    return z[3] - np.log(m3_cible)
+                return z[3] - m3_cible
+            rendement_atteint.direction = 1
+            evenements.append(rendement_atteint)
+            noms.append('rendement_atteint')
+        
+        if arret_T_f:
+            # Les profils en fonction du temps sont vérifiés sur [0, duree[;
+            # 'sursaturation_constante' n'atteint T_f (butée) qu'en cours de
+            # simulation, selon la désursaturation
+            if profil != 'sursaturation_constante':
+                temps = np.linspace(0, self.duree, 1001)[:-1]
+                if profil == 'impose':
+                    temps = np.r_[temps, self.profil_impose[0][self.profil_impose[0] < self.duree]]
+                if not np.any(self.temperature_profil(temps, profil) <= self.T_f):
+                    raise ValueError(f"Le profil '{profil}' n'atteint T_f qu'en fin de batch "
+                                     f"ou jamais: arret_T_f sans effet (profils 'impose' "
+                                     f"ou 'sursaturation_constante')")
+            if self.temperature_etat(0.0, self.C_0, profil) <= self.T_f:
+                raise ValueError("Température initiale déjà à T_f: arret_T_f "
+                                 "arrêterait la simulation à t = 0")
+            
+            def temperature_finale(t, z, *args):
+                return self.temperature_etat(t, z[-1], profil) - self.T_f
+            temperature_finale.direction = -1
+            evenements.append(temperature_finale)
+            noms.append('temperature_finale')
+        
+        for evenement in evenements:
+            evenement.terminal = True
+        return evenements, noms
+    
+    def interpoler(self, temps):
+        """
+        États de la dernière simulation sur une grille de temps quelconque.
+        
+        Utilise la sortie dense du solveur solve_ivp, sans nouvelle intégration.
+        
+        Args:
+            temps (array): Temps en secondes (dans l'intervalle simulé)
+            
+        Returns:
+            tuple: (moments (n, nombre de moments), concentration (n,))
+        """
+        if self.solution_continue is None:
+            raise ValueError("Sortie dense disponible uniquement après une "
+                             "simulation solve_ivp (LSODA, BDF, Radau)")
+        
+        solution = self.solution_continue(np.atleast_1d(temps)).T
+        if self._echelle_log_continue:
+            solution[:, :-1] = np.exp(solution[:, :-1])
+        return solution[:, :-1], solution[:, -1]
+    
+    def simuler(self, profil='lineaire', n_points=1000, methode='odeint',
+                echelle_log=False, modele='moments', S_min=None, m3_cible=None,
+                arret_T_f=False, noyau='auto', fichier_reprise=None,
+                intervalle_reprise=1800, temps_calcul_max=None, verbose=True):
         """
         Simule la cristallisation batch.
         
         Args:
-            profil (str): Type de profil ('lineaire', 'exponentiel', 'optimal')
-            n_points (int): Nombre de points de temps
+            profil (str): Type de profil ('lineaire', 'exponentiel', 'optimal',
+                'sursaturation_constante')
+            n_points (int): Nombre de points de temps (None: pas du solveur
+                solve_ivp uniquement; voir interpoler pour une autre grille)
+            methode (str): Intégrateur ('odeint', ou méthode solve_ivp
+                'LSODA', 'BDF', 'Radau')
+            echelle_log (bool): Intégrer les moments en échelle logarithmique
+                (méthodes solve_ivp, modèle des moments uniquement)
+            modele (str): 'moments' (croissance indépendante de la taille) ou
+                'qmom' (quadrature, croissance ASL et agglomération)
+            S_min (float): Arrêt anticipé quand S descend sous S_min
+            m3_cible (float): Arrêt anticipé quand m3 atteint m3_cible
+            arret_T_f (bool): Arrêt anticipé quand la température atteint T_f
+                (profils 'impose' et 'sursaturation_constante'; voir
+                evenements_arret)
+            noyau (str): Second membre et jacobien du modèle des moments:
+                'compile' (noyaux Numba de noyaux_compiles), 'python'
+                (méthodes de la classe) ou 'auto' (compilé si Numba est disponible)
+            fichier_reprise (str): Point de reprise (.npz) écrit après chaque
+                segment de intervalle_reprise secondes simulées; une simulation
+                interrompue reprend au dernier segment (méthodes solve_ivp)
+            intervalle_reprise (float): Durée simulée entre deux points de reprise (s)
+            temps_calcul_max (float): Interruption volontaire une fois ce temps
+                de calcul dépassé (s), à reprendre par un nouvel appel
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            bool: True si la simulation est terminée (False si interrompue)
         """
-        print(f"\nSimulation avec profil {profil}...")
+        if verbose:
+            print(f"\nSimulation avec profil {profil}...")
         
         # Estimation du volume du cristalliseur
         rho_sirop = 1300  # kg/m³ (approximation)
         self.V_cristalliseur = self.masse_batch / rho_sirop
         
-        # Temps
-        self.temps = np.linspace(0, self.duree, n_points)
-        
         # Conditions initiales [m0, m1, m2, m3, C]
         # On commence avec quelques germes
-        y0 = [1e6, 1e-3, 1e-9, 1e-15, self.C_0]
+        if modele == 'qmom':
+            if echelle_log:
+                raise ValueError("L'échelle logarithmique requiert le jacobien "
+                                 "analytique du modèle des moments")
+            y0 = list(self.moments_initiaux_qmom()) + [self.C_0]
+            equations = self.equations_qmom
+            jacobien = None  # Différences finies (pas de jacobien analytique)
+        elif modele == 'moments':
+            y0 = list(self.moments_initiaux()) + [self.C_0]
+            equations = self.equations_bilan_population
+            jacobien = self._jacobien_ivp
+        else:
+            raise ValueError(f"Modèle inconnu: {modele}")
+        
+        if noyau not in ('auto', 'compile', 'python'):
+            raise ValueError(f"Noyau inconnu: {noyau}")
+        noyau_compile = modele == 'moments' and (
+            noyau == 'compile' or (noyau == 'auto' and noyaux_compiles.NUMBA_DISPONIBLE))
+        
+        evenements, noms_evenements = self.evenements_arret(
+            profil, echelle_log, S_min, m3_cible, arret_T_f
+        )
+        self.evenement = None
+        self.solution_continue = None
         
         # Résolution
-        solution = odeint(self.equations_bilan_population, y0, self.temps,
-                         args=(profil,), rtol=1e-6, atol=1e-8)
+        debut = time.perf_counter()
+        if fichier_reprise is not None and (methode == 'odeint' or evenements
+                                            or n_points is None):
+            raise ValueError("Les points de reprise requièrent une méthode solve_ivp, "
+                             "une grille fixe et aucun événement d'arrêt")
+        if methode == 'odeint':
+            if evenements or n_points is None:
+                raise ValueError("Événements et grille adaptative requièrent "
+                                 "une méthode solve_ivp")
+            self.temps = np.linspace(0, self.duree, n_points)
+            if noyau_compile:
+                fonction = noyaux_compiles.derivees_odeint
+                arguments = noyaux_compiles.arguments_noyau(self, profil)[:-1]
+            else:
+                fonction, arguments = equations, (profil,)
+            solution, info = odeint(fonction, y0,
+                                    self.temps, args=arguments, rtol=1e-6,
+                                    atol=1e-8, full_output=True)
+            self.statistiques = {
+                'methode': methode,
+                'n_evaluations': int(info['nfe'][-1]),
+                'n_jacobiens': int(info['nje'][-1]),
+                'n_pas': int(info['nst'][-1]),
+            }
+        elif methode in ('LSODA', 'BDF', 'Radau'):
+            if echelle_log:
+                z0 = np.append(np.log(y0[:-1]), y0[-1])
+                atol = 1e-8
+            else:
+                # Tolérances absolues à l'échelle de chaque moment
+                z0 = np.array(y0, dtype=float)
+                atol = 1e-8 * np.abs(z0)
+            
+            if noyau_compile:
+                fonction, jacobien = noyaux_compiles.derivees, noyaux_compiles.jacobien
+                arguments = noyaux_compiles.arguments_noyau(self, profil, echelle_log)
+            else:
+                fonction = self._second_membre_ivp
+                arguments = (equations, profil, echelle_log)
+            if fichier_reprise is not None:
+                self.temps = np.linspace(0, self.duree, n_points)
+                empreinte = reprise.signature(
+                    noyaux_compiles.parametres_noyau(self), z0, self.temps, profil,
+                    methode, echelle_log, modele, self.profil_impose,
+                    self.gamma_croissance, self.p_croissance, self.beta_agglomeration,
+                    intervalle_reprise)
+                segments = reprise.integrer_par_segments(
+                    fonction, (0, self.duree), z0, self.temps, methode,
+                    fichier_reprise, intervalle_reprise, empreinte, jac=jacobien,
+                    args=arguments, rtol=1e-6, atol=atol,
+                    temps_calcul_max=temps_calcul_max)
+                self.statistiques = {
+                    'methode': methode,
+                    'n_evaluations': segments['n_evaluations'],
+                    'n_jacobiens': segments['n_jacobiens'],
+                    'n_pas': segments['n_pas'],
+                }
+                if not segments['termine']:
+                    self.statistiques['temps_calcul'] = time.perf_counter() - debut
+                    if verbose:
+                        print(f"  Interrompue à {segments['t']/3600:.2f} h "
+                              f"(reprise: {fichier_reprise})")
+                    return False
+                solution = segments['solution']
+                if echelle_log:
+                    solution[:, :-1] = np.exp(solution[:, :-1])
+            else:
+                # Pas d'essai rejetés: dépassements possibles dans la norme d'erreur
+                with np.errstate(over='ignore', invalid='ignore'):
+                    sol = solve_ivp(fonction, (0, self.duree), z0,
+                                    method=methode, jac=jacobien,
+                                    args=arguments, rtol=1e-6,
+                                    atol=atol, dense_output=True,
+                                    events=evenements or None)
+                if not sol.success:
+                    raise RuntimeError(f"Échec de l'intégration ({methode}): "
+                                       f"{sol.message}")
+            
+                if sol.status == 1 and sol.t[-1] < self.duree:
+                    for nom, t_evenement in zip(noms_evenements, sol.t_events):
+                        if len(t_evenement) > 0:
+                            self.evenement = nom
+                self.solution_continue = sol.sol
+                self._echelle_log_continue = echelle_log
+            
+                # Grille régulière jusqu'à l'arrêt, ou pas du solveur
+                if n_points is None:
+                    self.temps = sol.t
+                else:
+                    self.temps = np.linspace(0, sol.t[-1], n_points)
+                solution = sol.sol(self.temps).T
+                if echelle_log:
+                    solution[:, :-1] = np.exp(solution[:, :-1])
+            
+                self.statistiques = {
+                    'methode': methode,
+                    'n_evaluations': int(sol.nfev),
+                    'n_jacobiens': int(sol.njev),
+                    'n_pas': len(sol.t) - 1,
+                }
+        else:
+            raise ValueError(f"Méthode d'intégration inconnue: {methode}")
+        self.statistiques['temps_calcul'] = time.perf_counter() - debut
+        self.statistiques['noyau'] = 'compile' if noyau_compile else 'python'
         
-        self.moments = solution[:, :-1]
+        self.moments = solution[:, :4]
         self.concentration = solution[:, -1]
+        if modele == 'qmom':
+            self.moments_qmom = solution[:, :-1]
+            self.abscisses, self.poids = quadrature_wheeler(self.moments_qmom)
         
-        # Calcul de la température et sursaturation
-        self.temperature = np.zeros(n_points)
-        self.sursaturation = np.zeros(n_points)
+        # Calcul de la température et sursaturation (vectorisé sur la grille)
+        self.temperature = np.broadcast_to(
+            self.temperature_etat(self.temps, self.concentration, profil),
+            self.temps.shape).astype(float)
+        self.sursaturation = self.thermo.sursaturation_relative(self.concentration,
+                                                                self.temperature)
         
-        for i, t in enumerate(self.temps):
-            if profil == 'lineaire':
-                self.temperature[i] = self.profil_temperature_lineaire(t)
-            elif profil == 'exponentiel':
-                self.temperature[i] = self.profil_temperature_exponentiel(t)
-            else:
-                self.temperature[i] = self.profil_temperature_optimal(t)
-            
-            self.sursaturation[i] = self.thermo.sursaturation_relative(
-                self.concentration[i], self.temperature[i]
+        if profil == 'sursaturation_constante':
+            # Respect de la contrainte algébrique hors des butées T_f / T_0
+            actif = (self.temperature > self.T_f) & (self.temperature < self.T_0)
+            self.statistiques['ecart_sursaturation'] = (
+                np.max(np.abs(self.sursaturation[actif] - self.S_cible))
+                if np.any(actif) else 0.0
             )
         
         # Calcul des caractéristiques finales
@@ -239,9 +921,21 @@ class CristalliseurBatch:
             else:
                 self.CV = 0
         
-        print(f"  Taille moyenne L50: {self.L_50*1e6:.1f} µm")
-        print(f"  Coefficient de variation CV: {self.CV:.1f}%")
-        print(f"  Concentration finale: {self.concentration[-1]:.2f} g/100g")
+        if verbose:
+            print(f"  Taille moyenne L50: {self.L_50*1e6:.1f} µm")
+            print(f"  Coefficient de variation CV: {self.CV:.1f}%")
+            print(f"  Concentration finale: {self.concentration[-1]:.2f} g/100g")
+            print(f"  Solveur {methode}: {self.statistiques['n_evaluations']} "
+                  f"évaluations, {self.statistiques['n_pas']} pas, "
+                  f"{self.statistiques['temps_calcul']*1000:.1f} ms")
+            if self.evenement is not None:
+                print(f"  Arrêt anticipé ({self.evenement}) à "
+                      f"{self.temps[-1]/3600:.2f} h")
+            if 'ecart_sursaturation' in self.statistiques:
+                print(f"  Écart max à S_cible: "
+                      f"{self.statistiques['ecart_sursaturation']:.2e}")
+        
+        return True
     
     def tracer_resultats(self, titre_supplement=''):
         """
@@ -299,71 +993,375 @@ class CristalliseurBatch:
         plt.tight_layout()
         
         nom_fichier = f'cristallisation_{titre_supplement.replace(" ", "_")}.png'
-        plt.savefig(nom_fichier, dpi=300, bbox_inches='tight')
-        print(f"\nGraphique sauvegardé: {nom_fichier}")
+        sauvegarder_figure(fig, nom_fichier)
     
     def dimensionnement(self):
         """
         Dimensionne le cristalliseur.
+        
+        Returns:
+            dict: Dimensions (voir dimensionner_cristalliseurs)
         """
         print("\n=== DIMENSIONNEMENT DU CRISTALLISEUR ===")
+        dims = dimensionner_cristalliseurs(self.masse_batch, self.duree, self.T_0, self.T_f)
+        print(f"Volume requis: {dims['volume']:.2f} m³")
+        print(f"Diamètre: {dims['diametre']:.2f} m")
+        print(f"Hauteur: {dims['hauteur']:.2f} m")
+        print(f"Puissance d'agitation: {dims['puissance_agitation']:.1f} kW")
+        print(f"Surface serpentin de refroidissement: {dims['surface_serpentin']:.2f} m²")
+        print(f"Temps de résidence: {dims['temps_residence']:.1f} h")
+        return {cle: float(dims[cle]) for cle in
+                ('volume', 'diametre', 'hauteur', 'puissance_agitation', 'surface_serpentin')}
+
+
+def dimensionner_cristalliseurs(masse_batch, duree, T_0, T_f, H_sur_D=1.5,
+                                vitesse_agitation=60, delta_T_ml=15, U_serpentin=500,
+                                rho_sirop=1300, cp_sirop=2300, Np=5):
+    """
+    Dimensionne des cristalliseurs batch (cuves cylindriques agitées à serpentin).
+    
+    Sans effet de bord et vectorisé: les arguments sont des scalaires ou des
+    tableaux diffusables (broadcasting), par exemple un plan de 100 000
+    cuves candidates dimensionné en une seule passe.
+    
+    Args:
+        masse_batch (float or array): Masse de sirop par batch (kg)
+        duree (float or array): Durée du batch (s)
+        T_0 (float or array): Température initiale (°C)
+        T_f (float or array): Température finale (°C)
+        H_sur_D (float or array): Rapport hauteur / diamètre
+        vitesse_agitation (float or array): Vitesse de l'agitateur (tr/min)
+        delta_T_ml (float or array): Écart de température moyen logarithmique (K)
+        U_serpentin (float or array): Coefficient de transfert du serpentin (W/(m²·K))
+        rho_sirop (float): Masse volumique du sirop (kg/m³)
+        cp_sirop (float): Capacité thermique du sirop (J/(kg·K))
+        Np (float): Nombre de puissance de l'agitateur
         
-        # Volume
-        rho_sirop = 1300  # kg/m³
-        V = self.masse_batch / rho_sirop
-        print(f"Volume requis: {V:.2f} m³")
-        
-        # Dimensions (cylindrique avec H/D = 1.5)
-        H_sur_D = 1.5
-        D = (4 * V / (np.pi * H_sur_D)) ** (1/3)
-        H = H_sur_D * D
-        print(f"Diamètre: {D:.2f} m")
-        print(f"Hauteur: {H:.2f} m")
-        
-        # Puissance d'agitation (corrélation empirique)
-        N = 60 / 60  # 60 rpm en Hz
-        D_agitateur = D / 3  # Diamètre agitateur = D/3
-        Np = 5  # Nombre de puissance (estimation)
-        rho = 1300  # kg/m³
-        P_agitation = Np * rho * N**3 * D_agitateur**5
-        print(f"Puissance d'agitation: {P_agitation/1000:.1f} kW")
-        
-        # Serpentin de refroidissement
-        Q_refroidissement = self.masse_batch * 2300 * (self.T_0 - self.T_f) / self.duree  # W
-        U_serpentin = 500  # W/(m²·K) - Coefficient de transfert
-        delta_T_ml = 15  # K - Différence de température moyenne logarithmique
-        A_serpentin = Q_refroidissement / (U_serpentin * delta_T_ml)
-        print(f"Surface serpentin de refroidissement: {A_serpentin:.2f} m²")
-        
-        # Temps de résidence
-        tau = self.duree / 3600  # heures
-        print(f"Temps de résidence: {tau:.1f} h")
-        
-        return {
-            'volume': V,
-            'diametre': D,
-            'hauteur': H,
-            'puissance_agitation': P_agitation/1000,
-            'surface_serpentin': A_serpentin
+    Returns:
+        dict: Colonnes de même forme: 'volume' (m³), 'diametre' (m),
+            'hauteur' (m), 'puissance_agitation' (kW), 'surface_serpentin' (m²),
+            'temps_residence' (h)
+    """
+    masse_batch, duree, T_0, T_f, H_sur_D, vitesse_agitation, delta_T_ml, U_serpentin = \
+        np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (
+            masse_batch, duree, T_0, T_f, H_sur_D, vitesse_agitation, delta_T_ml,
+            U_serpentin)))
+    
+    # Volume et dimensions de la cuve cylindrique
+    V = masse_batch / rho_sirop
+    D = (4 * V / (np.pi * H_sur_D)) ** (1/3)
+    H = H_sur_D * D
+    
+    # Puissance d'agitation (agitateur de diamètre D/3)
+    N = vitesse_agitation / 60  # Hz
+    P_agitation = Np * rho_sirop * N**3 * (D / 3)**5
+    
+    # Serpentin de refroidissement
+    Q_refroidissement = masse_batch * cp_sirop * (T_0 - T_f) / duree  # W
+    A_serpentin = Q_refroidissement / (U_serpentin * delta_T_ml)
+    
+    return {
+        'volume': V,
+        'diametre': D,
+        'hauteur': H,
+        'puissance_agitation': P_agitation / 1000,
+        'surface_serpentin': A_serpentin,
+        'temps_residence': duree / 3600,
+    }
+
+
+def quadrature_wheeler(moments):
+    """
+    Quadrature de Gauss d'une distribution à partir de ses moments (algorithme de Wheeler).
+    
+    Vectorisé sur les dimensions de tête: une série temporelle de moments
+    (n_temps, 2N) est inversée en une seule passe. Les tailles sont
+    normalisées par m1/m0 pour limiter le mauvais conditionnement.
+    
+    Args:
+        moments (array): Moments m0..m(2N-1), de forme (..., 2N)
+        
+    Returns:
+        tuple: (abscisses, poids), chacun de forme (..., N)
+    """
+    moments = np.asarray(moments, dtype=float)
+    forme = moments.shape[:-1]
+    m = moments.reshape(-1, moments.shape[-1])
+    n_noeuds = m.shape[1] // 2
+    
+    # Normalisation: m0 = 1 et taille moyenne = 1
+    L_ref = m[:, 1] / m[:, 0]
+    k = np.arange(2 * n_noeuds)
+    m_norm = m / (m[:, :1] * L_ref[:, np.newaxis] ** k)
+    
+    # Relations de récurrence (sigma_{-1} = 0, sigma_0 = moments)
+    M = m.shape[0]
+    sigma = np.zeros((M, n_noeuds + 1, 2 * n_noeuds))
+    sigma[:, 1, :] = m_norm
+    a = np.zeros((M, n_noeuds))
+    b = np.zeros((M, n_noeuds))
+    a[:, 0] = m_norm[:, 1] / m_norm[:, 0]
+    for i in range(1, n_noeuds):
+        l = np.arange(i, 2 * n_noeuds - i)
+        sigma[:, i + 1, l] = (sigma[:, i, l + 1] - a[:, i - 1, np.newaxis] * sigma[:, i, l]
+                              - b[:, i - 1, np.newaxis] * sigma[:, i - 1, l])
+        a[:, i] = (sigma[:, i + 1, i + 1] / sigma[:, i + 1, i]
+                   - sigma[:, i, i] / sigma[:, i, i - 1])
+        b[:, i] = sigma[:, i + 1, i] / sigma[:, i, i - 1]
+    
+    # Matrice de Jacobi tridiagonale symétrique
+    jacobi = np.zeros((M, n_noeuds, n_noeuds))
+    diag = np.arange(n_noeuds)
+    jacobi[:, diag, diag] = a
+    hors_diag = -np.sqrt(np.maximum(b[:, 1:], 0))  # b < 0: moments non réalisables
+    jacobi[:, diag[1:], diag[:-1]] = hors_diag
+    jacobi[:, diag[:-1], diag[1:]] = hors_diag
+    
+    valeurs, vecteurs = np.linalg.eigh(jacobi)
+    abscisses = valeurs * L_ref[:, np.newaxis]
+    poids = vecteurs[:, 0, :]**2 * m[:, :1]
+    
+    return (abscisses.reshape(forme + (n_noeuds,)),
+            poids.reshape(forme + (n_noeuds,)))
+
+
+def simuler_lot(cristalliseur, noms, valeurs, profil='lineaire'):
+    """
+    Intègre un lot de variantes du cristalliseur comme un seul système d'EDO empilé.
+    
+    Chaque variante est un modèle des moments indépendant (variables
+    logarithmiques); le jacobien du système est bloc-diagonal (blocs 5x5).
+    Les attributs balayés peuvent être des paramètres cinétiques ou de
+    semence (moments initiaux propres à chaque variante).
+    
+    Args:
+        cristalliseur (CristalliseurBatch): Cristalliseur nominal
+        noms (list): Attributs balayés
+        valeurs (array): Valeurs des attributs (n, len(noms))
+        profil (str): Profil de température ne dépendant que du temps
+        
+    Returns:
+        tuple: (L50 (n,) en m, CV (n,) en %)
+    """
+    if profil == 'sursaturation_constante':
+        raise ValueError("Le profil 'sursaturation_constante' requiert "
+                         "l'intégration individuelle des variantes")
+    
+    crist = copy.copy(cristalliseur)
+    n = len(valeurs)
+    for k, nom in enumerate(noms):
+        setattr(crist, nom, valeurs[:, k])
+    
+    y0 = np.broadcast_to(crist.moments_initiaux(), (n, 4))
+    z0 = np.column_stack([np.log(y0), np.full(n, crist.C_0)]).ravel()
+    blocs = (np.arange(n), np.arange(n + 1))
+    
+    def second_membre(t, z):
+        T_C = crist.temperature_profil(t, profil)
+        return crist.dynamique_logarithmique(z.reshape(n, 5), T_C)[0].ravel()
+    
+    def jacobien(t, z):
+        T_C = crist.temperature_profil(t, profil)
+        J = crist.dynamique_logarithmique(z.reshape(n, 5), T_C)[1]
+        return sparse.bsr_matrix((J, *blocs), shape=(5 * n, 5 * n))
+    
+    sol = solve_ivp(second_membre, (0, crist.duree), z0, method='BDF',
+                    jac=jacobien, rtol=1e-6, atol=1e-8)
+    if not sol.success:
+        raise RuntimeError(f"Échec de l'intégration du lot: {sol.message}")
+    
+    m0, m1, m2 = np.exp(sol.y[:, -1].reshape(n, 5)[:, :3]).T
+    L_50 = m1 / m0
+    CV = np.sqrt(np.maximum(m2 * m0 / m1**2 - 1, 0)) * 100
+    return L_50, CV
+
+
+def balayer_semence(masses, tailles, cristalliseur=None, profil='lineaire',
+                    tracer=True):
+    """
+    Balayage masse x taille de semence, intégré comme un seul lot.
+    
+    Args:
+        masses (array): Masses de semence (kg)
+        tailles (array): Tailles moyennes de semence (m)
+        cristalliseur (CristalliseurBatch): Cristalliseur nominal
+        profil (str): Profil de refroidissement
+        tracer (bool): Tracer L50 et CV sur la grille
+        
+    Returns:
+        dict: Masses, tailles, L50 (µm) et CV (%) de forme (masses, tailles)
+    """
+    crist = cristalliseur if cristalliseur is not None else CristalliseurBatch()
+    masses = np.asarray(masses, dtype=float)
+    tailles = np.asarray(tailles, dtype=float)
+    grille = np.stack(np.meshgrid(masses, tailles, indexing='ij'), axis=-1)
+    
+    debut = time.perf_counter()
+    L_50, CV = simuler_lot(crist, ['masse_semence', 'L_semence'],
+                           grille.reshape(-1, 2), profil)
+    print(f"\nBalayage de semence ({grille.shape[0]} x {grille.shape[1]} batchs): "
+          f"{time.perf_counter() - debut:.2f} s")
+    
+    resultats = {
+        'masses': masses,
+        'tailles': tailles,
+        'L50': L_50.reshape(grille.shape[:2]) * 1e6,  # µm
+        'CV': CV.reshape(grille.shape[:2]),
+    }
+    
+    if tracer:
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        for ax, cle, etiquette in [(axes[0], 'L50', 'Taille moyenne L50 (µm)'),
+                                   (axes[1], 'CV', 'Coefficient de variation CV (%)')]:
+            contours = ax.contourf(tailles * 1e6, masses, resultats[cle], levels=20,
+                                   cmap='viridis')
+            fig.colorbar(contours, ax=ax, label=etiquette)
+            ax.set_xlabel('Taille moyenne de la semence (µm)', fontsize=12)
+            ax.set_ylabel('Masse de semence (kg)', fontsize=12)
+            ax.set_title(etiquette, fontsize=13, fontweight='bold')
+        
+        plt.suptitle(f'Balayage de semence - Profil {profil}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'semence_{profil}.png'
+        sauvegarder_figure(fig, nom_fichier)
+    
+    return resultats
+
+
+def simuler_configuration(configuration):
+    """
+    Simule une configuration de CristalliseurBatch.
+    
+    Fonction de niveau module, exécutable dans un processus séparé.
+    
+    Args:
+        configuration (dict): Attributs du cristalliseur à modifier
+            (ex. {'C_0': 85, 'k_g': 1e-6}), avec les clés réservées
+            'profil' (profil de refroidissement) et 'options' (arguments
+            supplémentaires de simuler)
+            
+    Returns:
+        CristalliseurBatch: Cristalliseur simulé
+    """
+    parametres = dict(configuration)
+    profil = parametres.pop('profil', 'lineaire')
+    options = parametres.pop('options', {})
+    
+    crist = CristalliseurBatch()
+    for nom, valeur in parametres.items():
+        if not hasattr(crist, nom):
+            raise AttributeError(f"Paramètre inconnu du cristalliseur: {nom}")
+        setattr(crist, nom, valeur)
+    
+    crist.simuler(profil=profil, verbose=False, **options)
+    return crist
+
+
+def simuler_configurations(configurations, n_workers=None, tracer=False):
+    """
+    Simule une liste de configurations dans un pool de processus.
+    
+    Args:
+        configurations (list): Configurations (voir simuler_configuration)
+        n_workers (int): Nombre de processus (None: nombre de cœurs)
+        tracer (bool): Tracer les résultats de chaque configuration
+        
+    Returns:
+        list: Cristalliseurs simulés, dans l'ordre des configurations
+    """
+    cristalliseurs = executer_taches(simuler_configuration, configurations,
+                                     n_workers=n_workers)
+    
+    if tracer:
+        for configuration, crist in zip(configurations, cristalliseurs):
+            profil = configuration.get('profil', 'lineaire')
+            crist.tracer_resultats(titre_supplement=f'Profil {profil}')
+    
+    return cristalliseurs
+
+
+def simuler_campagne(configurations, fichier_reprise, temps_calcul_max=None):
+    """
+    Simule une campagne de batchs successifs avec point de reprise.
+    
+    Les résultats de chaque batch terminé (L50, CV, concentration finale,
+    moments finaux) sont ajoutés au point de reprise: après un arrêt, la
+    campagne reprend au premier batch non simulé.
+    
+    Args:
+        configurations (list): Configurations (voir simuler_configuration)
+        fichier_reprise (str): Point de reprise de la campagne (.npz)
+        temps_calcul_max (float): Interruption volontaire une fois ce temps
+            de calcul dépassé (s), à reprendre par un nouvel appel
+            
+    Returns:
+        dict: 'termine', 'n_batchs' simulés, 'L50' (µm), 'CV' (%), 'C_finale'
+            et 'moments' finaux (NaN pour les batchs restants)
+    """
+    n = len(configurations)
+    empreinte = reprise.signature(*[sorted(c.items()) for c in configurations])
+    point = reprise.charger_point(fichier_reprise, empreinte)
+    if point is None:
+        point = {
+            'signature': np.array(empreinte),
+            'n_batchs': np.array(0),
+            'L50': np.full(n, np.nan),
+            'CV': np.full(n, np.nan),
+            'C_finale': np.full(n, np.nan),
+            'moments': np.full((n, 4), np.nan),
         }
+    
+    debut = time.perf_counter()
+    i = int(point['n_batchs'])
+    if 0 < i < n:
+        print(f"\nReprise de la campagne au batch {i + 1}/{n}")
+    while i < n:
+        crist = simuler_configuration(configurations[i])
+        point['L50'][i] = crist.L_50 * 1e6  # µm
+        point['CV'][i] = crist.CV
+        point['C_finale'][i] = crist.concentration[-1]
+        point['moments'][i] = crist.moments[-1]
+        i += 1
+        point['n_batchs'] = np.array(i)
+        reprise.sauvegarder_point(fichier_reprise, **point)
+        
+        if temps_calcul_max is not None and time.perf_counter() - debut > temps_calcul_max:
+            print(f"\nCampagne interrompue après {i}/{n} batchs "
+                  f"(reprise: {fichier_reprise})")
+            break
+    
+    resultats = {cle: valeur for cle, valeur in point.items() if cle != 'signature'}
+    resultats['n_batchs'] = i
+    resultats['termine'] = i == n
+    return resultats
 
 
-def comparer_profils():
+def comparer_profils(profils=('lineaire', 'exponentiel', 'optimal'),
+                     n_workers=None, tracer=True):
     """
-    Compare les trois profils de refroidissement.
+    Compare les profils de refroidissement.
+    
+    Args:
+        profils (tuple): Profils à comparer
+        n_workers (int): Nombre de processus (None: nombre de cœurs)
+        tracer (bool): Tracer les résultats de chaque profil
+        
+    Returns:
+        list: L50, CV et concentration finale par profil
     """
     print("\n" + "="*70)
     print("COMPARAISON DES PROFILS DE REFROIDISSEMENT")
     print("="*70)
     
-    profils = ['lineaire', 'exponentiel', 'optimal']
-    resultats = []
+    configurations = [{'profil': profil, 'options': {'n_points': 500}}
+                      for profil in profils]
+    cristalliseurs = simuler_configurations(configurations, n_workers=n_workers,
+                                            tracer=tracer)
     
-    for profil in profils:
-        crist = CristalliseurBatch()
-        crist.simuler(profil=profil, n_points=500)
-        crist.tracer_resultats(titre_supplement=f'Profil {profil}')
-        
+    resultats = []
+    for profil, crist in zip(profils, cristalliseurs):
         resultats.append({
             'profil': profil,
             'L50': crist.L_50 * 1e6,  # µm
@@ -385,6 +1383,117 @@ def comparer_profils():
     meilleur = resultats[meilleur_idx]
     print(f"Le profil '{meilleur['profil']}' donne la distribution la plus uniforme")
     print(f"avec CV = {meilleur['CV']:.1f}% et L50 = {meilleur['L50']:.1f} µm")
+    
+    return resultats
+
+
+
+def comparer_solveurs(profil='lineaire', methodes=('odeint', 'LSODA', 'BDF', 'Radau'),
+                      n_repetitions=5):
+    """
+    Compare les coûts des intégrateurs sur une même simulation.
+    
+    Args:
+        profil (str): Type de profil de refroidissement
+        methodes (tuple): Intégrateurs à comparer
+        n_repetitions (int): Nombre de répétitions pour le temps de calcul
+        
+    Returns:
+        list: Statistiques par intégrateur et échelle
+    """
+    print("\n" + "="*70)
+    print(f"COMPARAISON DES SOLVEURS - Profil {profil}")
+    print("="*70)
+    
+    resultats = []
+    for methode in methodes:
+        echelles = [False] if methode == 'odeint' else [False, True]
+        for echelle_log in echelles:
+            crist = CristalliseurBatch()
+            temps_calcul = []
+            for _ in range(n_repetitions):
+                crist.simuler(profil=profil, n_points=500, methode=methode,
+                              echelle_log=echelle_log, verbose=False)
+                temps_calcul.append(crist.statistiques['temps_calcul'])
+            
+            resultats.append({
+                'methode': methode + (' (log)' if echelle_log else ''),
+                'n_evaluations': crist.statistiques['n_evaluations'],
+                'n_pas': crist.statistiques['n_pas'],
+                'temps_ms': np.min(temps_calcul) * 1000,
+                'L50': crist.L_50 * 1e6,  # µm
+                'CV': crist.CV
+            })
+    
+    print(f"{'Méthode':<15} {'Évaluations':<13} {'Pas':<8} {'Temps (ms)':<12} "
+          f"{'L50 (µm)':<12} {'CV (%)':<10}")
+    print("-"*70)
+    for r in resultats:
+        print(f"{r['methode']:<15} {r['n_evaluations']:<13} {r['n_pas']:<8} "
+              f"{r['temps_ms']:<12.2f} {r['L50']:<12.3f} {r['CV']:<10.1f}")
+    print("="*70)
+    
+    return resultats
+
+
+def comparer_noyaux(profil='lineaire', methodes=('odeint', 'LSODA', 'BDF'),
+                    n_repetitions=5, cristalliseur=None):
+    """
+    Compare les noyaux Python et compilés du modèle des moments.
+    
+    La première simulation compilée (compilation Numba) est exclue des
+    temps; les écarts relatifs sur L50 et CV vérifient l'égalité des résultats.
+    
+    Args:
+        profil (str): Type de profil de refroidissement
+        methodes (tuple): Intégrateurs à comparer
+        n_repetitions (int): Nombre de répétitions pour le temps de calcul
+        cristalliseur (CristalliseurBatch): Cristalliseur simulé (défaut si None)
+        
+    Returns:
+        list: Temps par intégrateur et noyau, accélération et écarts
+    """
+    print("\n" + "="*70)
+    print(f"COMPARAISON DES NOYAUX - Profil {profil} "
+          f"(Numba {'disponible' if noyaux_compiles.NUMBA_DISPONIBLE else 'absent'})")
+    print("="*70)
+    
+    resultats = []
+    for methode in methodes:
+        temps_calcul = {}
+        sorties = {}
+        for noyau in ('python', 'compile'):
+            crist = (copy.copy(cristalliseur) if cristalliseur is not None
+                     else CristalliseurBatch())
+            crist.simuler(profil=profil, n_points=500, methode=methode, noyau=noyau,
+                          verbose=False)  # Compilation éventuelle
+            mesures = []
+            for _ in range(n_repetitions):
+                crist.simuler(profil=profil, n_points=500, methode=methode,
+                              noyau=noyau, verbose=False)
+                mesures.append(crist.statistiques['temps_calcul'])
+            temps_calcul[noyau] = np.min(mesures) * 1000
+            sorties[noyau] = (crist.L_50, crist.CV)
+        
+        resultats.append({
+            'methode': methode,
+            'temps_python_ms': temps_calcul['python'],
+            'temps_compile_ms': temps_calcul['compile'],
+            'acceleration': temps_calcul['python'] / temps_calcul['compile'],
+            'ecart_L50': abs(sorties['compile'][0] / sorties['python'][0] - 1),
+            'ecart_CV': abs(sorties['compile'][1] / sorties['python'][1] - 1),
+        })
+    
+    print(f"{'Méthode':<10} {'Python (ms)':<13} {'Compilé (ms)':<14} "
+          f"{'Accélération':<14} {'Écart L50':<12} {'Écart CV':<10}")
+    print("-"*70)
+    for r in resultats:
+        print(f"{r['methode']:<10} {r['temps_python_ms']:<13.2f} "
+              f"{r['temps_compile_ms']:<14.2f} {r['acceleration']:<14.1f} "
+              f"{r['ecart_L50']:<12.1e} {r['ecart_CV']:<10.1e}")
+    print("="*70)
+    
+    return resultats
 
 
 if __name__ == "__main__":
@@ -396,5 +1505,55 @@ if __name__ == "__main__":
     crist.tracer_resultats(titre_supplement='Profil linéaire')
     crist.dimensionnement()
     
+    # Dimensionnement vectorisé de 100 000 cuves candidates
+    generateur = np.random.default_rng(0)
+    n_cuves = 100_000
+    debut = time.perf_counter()
+    dims = dimensionner_cristalliseurs(
+        masse_batch=generateur.uniform(2000, 10000, n_cuves),
+        duree=generateur.uniform(2, 6, n_cuves) * 3600,
+        T_0=crist.T_0, T_f=crist.T_f,
+        H_sur_D=generateur.uniform(1.0, 2.0, n_cuves),
+        vitesse_agitation=generateur.uniform(30, 90, n_cuves),
+        delta_T_ml=generateur.uniform(10, 20, n_cuves))
+    print(f"\n{n_cuves} cuves dimensionnées en {(time.perf_counter() - debut)*1000:.1f} ms "
+          f"(volume {dims['volume'].min():.1f} - {dims['volume'].max():.1f} m³, "
+          f"serpentin {dims['surface_serpentin'].min():.1f} - "
+          f"{dims['surface_serpentin'].max():.1f} m²)")
+    
+    # Batch ensemencé et balayage masse x taille de semence
+    crist_semence = CristalliseurBatch()
+    crist_semence.C_0 = 88  # Sirop sursaturé en cours de refroidissement
+    crist_semence.k_g = 1e-5  # Croissance rapide
+    crist_semence.E_g = 20000
+    crist_semence.masse_semence = 50  # kg
+    crist_semence.L_semence = 100e-6  # m
+    crist_semence.simuler(profil='lineaire', n_points=500)
+    balayer_semence(np.linspace(5, 100, 20), np.linspace(20e-6, 200e-6, 20), crist_semence)
+    
+    # Simulation longue reprise depuis son point de reprise (.npz)
+    while not crist_semence.simuler(profil='lineaire', n_points=500, methode='BDF',
+                                    fichier_reprise='reprise_batch.npz',
+                                    temps_calcul_max=0.01):
+        pass
+    
+    # Arrêt anticipé à T_f: sursaturation constante d'un batch ensemencé rapide,
+    # la température atteignant sa butée T_f avant la fin du batch
+    crist_arret = CristalliseurBatch()
+    crist_arret.C_0 = 88
+    crist_arret.k_g = 1e-3
+    crist_arret.E_g = 20000
+    crist_arret.masse_semence = 500  # kg
+    crist_arret.simuler(profil='sursaturation_constante', n_points=500, methode='BDF',
+                        arret_T_f=True)
+    if crist_arret.evenement != 'temperature_finale':
+        raise RuntimeError("L'événement temperature_finale n'a pas arrêté la simulation")
+    
     # Comparaison des profils
     # comparer_profils()
+    
+    # Comparaison des solveurs (odeint / solve_ivp)
+    # comparer_solveurs()
+    
+    # Noyaux compilés (Numba) / Python
+    # comparer_noyaux(cristalliseur=crist_semence)
@@ -0,0 +1,400 @@
+"""
+Module Cristallisation Continue
+Cristalliseur continu MSMPR en régime permanent
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from cristallisation import CristalliseurBatch
+from rendu import sauvegarder_figure
+
+
+class CristalliseurMSMPR(CristalliseurBatch):
+    """
+    Cristalliseur continu parfaitement agité (MSMPR) en régime permanent.
+    
+    Croissance indépendante de la taille: les bilans des moments
+    0 = (m_k,alim - m_k)/τ + k G m_(k-1) (+ B pour k = 0) donnent les
+    moments de sortie explicitement en fonction de B et G; pour une
+    alimentation claire, m_k = k! B τ (Gτ)^k (distribution exponentielle).
+    La masse de cristaux formée x = m3 - m3_alim fixe la concentration, donc
+    S, B et G: le régime permanent se réduit à une équation scalaire en x,
+    résolue par Newton protégé en ln x et vectorisée sur les conditions
+    opératoires. Les cinétiques sont celles de CristalliseurBatch.
+    """
+    
+    def __init__(self):
+        """Initialisation du cristalliseur continu."""
+        super().__init__()
+        
+        # Conditions opératoires
+        self.C_alimentation = 85  # g/100g - Concentration d'alimentation
+        self.T_cristalliseur = 40  # °C - Température du cristalliseur
+        self.temps_sejour = 3600  # s - Temps de séjour τ = V/Q
+        self.debit_alimentation = 2.0  # m³/h - Débit volumique d'alimentation
+        self.rho_sirop = 1300  # kg/m³ - Masse volumique du sirop
+        
+        self.resultats = None
+    
+    def moments_sortie(self, S, T_C, temps_sejour, moments_alimentation, m3):
+        """
+        Cinétiques et moments de sortie pour une sursaturation donnée.
+        
+        Args:
+            S (array): Sursaturation relative
+            T_C (array): Température en °C
+            temps_sejour (array): Temps de séjour (s)
+            moments_alimentation (array): Moments de l'alimentation (..., 4)
+            m3 (array): Troisième moment de sortie (suspension, m³/m³)
+            
+        Returns:
+            tuple: (moments (..., 4), B (noyaux/(m³·s)), G (m/s))
+        """
+        G = self.vitesse_croissance(S, T_C + 273.15)
+        B = self.vitesse_nucleation(S, self.rho_cristaux * m3)
+        a = G * temps_sejour
+        
+        m0 = moments_alimentation[..., 0] + B * temps_sejour
+        m1 = moments_alimentation[..., 1] + a * m0
+        m2 = moments_alimentation[..., 2] + 2 * a * m1
+        m3_bilan = moments_alimentation[..., 3] + 3 * a * m2
+        return np.stack([m0, m1, m2, m3_bilan], axis=-1), B, G
+    
+    def regime_permanent(self, temps_sejour=None, T_C=None, C_alimentation=None,
+                         moments_alimentation=None, x_initial=None, tol=1e-12,
+                         max_iterations=100):
+        """
+        Régime permanent du MSMPR (arguments scalaires ou tableaux).
+        
+        Inconnue x = m3 - m3_alim (cristaux formés), avec
+        C = C_alim - 100 k_v ρ_c x / ρ_sirop; résidu
+        r(x) = m3_alim + x - m3(B, G) où m3(B, G) suit des bilans des moments,
+        résolu par Newton protégé sur ln x à partir de l'extrémité peu
+        cristallisée de l'encadrement (ou d'une estimation x_initial).
+        
+        Args:
+            temps_sejour (float or array): Temps de séjour (s)
+            T_C (float or array): Température du cristalliseur (°C)
+            C_alimentation (float or array): Concentration d'alimentation
+            moments_alimentation (array): Moments de l'alimentation (..., 4)
+                (None: alimentation claire)
+            x_initial (array): Estimation de départ de x (ex. étage amont d'une
+                cascade; None: extrémité basse de l'encadrement)
+            tol (float): Tolérance sur ln x
+            max_iterations (int): Nombre maximal d'itérations de Newton
+            
+        Returns:
+            dict: S, C, B, G, moments, L50, CV, rendement, volume et
+                production (tableaux diffusés)
+        """
+        if self.j >= 1:
+            raise ValueError("Régime permanent non unique pour j >= 1")
+        
+        temps_sejour = self.temps_sejour if temps_sejour is None else temps_sejour
+        T_C = self.T_cristalliseur if T_C is None else T_C
+        C_alimentation = self.C_alimentation if C_alimentation is None else C_alimentation
+        if moments_alimentation is None:
+            moments_alimentation = np.zeros(4)
+        moments_alimentation = np.asarray(moments_alimentation, dtype=float)
+        temps_sejour, T_C, C_alimentation, m0_a, m1_a, m2_a, m3_a = np.broadcast_arrays(
+            np.asarray(temps_sejour, dtype=float), np.asarray(T_C, dtype=float),
+            np.asarray(C_alimentation, dtype=float), *np.moveaxis(moments_alimentation, -1, 0)
+        )
+        moments_alimentation = np.stack([m0_a, m1_a, m2_a, m3_a], axis=-1)
+        
+        C_star = self.thermo.solubilite_saccharose(T_C)
+        facteur = 100 * self.k_v * self.rho_cristaux / self.rho_sirop
+        x_max = (C_alimentation - C_star) / facteur  # Cristaux formés à S = 0
+        sursature = x_max > 0
+        
+        def residu(u):
+            x = np.exp(u)
+            m3 = m3_a + x
+            S = (C_alimentation - facteur * x - C_star) / C_star
+            moments, B, G = self.moments_sortie(S, T_C, temps_sejour,
+                                                moments_alimentation, m3)
+            return x, m3, S, B, G, moments[..., 3]
+        
+        # Encadrement en u = ln x: phi(u_bas) > 0, phi(u_haut) <= 0 (S = 0), avec
+        # phi = ln m3(B, G) - ln m3, presque linéaire en u tant que x << m3(B, G)
+        u_haut = np.log(np.where(sursature, x_max, 1.0))
+        u_bas = u_haut - 50
+        x, m3, _, _, _, m3_bilan = residu(u_bas)
+        # Repli (croissance quasi nulle): encadrement élargi, résolu par bissection
+        u_bas = np.where(m3_bilan > m3, u_bas, np.log(1e-300))
+        if x_initial is None:
+            u = u_bas.copy()
+        else:
+            u = np.clip(np.log(np.maximum(x_initial, 1e-300)), u_bas, u_haut)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(max_iterations):
+                x, m3, S, B, G, m3_bilan = residu(u)
+                phi = np.log(m3_bilan) - np.log(m3)
+                
+                # dm3/dx: S diminue avec x (dS/dx = -facteur/C*); B dépend aussi de m3
+                a = G * temps_sejour
+                dm3_dG = temps_sejour * (3 * m2_a + 12 * a * m1_a + 18 * a**2 * m0_a
+                                         + 18 * a**2 * B * temps_sejour)
+                dm3_dB = 6 * a**3 * temps_sejour
+                dm3_dS = (dm3_dG * self.g * G + dm3_dB * self.b * B) / S
+                dm3_dx = -dm3_dS * facteur / C_star + dm3_dB * self.j * B / m3
+                dphi_du = x * (dm3_dx / m3_bilan - 1 / m3)
+                
+                u_bas = np.where(phi > 0, u, u_bas)
+                u_haut = np.where(phi <= 0, u, u_haut)
+                u_newton = u - phi / dphi_du
+                hors = (u_newton < u_bas) | (u_newton > u_haut) | ~np.isfinite(u_newton)
+                u_nouveau = np.where(hors, 0.5 * (u_bas + u_haut), u_newton)
+                
+                converge = np.abs(u_nouveau - u) < tol
+                u = u_nouveau
+                if np.all(converge | ~sursature):
+                    break
+        
+        x = np.where(sursature, np.exp(u), 0.0)
+        m3 = m3_a + x
+        C = C_alimentation - facteur * x
+        S = (C - C_star) / C_star
+        moments, B, G = self.moments_sortie(S, T_C, temps_sejour,
+                                            moments_alimentation, m3)
+        moments[..., 3] = m3
+        Q = self.debit_alimentation / 3600  # m³/s
+        
+        m0, m1, m2 = moments[..., 0], moments[..., 1], moments[..., 2]
+        m0_pos = np.where(m0 > 0, m0, 1.0)
+        m1_pos = np.where(m1 > 0, m1, 1.0)
+        self.resultats = {
+            'temps_sejour': temps_sejour,
+            'T': T_C,
+            'C_alimentation': C_alimentation,
+            'S': np.maximum(S, 0),
+            'C': C,
+            'B': B,
+            'G': G,
+            'moments': moments,
+            'L50': np.where(m0 > 0, m1 / m0_pos, 0.0),  # m - m1/m0
+            'CV': np.where(m1 > 0, np.sqrt(np.maximum(m2 * m0 / m1_pos**2 - 1, 0)) * 100,
+                           0.0),  # % (100 % pour une alimentation claire)
+            'rendement': (C_alimentation - C) / C_alimentation * 100,
+            'volume': temps_sejour * Q,  # m³
+            'production': self.k_v * self.rho_cristaux * x * Q * 3600,  # kg/h
+        }
+        return self.resultats
+    
+    def afficher_resultats(self):
+        """
+        Affiche le régime permanent (conditions scalaires).
+        """
+        r = self.resultats
+        print("\n" + "="*60)
+        print("CRISTALLISEUR CONTINU MSMPR - RÉGIME PERMANENT")
+        print("="*60)
+        print(f"Temps de séjour: {float(r['temps_sejour'])/3600:.2f} h "
+              f"(volume {float(r['volume']):.2f} m³)")
+        print(f"Température: {float(r['T']):.1f} °C")
+        print(f"Concentration: {float(r['C_alimentation']):.2f} → "
+              f"{float(r['C']):.4f} g/100g")
+        print(f"Sursaturation: {float(r['S']):.4f}")
+        print(f"Nucléation B: {float(r['B']):.3e} noyaux/(m³·s)")
+        print(f"Croissance G: {float(r['G']):.3e} m/s")
+        print(f"Taille moyenne L50: {float(r['L50'])*1e6:.1f} µm "
+              f"(CV {float(r['CV']):.1f}%)")
+        print(f"Production de cristaux: {float(r['production']):.2f} kg/h")
+        print("="*60)
+    
+    def tracer_balayage(self, temps_sejour, temperatures, titre_supplement=''):
+        """
+        Trace L50 et sursaturation en fonction du temps de séjour.
+        
+        Args:
+            temps_sejour (array): Temps de séjour (s)
+            temperatures (list): Températures du cristalliseur (°C)
+            titre_supplement (str): Complément au titre
+        """
+        r = self.regime_permanent(temps_sejour[None, :],
+                                  np.asarray(temperatures, dtype=float)[:, None])
+        temps_h = temps_sejour / 3600
+        
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        for i, T in enumerate(temperatures):
+            axes[0].plot(temps_h, r['L50'][i] * 1e6, linewidth=2, label=f'{T:.0f} °C')
+            axes[1].plot(temps_h, r['S'][i], linewidth=2, label=f'{T:.0f} °C')
+        axes[0].set_ylabel('Taille moyenne L50 (µm)', fontsize=12)
+        axes[0].set_title('Taille moyenne', fontsize=13, fontweight='bold')
+        axes[1].set_ylabel('Sursaturation S', fontsize=12)
+        axes[1].set_title('Sursaturation en sortie', fontsize=13, fontweight='bold')
+        for ax in axes:
+            ax.set_xlabel('Temps de séjour (h)', fontsize=12)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Cristalliseur MSMPR {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'msmpr_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+class CascadeMSMPR:
+    """
+    Cascade de cristalliseurs MSMPR en série (refroidissement étagé).
+    
+    La liqueur mère et les cristaux de l'étage i alimentent l'étage i+1 au
+    même débit: le système est bloc-triangulaire et se résout de façon
+    séquentielle-modulaire, un régime permanent MSMPR par étage avec les
+    moments et la concentration de sortie de l'étage précédent. Chaque
+    résolution étant vectorisée, un balayage des températures et volumes
+    des étages coûte autant de résolutions (vectorisées) que d'étages.
+    """
+    
+    def __init__(self, etage=None, temperatures=(50, 40, 30), volumes=(2.0, 2.0, 2.0)):
+        """
+        Initialisation de la cascade.
+        
+        Args:
+            etage (CristalliseurMSMPR): Cristalliseur portant les cinétiques,
+                le débit et la concentration d'alimentation
+            temperatures (list): Températures des étages (°C)
+            volumes (list): Volumes des étages (m³)
+        """
+        self.etage = etage if etage is not None else CristalliseurMSMPR()
+        self.temperatures = list(temperatures)
+        self.volumes = list(volumes)
+        
+        self.resultats = None
+    
+    def resoudre(self, temperatures=None, volumes=None, C_alimentation=None):
+        """
+        Régime permanent de la cascade, étage par étage.
+        
+        Les températures et volumes de chaque étage peuvent être des tableaux
+        (balayage): ils sont diffusés entre eux à travers la cascade.
+        
+        Args:
+            temperatures (list): Températures des étages (°C, scalaires ou tableaux)
+            volumes (list): Volumes des étages (m³, scalaires ou tableaux)
+            C_alimentation (float or array): Concentration d'alimentation
+            
+        Returns:
+            dict: Résultats par étage ('etages') et de sortie de la cascade
+        """
+        temperatures = self.temperatures if temperatures is None else temperatures
+        volumes = self.volumes if volumes is None else volumes
+        C_alimentation = (self.etage.C_alimentation if C_alimentation is None
+                          else C_alimentation)
+        if len(temperatures) != len(volumes):
+            raise ValueError("Une température et un volume par étage sont requis")
+        
+        Q = self.etage.debit_alimentation / 3600  # m³/s
+        C, moments, x = C_alimentation, None, None
+        etages = []
+        for T_C, V in zip(temperatures, volumes):
+            # Départ de Newton: cristaux formés dans l'étage amont
+            r = self.etage.regime_permanent(np.asarray(V, dtype=float) / Q, T_C, C, moments,
+                                            x_initial=x)
+            etages.append(r)
+            x = r['moments'][..., 3] - (0.0 if moments is None else moments[..., 3])
+            C, moments = r['C'], r['moments']
+        
+        sortie = etages[-1]
+        self.resultats = {
+            'etages': etages,
+            'C_alimentation': C_alimentation,
+            'C': sortie['C'],
+            'moments': sortie['moments'],
+            'L50': sortie['L50'],
+            'CV': sortie['CV'],
+            'rendement': (C_alimentation - sortie['C']) / C_alimentation * 100,
+            'production': sum(r['production'] for r in etages),  # kg/h
+            'volume': sum(r['volume'] for r in etages),  # m³
+        }
+        return self.resultats
+    
+    def afficher_resultats(self):
+        """
+        Affiche le régime permanent de la cascade (conditions scalaires).
+        """
+        r = self.resultats
+        print("\n" + "="*60)
+        print(f"CASCADE MSMPR - {len(r['etages'])} ÉTAGES")
+        print("="*60)
+        print(f"\n{'Étage':<7} {'T (°C)':<8} {'V (m³)':<8} {'C (g/100g)':<12} "
+              f"{'S':<8} {'L50 (µm)':<10} {'CV (%)':<8} {'P (kg/h)':<10}")
+        for i, e in enumerate(r['etages'], 1):
+            print(f"{i:<7} {float(e['T']):<8.1f} {float(e['volume']):<8.2f} "
+                  f"{float(e['C']):<12.4f} {float(e['S']):<8.4f} "
+                  f"{float(e['L50'])*1e6:<10.1f} {float(e['CV']):<8.1f} "
+                  f"{float(e['production']):<10.2f}")
+        print(f"\nVolume total: {float(r['volume']):.2f} m³")
+        print(f"Rendement global: {float(r['rendement']):.2f}%")
+        print(f"Production totale: {float(r['production']):.2f} kg/h")
+        print(f"Produit: L50 = {float(r['L50'])*1e6:.1f} µm, CV = {float(r['CV']):.1f}%")
+        print("="*60)
+    
+    def tracer_balayage(self, etage, temperatures, volumes, titre_supplement=''):
+        """
+        Trace L50 et rendement de la cascade en fonction de la température
+        et du volume d'un étage (les autres étages restant fixés).
+        
+        Args:
+            etage (int): Indice de l'étage balayé (0 pour le premier)
+            temperatures (array): Températures balayées (°C)
+            volumes (array): Volumes balayés (m³)
+            titre_supplement (str): Complément au titre
+        """
+        T_grille = np.asarray(temperatures, dtype=float)[:, None]
+        V_grille = np.asarray(volumes, dtype=float)[None, :]
+        T_etages = list(self.temperatures)
+        V_etages = list(self.volumes)
+        T_etages[etage], V_etages[etage] = T_grille, V_grille
+        r = self.resoudre(T_etages, V_etages)
+        
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        for ax, valeurs, etiquette in [
+            (axes[0], r['L50'] * 1e6, 'Taille moyenne L50 (µm)'),
+            (axes[1], r['rendement'], 'Rendement global (%)'),
+        ]:
+            contours = ax.contourf(volumes, temperatures, valeurs, levels=20, cmap='viridis')
+            fig.colorbar(contours, ax=ax, label=etiquette)
+            ax.set_xlabel(f'Volume de l\'étage {etage + 1} (m³)', fontsize=12)
+            ax.set_ylabel(f'Température de l\'étage {etage + 1} (°C)', fontsize=12)
+            ax.set_title(etiquette, fontsize=13, fontweight='bold')
+        
+        plt.suptitle(f'Cascade MSMPR {titre_supplement}', fontsize=15, fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'cascade_msmpr_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module cristallisation continue ===")
+    
+    msmpr = CristalliseurMSMPR()
+    msmpr.k_g = 1e-5  # Croissance rapide
+    msmpr.E_g = 20000
+    msmpr.regime_permanent()
+    msmpr.afficher_resultats()
+    
+    # Balayage temps de séjour x température (vectorisé)
+    msmpr.tracer_balayage(np.linspace(0.25, 4, 200) * 3600, [35, 40, 45, 50],
+                          titre_supplement='Balayage')
+    
+    # Cascade de trois étages
+    etage = CristalliseurMSMPR()
+    etage.k_g = 1e-4
+    etage.E_g = 10000
+    etage.C_alimentation = 90
+    cascade = CascadeMSMPR(etage, temperatures=[55, 45, 35], volumes=[2.0, 2.0, 2.0])
+    cascade.resoudre()
+    cascade.afficher_resultats()
+    
+    # Balayage température x volume du deuxième étage (une résolution par étage)
+    debut = time.perf_counter()
+    cascade.tracer_balayage(1, np.linspace(35, 55, 101), np.linspace(0.5, 6, 101),
+                            titre_supplement='Étage 2')
+    print(f"Balayage de 101 x 101 cascades: {time.perf_counter() - debut:.2f} s")
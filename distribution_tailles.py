@@ -0,0 +1,427 @@
+"""
+Module Distribution des Tailles
+Résolution du bilan de population complet n(L,t) par volumes finis
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+from scipy.special import ndtr
+import matplotlib.pyplot as plt
+from cristallisation import CristalliseurBatch
+import noyaux_compiles
+import reprise
+from rendu import sauvegarder_figure
+
+
+class CristalliseurDistribution(CristalliseurBatch):
+    """
+    Cristalliseur batch résolu sur la distribution complète des tailles.
+    
+    Le bilan de population ∂n/∂t + G ∂n/∂L = 0 (avec n(0,t) = B/G) est
+    discrétisé par volumes finis sur une grille géométrique, avec une
+    reconstruction MUSCL à limiteur de pente de van Leer. Les cinétiques
+    de nucléation et de croissance sont celles de CristalliseurBatch; les
+    noyaux naissent dans la première classe (taille L_min).
+    """
+    
+    def __init__(self, n_classes=500, L_min=1e-7, L_max=2e-3):
+        """
+        Initialisation du cristalliseur et de la grille de tailles.
+        
+        Args:
+            n_classes (int): Nombre de classes de taille
+            L_min (float): Borne inférieure de la grille (m)
+            L_max (float): Borne supérieure de la grille (m)
+        """
+        super().__init__()
+        
+        self.n_classes = n_classes
+        self.L_min = L_min
+        self.L_max = L_max
+        self.grille_tailles()
+        
+        # Résultats
+        self.distribution = None  # n(L,t) en nombre/(m³·m)
+    
+    def grille_tailles(self):
+        """
+        Construit la grille géométrique (bornes, centres et largeurs des classes).
+        """
+        self.L_bornes = np.geomspace(self.L_min, self.L_max, self.n_classes + 1)
+        self.L_centres = np.sqrt(self.L_bornes[:-1] * self.L_bornes[1:])
+        self.delta_L = np.diff(self.L_bornes)
+        # Distances entre centres voisins (pentes de la reconstruction)
+        self.h_centres = np.diff(self.L_centres)
+        # Poids d'intégration des moments m2 et m3
+        self.poids_m2 = self.L_centres**2 * self.delta_L
+        self.poids_m3 = self.L_centres**3 * self.delta_L
+    
+    def moments_distribution(self, n):
+        """
+        Calcule les moments m0..m3 d'une ou plusieurs distributions.
+        
+        Args:
+            n (array): Densité en nombre par classe (..., n_classes)
+            
+        Returns:
+            np.array: Moments (..., 4)
+        """
+        poids = self.L_centres ** np.arange(4)[:, np.newaxis] * self.delta_L
+        return n @ poids.T
+    
+    def densite_semence(self):
+        """
+        Densité de la semence sur la grille de tailles.
+        
+        Même description que moments_semence (histogramme ou loi log-normale):
+        le nombre par classe est l'écart de la fonction de répartition entre
+        les bornes de la classe, puis la densité est normalisée pour conserver
+        la masse de semence sur la grille. Vectorisé sur les attributs de
+        semence fournis sous forme de tableaux.
+        
+        Returns:
+            np.array: Densité en nombre par classe (..., n_classes)
+        """
+        if self.histogramme_semence is None:
+            L = np.asarray(self.L_semence, dtype=float)[..., np.newaxis]
+            sigma = np.asarray(self.sigma_semence, dtype=float)[..., np.newaxis]
+            mu = np.log(L) - 0.5 * sigma**2
+            repartition = ndtr((np.log(self.L_bornes) - mu) / sigma)
+        else:
+            # Densité constante par classe: répartition linéaire par morceaux
+            L_bornes, nombres = self.histogramme_semence
+            nombres = np.asarray(nombres, dtype=float)
+            cumul = np.concatenate([np.zeros(nombres.shape[:-1] + (1,)),
+                                    np.cumsum(nombres, axis=-1)], axis=-1)
+            cumul = cumul.reshape(-1, cumul.shape[-1])
+            repartition = np.array([np.interp(self.L_bornes, L_bornes, c) for c in cumul])
+            repartition = repartition.reshape(nombres.shape[:-1] + (self.n_classes + 1,))
+        
+        nombre_classes = np.diff(repartition, axis=-1)
+        m3_grille = nombre_classes @ self.L_centres**3
+        m3 = self.moments_semence(4)[..., 3]
+        facteur = np.where(m3_grille > 0, m3 / np.where(m3_grille > 0, m3_grille, 1.0), 0.0)
+        return facteur[..., np.newaxis] * nombre_classes / self.delta_L
+    
+    def distribution_initiale(self):
+        """
+        Distribution initiale: germes regroupés dans la première classe et semence.
+        
+        Returns:
+            np.array: Densité en nombre par classe
+        """
+        n0 = np.zeros(self.n_classes)
+        n0[0] = 1e6 / self.delta_L[0]  # 1e6 germes/m³, comme le modèle des moments
+        return n0 + self.densite_semence()
+    
+    def _cinetiques(self, t, n, C, profil):
+        """
+        Évalue température, sursaturation et cinétiques à l'instant t.
+        
+        Args:
+            t (float): Temps
+            n (array): Densité en nombre par classe
+            C (float): Concentration (g/100g)
+            profil (str): Type de profil de température
+            
+        Returns:
+            tuple: (T_C, T_K, C_star, S, m_T, B, G)
+        """
+        T_C = self.temperature_etat(t, C, profil)
+        T_K = T_C + 273.15
+        C_star = self.thermo.solubilite_saccharose(T_C)
+        S = (C - C_star) / C_star
+        
+        m3 = np.dot(n, self.poids_m3)
+        m_T = m3 * self.rho_cristaux if m3 > 0 else 1e-6
+        
+        B = self.vitesse_nucleation(S, m_T)
+        G = self.vitesse_croissance(S, T_K)
+        return T_C, T_K, C_star, S, m_T, B, G
+    
+    def valeurs_faces(self, n):
+        """
+        Reconstruction MUSCL (limiteur de van Leer) aux faces droites des classes.
+        
+        Args:
+            n (array): Densité en nombre par classe
+            
+        Returns:
+            np.array: Densité reconstruite à la face droite de chaque classe
+        """
+        pentes_gauche = np.diff(n[:-1]) / self.h_centres[:-1]
+        pentes_droite = np.diff(n[1:]) / self.h_centres[1:]
+        
+        # Moyenne harmonique des pentes, nulle aux extrema locaux
+        produit = pentes_gauche * pentes_droite
+        somme = pentes_gauche + pentes_droite
+        pentes = np.where(produit > 0,
+                          2 * produit / np.where(somme == 0, 1, somme), 0)
+        
+        n_faces = n.copy()  # Décentrage amont aux classes extrêmes
+        n_faces[1:-1] += 0.5 * pentes * self.delta_L[1:-1]
+        return n_faces
+    
+    def equations_distribution(self, t, y, profil='lineaire'):
+        """
+        Second membre du bilan de population discrétisé.
+        
+        Args:
+            t (float): Temps
+            y (array): État [n_1, ..., n_N, C]
+            profil (str): Type de profil de température
+            
+        Returns:
+            np.array: Dérivées [dn_1/dt, ..., dn_N/dt, dC/dt]
+        """
+        n = y[:-1]
+        C = y[-1]
+        T_C, T_K, C_star, S, m_T, B, G = self._cinetiques(t, n, C, profil)
+        
+        # Flux de croissance aux faces (B entre par la face gauche)
+        flux = np.empty(self.n_classes + 1)
+        flux[0] = B
+        flux[1:] = G * self.valeurs_faces(n)
+        
+        dy = np.empty_like(y)
+        dy[:-1] = -np.diff(flux) / self.delta_L
+        
+        # Bilan de matière sur le saccharose (même forme que le modèle des moments)
+        m2 = np.dot(n, self.poids_m2)
+        dy[-1] = (-3 * self.k_v * self.rho_cristaux * G * m2
+                  / self.masse_batch * 100)
+        return dy
+    
+    def jacobien_distribution(self, t, y, profil='lineaire'):
+        """
+        Jacobien creux du bilan discrétisé.
+        
+        Le transport est linéarisé par le schéma amont (bidiagonal), complété
+        par la colonne et la ligne de la concentration. Le couplage de la
+        nucléation avec m3 (ligne pleine) est omis: il remplirait entièrement
+        la factorisation LU pour un gain négligeable sur les itérations de Newton.
+        
+        Args:
+            t (float): Temps
+            y (array): État [n_1, ..., n_N, C]
+            profil (str): Type de profil de température
+            
+        Returns:
+            scipy.sparse.csc_matrix: Jacobien (N+1)x(N+1)
+        """
+        N = self.n_classes
+        n = y[:-1]
+        C = y[-1]
+        T_C, T_K, C_star, S, m_T, B, G = self._cinetiques(t, n, C, profil)
+        
+        K = 3 * self.k_v * self.rho_cristaux / self.masse_batch * 100
+        
+        # Transport amont: dn_i/dt ≈ G (n_{i-1} - n_i) / ΔL_i
+        indices = np.arange(N)
+        lignes = [indices, indices[1:]]
+        colonnes = [indices, indices[:-1]]
+        valeurs = [-G / self.delta_L, G / self.delta_L[1:]]
+        
+        if S > 0:
+            dS_dC, dT_dC = self.sensibilites_concentration(C, T_C, profil)
+            terme_exp = np.exp(-self.E_g / (self.thermo.R * T_K))
+            dG_dC = (self.k_g * self.g * S**(self.g - 1) * terme_exp * dS_dC
+                     + G * self.E_g / (self.thermo.R * T_K**2) * dT_dC)
+            dB_dC = self.k_b * self.b * S**(self.b - 1) * m_T**self.j * dS_dC
+            
+            # Dépendance en C via G (et B pour la première classe)
+            faces = np.append(0, self.valeurs_faces(n))
+            colonne = -np.diff(faces) / self.delta_L * dG_dC
+            colonne[0] += dB_dC / self.delta_L[0]
+            lignes.append(indices)
+            colonnes.append(np.full(N, N))
+            valeurs.append(colonne)
+            
+            # Consommation de saccharose
+            lignes.append(np.full(N + 1, N))
+            colonnes.append(np.arange(N + 1))
+            valeurs.append(np.append(-K * G * self.poids_m2,
+                                     -K * np.dot(n, self.poids_m2) * dG_dC))
+        
+        J = sparse.coo_matrix((np.concatenate(valeurs),
+                               (np.concatenate(lignes), np.concatenate(colonnes))),
+                              shape=(N + 1, N + 1))
+        return J.tocsc()
+    
+    def simuler(self, profil='lineaire', n_points=1000, methode='BDF',
+                rtol=1e-4, fichier_reprise=None, intervalle_reprise=1800,
+                temps_calcul_max=None, verbose=True):
+        """
+        Simule la cristallisation batch sur la distribution complète.
+        
+        Args:
+            profil (str): Type de profil ('lineaire', 'exponentiel', 'optimal')
+            n_points (int): Nombre de points de temps
+            methode (str): Méthode implicite solve_ivp ('BDF' ou 'Radau')
+            rtol (float): Tolérance relative de l'intégrateur
+            fichier_reprise (str): Point de reprise (.npz) écrit après chaque
+                segment de intervalle_reprise secondes simulées
+            intervalle_reprise (float): Durée simulée entre deux points de reprise (s)
+            temps_calcul_max (float): Interruption volontaire une fois ce temps
+                de calcul dépassé (s), à reprendre par un nouvel appel
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            bool: True si la simulation est terminée (False si interrompue)
+        """
+        if verbose:
+            print(f"\nSimulation (distribution, {self.n_classes} classes) "
+                  f"avec profil {profil}...")
+        
+        rho_sirop = 1300  # kg/m³ (approximation)
+        self.V_cristalliseur = self.masse_batch / rho_sirop
+        
+        self.temps = np.linspace(0, self.duree, n_points)
+        y0 = np.append(self.distribution_initiale(), self.C_0)
+        
+        # Tolérance absolue à l'échelle de la densité initiale
+        atol = np.full(self.n_classes + 1, 1e-6 * np.max(y0[:-1]))
+        atol[-1] = 1e-8
+        
+        debut = time.perf_counter()
+        if fichier_reprise is not None:
+            empreinte = reprise.signature(
+                noyaux_compiles.parametres_noyau(self), y0, self.temps,
+                self.L_bornes, profil, methode, rtol, self.profil_impose,
+                intervalle_reprise)
+            segments = reprise.integrer_par_segments(
+                self.equations_distribution, (0, self.duree), y0, self.temps,
+                methode, fichier_reprise, intervalle_reprise, empreinte,
+                jac=self.jacobien_distribution, args=(profil,), rtol=rtol, atol=atol,
+                temps_calcul_max=temps_calcul_max)
+            self.statistiques = {
+                'methode': methode,
+                'n_evaluations': segments['n_evaluations'],
+                'n_jacobiens': segments['n_jacobiens'],
+                'n_pas': segments['n_pas'],
+                'temps_calcul': time.perf_counter() - debut,
+            }
+            if not segments['termine']:
+                if verbose:
+                    print(f"  Interrompue à {segments['t']/3600:.2f} h "
+                          f"(reprise: {fichier_reprise})")
+                return False
+            solution = segments['solution'].T
+        else:
+            sol = solve_ivp(self.equations_distribution, (0, self.duree), y0,
+                            method=methode, t_eval=self.temps,
+                            jac=self.jacobien_distribution, args=(profil,),
+                            rtol=rtol, atol=atol)
+            if not sol.success:
+                raise RuntimeError(f"Échec de l'intégration ({methode}): {sol.message}")
+            
+            self.statistiques = {
+                'methode': methode,
+                'n_evaluations': int(sol.nfev),
+                'n_jacobiens': int(sol.njev),
+                'n_pas': None,  # Non disponible avec t_eval
+                'temps_calcul': time.perf_counter() - debut,
+            }
+            solution = sol.y
+        
+        self.distribution = solution[:-1].T
+        self.concentration = solution[-1]
+        self.moments = self.moments_distribution(self.distribution)
+        
+        self.temperature = np.array([self.temperature_etat(t, C, profil)
+                                     for t, C in zip(self.temps, self.concentration)])
+        self.sursaturation = np.array([
+            self.thermo.sursaturation_relative(C, T)
+            for C, T in zip(self.concentration, self.temperature)
+        ])
+        
+        # Caractéristiques finales (mêmes définitions que le modèle des moments)
+        m0_final, m1_final, m2_final = self.moments[-1, :3]
+        if m0_final > 0:
+            self.L_50 = m1_final / m0_final
+            variance = m2_final / m0_final - self.L_50**2
+            self.CV = np.sqrt(variance) / self.L_50 * 100 if variance > 0 else 0
+        
+        if verbose:
+            d10, d50, d90 = self.quantiles_massiques()
+            print(f"  Taille moyenne L50: {self.L_50*1e6:.1f} µm")
+            print(f"  Coefficient de variation CV: {self.CV:.1f}%")
+            print(f"  d10/d50/d90 (masse): {d10*1e6:.1f} / {d50*1e6:.1f} / "
+                  f"{d90*1e6:.1f} µm")
+            print(f"  Solveur {methode}: {self.statistiques['n_evaluations']} "
+                  f"évaluations, {self.statistiques['temps_calcul']*1000:.1f} ms")
+        
+        return True
+    
+    def quantiles_massiques(self, fractions=(0.1, 0.5, 0.9), indice=-1):
+        """
+        Tailles correspondant aux fractions cumulées en masse.
+        
+        Args:
+            fractions (tuple): Fractions cumulées (0-1)
+            indice (int): Indice temporel de la distribution
+            
+        Returns:
+            np.array: Tailles (m)
+        """
+        masse = self.distribution[indice] * self.L_centres**3 * self.delta_L
+        cumul = np.cumsum(masse)
+        if cumul[-1] <= 0:
+            return np.zeros(len(fractions))
+        return np.interp(fractions, cumul / cumul[-1], self.L_bornes[1:])
+    
+    def tracer_distribution(self, titre_supplement=''):
+        """
+        Trace la distribution finale en nombre et en masse.
+        
+        Args:
+            titre_supplement (str): Complément au titre
+        """
+        n_final = self.distribution[-1]
+        masse = n_final * self.L_centres**3 * self.delta_L
+        fraction_masse = masse / np.sum(masse) if np.sum(masse) > 0 else masse
+        
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        
+        axes[0].loglog(self.L_centres * 1e6, np.maximum(n_final, 1e-30),
+                       linewidth=2, color='blue')
+        axes[0].set_xlabel('Taille L (µm)', fontsize=12)
+        axes[0].set_ylabel('n(L) (nombre/(m³·m))', fontsize=12)
+        axes[0].set_title('Densité en nombre', fontsize=13, fontweight='bold')
+        axes[0].grid(True, alpha=0.3)
+        
+        axes[1].semilogx(self.L_centres * 1e6, np.cumsum(fraction_masse) * 100,
+                         linewidth=2, color='green')
+        axes[1].set_xlabel('Taille L (µm)', fontsize=12)
+        axes[1].set_ylabel('Fraction massique cumulée (%)', fontsize=12)
+        axes[1].set_title('Distribution cumulée en masse', fontsize=13,
+                          fontweight='bold')
+        axes[1].grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Distribution des tailles - {titre_supplement}',
+                     fontsize=15, fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'distribution_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module distribution des tailles ===")
+    
+    crist = CristalliseurDistribution(n_classes=500)
+    crist.simuler(profil='lineaire', n_points=500)
+    crist.tracer_distribution(titre_supplement='Profil linéaire')
+    
+    # Batch ensemencé: même semence que le modèle des moments
+    crist_semence = CristalliseurDistribution(n_classes=500)
+    crist_semence.C_0 = 88  # Sirop sursaturé en cours de refroidissement
+    crist_semence.k_g = 1e-5  # Croissance rapide
+    crist_semence.E_g = 20000
+    crist_semence.masse_semence = 50  # kg
+    crist_semence.L_semence = 100e-6  # m
+    crist_semence.simuler(profil='lineaire', n_points=500)
+    crist_semence.tracer_distribution(titre_supplement='Ensemencé')
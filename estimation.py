@@ -0,0 +1,363 @@
+"""
+Module Estimation
+Estimation des paramètres cinétiques à partir de batchs de laboratoire
+(équations de sensibilité directes et moindres carrés)
+Auteur: Projet PIC 2024-2025
+"""
+
+import copy
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+from scipy.optimize import least_squares
+from scipy.stats import t as loi_student
+from cristallisation import CristalliseurBatch
+from parallele import executer_taches, nombre_workers
+
+
+PARAMETRES_CINETIQUES = ('k_b', 'b', 'j', 'k_g', 'g', 'E_g')
+PARAMETRES_LOG = ('k_b', 'k_g')  # Estimés par leur logarithme
+
+
+def vers_parametres(noms, theta):
+    """
+    Valeurs des paramètres à partir des variables d'estimation.
+    
+    Args:
+        noms (tuple): Noms des paramètres estimés
+        theta (array): Variables d'estimation (ln k_b, b, j, ln k_g, g, E_g)
+        
+    Returns:
+        dict: Valeurs des paramètres cinétiques
+    """
+    return {nom: np.exp(valeur) if nom in PARAMETRES_LOG else valeur
+            for nom, valeur in zip(noms, theta)}
+
+
+def derivees_parametres(crist, etat, T_C, g):
+    """
+    Dérivées de la dynamique logarithmique par rapport aux paramètres.
+    
+    B et G étant des lois puissance, chaque ligne de g est proportionnelle
+    à B (ligne m0) ou à G (autres lignes): ∂g/∂θ = g · ∂ln(B ou G)/∂θ.
+    
+    Args:
+        crist (CristalliseurBatch): Cristalliseur (paramètres courants)
+        etat (array): État [ln m0, ..., ln m3, C]
+        T_C (float): Température en °C
+        g (array): Dynamique logarithmique au même point
+        
+    Returns:
+        np.array: Matrice 5x6 ∂g/∂θ dans l'ordre de PARAMETRES_CINETIQUES
+            (k_b et k_g par leur logarithme)
+    """
+    S = crist.thermo.sursaturation_relative(etat[4], T_C)
+    dg_dtheta = np.zeros((5, len(PARAMETRES_CINETIQUES)))
+    if S <= 0:
+        return dg_dtheta
+    
+    ln_m_T = etat[3] + np.log(crist.rho_cristaux)
+    T_K = T_C + 273.15
+    dg_dtheta[0, :3] = g[0] * np.array([1, np.log(S), ln_m_T])
+    dg_dtheta[1:, 3:] = np.outer(g[1:], [1, np.log(S), -1 / (crist.thermo.R * T_K)])
+    return dg_dtheta
+
+
+def simuler_batch(crist, noms, theta, batch, sensibilites=True):
+    """
+    Intègre le modèle des moments (et ses sensibilités) sur un batch.
+    
+    La température mesurée est imposée par interpolation linéaire; l'état
+    initial est celui du premier point de mesure (temps 0).
+    
+    Args:
+        crist (CristalliseurBatch): Cristalliseur nominal
+        noms (tuple): Noms des paramètres estimés
+        theta (array): Variables d'estimation
+        batch (dict): Données du batch ('temps', 'temperature', et
+            'concentration' et/ou 'moments' (n, 4))
+        sensibilites (bool): Intégrer aussi les équations de sensibilité
+        
+    Returns:
+        tuple: (états (n, 5), sensibilités (n, 5, len(noms)) ou None)
+    """
+    crist = copy.copy(crist)
+    for nom, valeur in vers_parametres(noms, theta).items():
+        setattr(crist, nom, valeur)
+    indices = [PARAMETRES_CINETIQUES.index(nom) for nom in noms]
+    p = len(noms)
+    
+    temps = np.asarray(batch['temps'], dtype=float)
+    temperature = np.asarray(batch['temperature'], dtype=float)
+    moments_0 = (np.asarray(batch['moments'])[0] if batch.get('moments') is not None
+                 else crist.moments_initiaux())
+    C_0 = (batch['concentration'][0] if batch.get('concentration') is not None
+           else crist.C_0)
+    z0 = np.append(np.log(moments_0), C_0)
+    
+    def second_membre(t, w):
+        T_C = np.interp(t, temps, temperature)
+        g, J, _ = crist.dynamique_logarithmique(w[:5], T_C)
+        if not sensibilites:
+            return g
+        # Équations de sensibilité directes: dS/dt = J S + ∂g/∂θ
+        S = w[5:].reshape(5, p)
+        dS = J @ S + derivees_parametres(crist, w[:5], T_C, g)[:, indices]
+        return np.concatenate([g, dS.ravel()])
+    
+    def jacobien(t, w):
+        # Jacobien bloc-diagonal (termes de second ordre négligés dans Newton)
+        T_C = np.interp(t, temps, temperature)
+        J = crist.dynamique_logarithmique(w[:5], T_C)[1]
+        if not sensibilites:
+            return J
+        return sparse.block_diag([J, np.kron(J, np.eye(p))]).toarray()
+    
+    # Sensibilités exclues du contrôle d'erreur: elles suivent les pas de l'état
+    w0 = np.append(z0, np.zeros(5 * p)) if sensibilites else z0
+    atol = np.append(np.full(5, 1e-8), np.full(len(w0) - 5, np.inf))
+    try:
+        # Paramètres d'essai proches de la divergence: dépassements sur les
+        # pas rejetés par le solveur, sans avertissement
+        with np.errstate(over='ignore', invalid='ignore'):
+            sol = solve_ivp(second_membre, (temps[0], temps[-1]), w0, method='BDF',
+                            jac=jacobien, t_eval=temps, rtol=1e-6, atol=atol)
+    except ValueError as erreur:  # Jacobien non fini (état divergent)
+        raise RuntimeError(f"Intégration divergente du batch: {erreur}") from erreur
+    if not sol.success:
+        raise RuntimeError(f"Échec de l'intégration du batch: {sol.message}")
+    
+    etats = sol.y[:5].T
+    if not sensibilites:
+        return etats, None
+    return etats, sol.y[5:].T.reshape(len(temps), 5, p)
+
+
+def residus_batch(tache):
+    """
+    Résidus pondérés d'un batch et leur jacobien exact.
+    
+    Fonction de niveau module, exécutable dans un processus séparé.
+    
+    Args:
+        tache (tuple): (crist, noms, theta, batch, sigma_C, sigma_log)
+        
+    Returns:
+        tuple: (résidus (r,), jacobien (r, len(noms)))
+    """
+    crist, noms, theta, batch, sigma_C, sigma_log = tache
+    try:
+        etats, sensibilites = simuler_batch(crist, noms, theta, batch)
+    except RuntimeError:
+        # Paramètres d'essai hors du domaine intégrable: résidus infinis,
+        # least_squares réduit alors sa région de confiance
+        n_mesures = len(batch['temps'])
+        n_residus = ((batch.get('concentration') is not None) * n_mesures
+                     + (batch.get('moments') is not None) * 4 * n_mesures)
+        return np.full(n_residus, np.inf), np.zeros((n_residus, len(noms)))
+    
+    residus, jacobien = [], []
+    if batch.get('concentration') is not None:
+        residus.append((etats[:, 4] - batch['concentration']) / sigma_C)
+        jacobien.append(sensibilites[:, 4, :] / sigma_C)
+    if batch.get('moments') is not None:
+        # Erreur relative sur les moments (écart des logarithmes)
+        ln_moments = np.log(np.asarray(batch['moments']))
+        residus.append(((etats[:, :4] - ln_moments) / sigma_log).ravel())
+        jacobien.append(sensibilites[:, :4, :].reshape(-1, len(noms)) / sigma_log)
+    
+    return np.concatenate(residus), np.vstack(jacobien)
+
+
+class EstimationCinetique:
+    """
+    Estimation de k_b, b, j, k_g, g et E_g sur plusieurs batchs.
+    
+    Les gradients des résidus sont exacts: le modèle des moments est intégré
+    avec ses équations de sensibilité directes. Les batchs sont évalués en
+    parallèle à chaque itération de least_squares, dans un pool de processus
+    créé une fois pour toute l'estimation.
+    """
+    
+    def __init__(self, batchs, cristalliseur=None, parametres=PARAMETRES_CINETIQUES,
+                 sigma_C=0.05, sigma_log=0.05):
+        """
+        Initialisation de l'estimation.
+        
+        Args:
+            batchs (list): Données de laboratoire, un dictionnaire par batch
+                ('temps' (s), 'temperature' (°C), 'concentration' (g/100g)
+                et/ou 'moments' (n, 4))
+            cristalliseur (CristalliseurBatch): Valeurs initiales des paramètres
+            parametres (tuple): Paramètres à estimer
+            sigma_C (float): Écart-type de mesure de concentration (g/100g)
+            sigma_log (float): Écart-type relatif de mesure des moments
+        """
+        self.batchs = batchs
+        self.crist = cristalliseur if cristalliseur is not None else CristalliseurBatch()
+        self.noms = tuple(parametres)
+        self.sigma_C = sigma_C
+        self.sigma_log = sigma_log
+        self.resultats = None
+    
+    def theta_initial(self):
+        """
+        Variables d'estimation au point de départ (valeurs du cristalliseur).
+        
+        Returns:
+            np.array: ln k_b, b, j, ln k_g, g, E_g (paramètres sélectionnés)
+        """
+        valeurs = [getattr(self.crist, nom) for nom in self.noms]
+        return np.array([np.log(v) if nom in PARAMETRES_LOG else v
+                         for nom, v in zip(self.noms, valeurs)], dtype=float)
+    
+    def evaluer(self, theta, n_workers=1, pool=None):
+        """
+        Résidus et jacobien de l'ensemble des batchs.
+        
+        Args:
+            theta (array): Variables d'estimation
+            n_workers (int): Nombre de processus (None: nombre de cœurs)
+            pool (Executor): Pool de processus réutilisé (None: pool créé
+                pour cet appel, ou exécution en série)
+            
+        Returns:
+            tuple: (résidus, jacobien)
+        """
+        taches = [(self.crist, self.noms, theta, batch, self.sigma_C, self.sigma_log)
+                  for batch in self.batchs]
+        resultats = executer_taches(residus_batch, taches, n_workers=n_workers, pool=pool)
+        return (np.concatenate([r[0] for r in resultats]),
+                np.vstack([r[1] for r in resultats]))
+    
+    def estimer(self, n_workers=None, niveau_confiance=0.95, verbose=True):
+        """
+        Ajuste les paramètres par moindres carrés (région de confiance).
+        
+        Args:
+            n_workers (int): Nombre de processus (None: nombre de cœurs; série
+                si un seul batch ou un seul cœur)
+            niveau_confiance (float): Niveau des intervalles de confiance
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            dict: Paramètres, intervalles de confiance et statistiques
+        """
+        if verbose:
+            print(f"\nEstimation de {', '.join(self.noms)} sur "
+                  f"{len(self.batchs)} batchs...")
+        
+        # Les résidus et le jacobien sont calculés ensemble (une intégration)
+        cache = {}
+        
+        def evaluer(theta):
+            cle = theta.tobytes()
+            if cle not in cache:
+                cache.clear()
+                cache[cle] = self.evaluer(theta, n_workers, pool)
+            return cache[cle]
+        
+        # Un seul pool pour toutes les itérations (série avec un seul worker)
+        n_workers = nombre_workers(n_workers, len(self.batchs))
+        debut = time.perf_counter()
+        with (ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1
+              else contextlib.nullcontext()) as pool:
+            resultat = least_squares(lambda theta: evaluer(theta)[0], self.theta_initial(),
+                                     jac=lambda theta: evaluer(theta)[1], x_scale='jac',
+                                     method='trf')
+        duree_calcul = time.perf_counter() - debut
+        
+        # Covariance asymptotique: s² (JᵀJ)⁻¹
+        n_residus, p = resultat.jac.shape
+        ddl = max(n_residus - p, 1)
+        s2 = 2 * resultat.cost / ddl
+        covariance = s2 * np.linalg.pinv(resultat.jac.T @ resultat.jac)
+        ecarts_types = np.sqrt(np.diag(covariance))
+        quantile = loi_student.ppf(0.5 + niveau_confiance / 2, ddl)
+        correlation = covariance / np.outer(ecarts_types, ecarts_types)
+        
+        theta = resultat.x
+        self.resultats = {
+            'parametres': vers_parametres(self.noms, theta),
+            'borne_inf': vers_parametres(self.noms, theta - quantile * ecarts_types),
+            'borne_sup': vers_parametres(self.noms, theta + quantile * ecarts_types),
+            'theta': theta,
+            'covariance': covariance,
+            'correlation': correlation,
+            'cout': resultat.cost,
+            'n_evaluations': resultat.nfev,
+            'statut': resultat.status,
+            'temps_calcul': duree_calcul,
+        }
+        
+        if verbose:
+            print(f"  {resultat.message}")
+            print(f"  Évaluations: {resultat.nfev}, coût final: {resultat.cost:.3e}, "
+                  f"{duree_calcul:.1f} s")
+            print(f"\n  {'Paramètre':<10} {'Valeur':<14} "
+                  f"{'IC ' + str(int(niveau_confiance * 100)) + '%':<30}")
+            for nom in self.noms:
+                print(f"  {nom:<10} {self.resultats['parametres'][nom]:<14.4g} "
+                      f"[{self.resultats['borne_inf'][nom]:.4g}, "
+                      f"{self.resultats['borne_sup'][nom]:.4g}]")
+        
+        return self.resultats
+
+
+def generer_batchs_synthetiques(crist, profils, n_mesures=25, bruit=0.02, graine=0):
+    """
+    Génère des batchs de laboratoire simulés (mesures bruitées).
+    
+    Args:
+        crist (CristalliseurBatch): Cristalliseur portant les vrais paramètres
+        profils (list): Tableaux de température (°C) aux temps de mesure
+        n_mesures (int): Nombre de points de mesure par batch
+        bruit (float): Bruit relatif sur les moments (échelle log)
+        graine (int): Graine du générateur
+        
+    Returns:
+        list: Batchs ('temps', 'temperature', 'concentration', 'moments')
+    """
+    rng = np.random.default_rng(graine)
+    temps = np.linspace(0, crist.duree, n_mesures)
+    theta = [np.log(getattr(crist, nom)) if nom in PARAMETRES_LOG else getattr(crist, nom)
+             for nom in PARAMETRES_CINETIQUES]
+    
+    batchs = []
+    for temperature in profils:
+        batch = {'temps': temps, 'temperature': np.asarray(temperature),
+                 'concentration': np.full(n_mesures, crist.C_0),
+                 'moments': np.tile(crist.moments_initiaux(), (n_mesures, 1))}
+        etats, _ = simuler_batch(crist, PARAMETRES_CINETIQUES, theta, batch,
+                                 sensibilites=False)
+        batch['concentration'] = etats[:, 4] + rng.normal(0, 0.01, n_mesures)
+        batch['moments'] = np.exp(etats[:, :4] + rng.normal(0, bruit, (n_mesures, 4)))
+        batch['moments'][0] = np.exp(etats[0, :4])  # Ensemencement connu
+        batch['concentration'][0] = crist.C_0
+        batchs.append(batch)
+    return batchs
+
+
+if __name__ == "__main__":
+    print("=== Test du module estimation ===")
+    
+    # Dix batchs simulés avec des profils de refroidissement différents
+    vrai = CristalliseurBatch()
+    vrai.C_0 = 88
+    vrai.k_g = 1e-5
+    vrai.E_g = 20000
+    temps = np.linspace(0, vrai.duree, 25)
+    profils = [vrai.T_0 - (vrai.T_0 - vrai.T_f) * (temps / vrai.duree)**puissance
+               for puissance in np.linspace(0.5, 2.0, 10)]
+    batchs = generer_batchs_synthetiques(vrai, profils)
+    
+    # Point de départ éloigné des vraies valeurs
+    depart = copy.copy(vrai)
+    depart.k_b, depart.b, depart.j = 3 * vrai.k_b, 2.2, 0.6
+    depart.k_g, depart.g, depart.E_g = vrai.k_g / 3, 1.3, 25000
+    
+    estimation = EstimationCinetique(batchs, depart)
+    estimation.estimer(n_workers=None)
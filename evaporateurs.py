@@ -8,6 +8,7 @@ import numpy as np
 from scipy.optimize import fsolve
 import matplotlib.pyplot as plt
 from thermodynamique import ProprietesThermodynamiques
+from rendu import sauvegarder_figure
 
 
 class EvaporateurMultiplesEffets:
@@ -51,6 +52,7 @@ class EvaporateurMultiplesEffets:
         self.P = np.zeros(n_effets)  # Pressions
         self.A = np.zeros(n_effets)  # Surfaces d'échange
         self.S = 0  # Débit vapeur de chauffe
+        self.converge = False  # Convergence de la dernière résolution
         
     def calculer_U_effectif(self):
         """
@@ -107,8 +109,9 @@ class EvaporateurMultiplesEffets:
         
         # Résolution du système
         solution = fsolve(self.equations_systeme, x0, full_output=True)
+        self.converge = solution[2] == 1
         
-        if solution[2] != 1:
+        if not self.converge:
             print("Attention: La convergence n'est pas parfaite")
         
         # Extraction des résultats
@@ -264,9 +267,17 @@ class EvaporateurMultiplesEffets:
         print(f"Concentration finale: {self.x[-1]*100:.1f}%")
         print("="*70)
     
-    def tracer_profils(self):
+    def tracer_profils(self, nom_fichier='profils_evaporateurs.png'):
         """
         Trace les profils de température, concentration et pression.
+        
+        La figure est fermée après sauvegarde.
+        
+        Args:
+            nom_fichier (str): Fichier image
+            
+        Returns:
+            str: Fichier sauvegardé
         """
         effets = np.arange(1, self.n_effets + 1)
         
@@ -301,9 +312,7 @@ class EvaporateurMultiplesEffets:
         axes[1, 1].grid(True, alpha=0.3, axis='y')
         
         plt.tight_layout()
-        plt.savefig('profils_evaporateurs.png', 
-                   dpi=300, bbox_inches='tight')
-        print(f"\nGraphique sauvegardé: profils_evaporateurs.png")
+        return sauvegarder_figure(fig, nom_fichier)
 
 
 def test_evaporateur():
@@ -0,0 +1,282 @@
+"""
+Module Flotte de Cristalliseurs
+Simulation vectorisée de batchs décalés alimentés par un même train d'évaporation
+Auteur: Projet PIC 2024-2025
+"""
+
+import copy
+import time
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+import matplotlib.pyplot as plt
+from cristallisation import CristalliseurBatch
+from rendu import sauvegarder_figure
+
+
+def recettes_decalees(n_batchs, decalage, profil='lineaire', **attributs):
+    """
+    Recettes de batchs identiques démarrant à intervalles réguliers.
+    
+    Args:
+        n_batchs (int): Nombre de batchs
+        decalage (float): Intervalle entre deux démarrages (s)
+        profil (str): Profil de refroidissement
+        **attributs: Attributs communs du cristalliseur (ex. C_0=88)
+        
+    Returns:
+        list: Recettes (voir FlotteCristalliseurs)
+    """
+    return [dict(attributs, debut=i * decalage, profil=profil) for i in range(n_batchs)]
+
+
+class FlotteCristalliseurs:
+    """
+    Flotte de cristalliseurs batch décalés, intégrée comme un seul système d'EDO.
+    
+    Chaque batch a son heure de démarrage, son profil et ses attributs
+    (recette, semence); l'état de la flotte est un tableau (N, 5) de moments
+    logarithmiques et de concentrations dont le second membre est évalué en
+    une passe par CristalliseurBatch.dynamique_logarithmique. Les batchs
+    étant indépendants, ils sont intégrés ensemble en temps local (depuis
+    leur démarrage), puis décalés en temps usine; un batch est figé après sa
+    fin et l'intégration est découpée aux fins de batch.
+    """
+    
+    def __init__(self, cristalliseur=None, recettes=None):
+        """
+        Initialisation de la flotte.
+        
+        Args:
+            cristalliseur (CristalliseurBatch): Cristalliseur nominal
+            recettes (list): Un dictionnaire par batch: 'debut' (s), 'profil'
+                et attributs du cristalliseur à modifier (ex. 'C_0', 'T_f',
+                'duree', 'masse_semence')
+        """
+        self.crist = cristalliseur if cristalliseur is not None else CristalliseurBatch()
+        self.recettes = list(recettes) if recettes is not None else []
+        
+        # Résultats
+        self.temps = None
+        self.moments = None  # (n_temps, N, 4)
+        self.concentration = None  # (n_temps, N)
+        self.temperature = None  # (n_temps, N)
+        self.L_50 = None  # (N,) en fin de batch
+        self.CV = None
+        self.statistiques = {}
+    
+    def cristalliseur_flotte(self):
+        """
+        Cristalliseur dont les attributs des recettes sont des tableaux (N,).
+        
+        Returns:
+            tuple: (cristalliseur, débuts (N,), durées (N,), profils)
+        """
+        crist = copy.copy(self.crist)
+        n = len(self.recettes)
+        noms = {nom for recette in self.recettes for nom in recette} - {'debut', 'profil'}
+        for nom in sorted(noms):
+            if not hasattr(crist, nom):
+                raise AttributeError(f"Paramètre inconnu du cristalliseur: {nom}")
+            valeur_nominale = getattr(self.crist, nom)
+            setattr(crist, nom, np.array([recette.get(nom, valeur_nominale)
+                                          for recette in self.recettes], dtype=float))
+        
+        debuts = np.array([recette.get('debut', 0.0) for recette in self.recettes],
+                          dtype=float)
+        durees = np.broadcast_to(np.asarray(crist.duree, dtype=float), (n,))
+        profils = [recette.get('profil', 'lineaire') for recette in self.recettes]
+        if 'sursaturation_constante' in profils:
+            raise ValueError("Le profil 'sursaturation_constante' requiert "
+                             "la simulation individuelle des batchs")
+        return crist, debuts, durees, profils
+    
+    def simuler(self, n_points=1000, methode='BDF', rtol=1e-6, atol=1e-8,
+                verbose=True):
+        """
+        Simule la flotte sur l'horizon couvrant tous les batchs.
+        
+        Args:
+            n_points (int): Nombre de points de temps communs
+            methode (str): Méthode implicite solve_ivp ('BDF' ou 'Radau')
+            rtol (float): Tolérance relative
+            atol (float): Tolérance absolue
+            verbose (bool): Affichage des résultats
+        """
+        crist, debuts, durees, profils = self.cristalliseur_flotte()
+        n = len(self.recettes)
+        fins = debuts + durees
+        if verbose:
+            print(f"\nSimulation de la flotte ({n} batchs sur "
+                  f"{fins.max()/3600:.1f} h)...")
+        
+        masques = {profil: np.array([p == profil for p in profils])
+                   for profil in set(profils)}
+        
+        def temperatures(temps_local):
+            # Température du profil de chaque batch à son temps local (T_0 avant
+            # démarrage, température finale après la fin)
+            temps_local = np.clip(temps_local, 0, durees)
+            T_C = np.empty(np.broadcast(temps_local, durees).shape)
+            for profil, masque in masques.items():
+                T_C[..., masque] = np.broadcast_to(
+                    crist.temperature_profil(temps_local, profil), T_C.shape)[..., masque]
+            return T_C
+        
+        y0 = np.broadcast_to(crist.moments_initiaux(), (n, 4))
+        C_0 = np.broadcast_to(np.asarray(crist.C_0, dtype=float), (n,))
+        z = np.column_stack([np.log(y0), C_0]).ravel()
+        blocs = (np.arange(n), np.arange(n + 1))
+        
+        # Les batchs étant indépendants, la flotte est intégrée en temps local
+        # (depuis le démarrage de chaque batch), découpé aux fins de batch
+        bornes = np.unique(np.concatenate([[0.0], durees]))
+        segments = []
+        compteurs = np.zeros(3, dtype=int)  # évaluations, jacobiens, pas
+        
+        debut = time.perf_counter()
+        for a, b in zip(bornes[:-1], bornes[1:]):
+            actif = durees > 0.5 * (a + b)
+            
+            def second_membre(t, z):
+                g = crist.dynamique_logarithmique(z.reshape(n, 5), temperatures(t))[0]
+                return np.where(actif[:, None], g, 0.0).ravel()
+            
+            def jacobien(t, z):
+                J = crist.dynamique_logarithmique(z.reshape(n, 5), temperatures(t))[1]
+                J = np.where(actif[:, None, None], J, 0.0)
+                return sparse.bsr_matrix((J, *blocs), shape=(5 * n, 5 * n))
+            
+            sol = solve_ivp(second_membre, (a, b), z, method=methode, jac=jacobien,
+                            rtol=rtol, atol=atol, dense_output=True)
+            if not sol.success:
+                raise RuntimeError(f"Échec de l'intégration de la flotte sur "
+                                   f"[{a:.0f}, {b:.0f}] s: {sol.message}")
+            segments.append((a, b, sol.sol))
+            z = sol.y[:, -1]
+            compteurs += [sol.nfev, sol.njev, len(sol.t) - 1]
+        
+        self.statistiques = {
+            'methode': methode,
+            'n_evaluations': int(compteurs[0]),
+            'n_jacobiens': int(compteurs[1]),
+            'n_pas': int(compteurs[2]),
+            'temps_calcul': time.perf_counter() - debut,
+        }
+        
+        # Trajectoires en temps usine: décalage du temps local de chaque batch
+        self.temps = np.linspace(0, fins.max(), n_points)
+        temps_local = np.clip(self.temps[:, None] - debuts, 0, durees)
+        etats = np.empty((n_points, n, 5))
+        for i in range(n):
+            for a, b, sortie_dense in segments:
+                dans_segment = (temps_local[:, i] >= a) & (temps_local[:, i] <= b)
+                if np.any(dans_segment):
+                    etats[dans_segment, i] = sortie_dense(
+                        temps_local[dans_segment, i])[5 * i:5 * i + 5].T
+        self.moments = np.exp(etats[..., :4])
+        self.concentration = etats[..., 4]
+        self.temperature = temperatures(temps_local)
+        self.debuts, self.fins = debuts, fins
+        self.masse_batch = np.broadcast_to(np.asarray(crist.masse_batch, dtype=float), (n,))
+        
+        # Caractéristiques en fin de batch (état figé après la fin)
+        m0, m1, m2, m3 = np.exp(z.reshape(n, 5)[:, :4]).T
+        self.L_50 = m1 / m0
+        self.CV = np.sqrt(np.maximum(m2 * m0 / m1**2 - 1, 0)) * 100
+        rho_sirop = 1300  # kg/m³ (approximation)
+        self.masse_cristaux = crist.k_v * crist.rho_cristaux * m3 * self.masse_batch / rho_sirop
+        
+        if verbose:
+            print(f"  L50: {self.L_50.min()*1e6:.2f} - {self.L_50.max()*1e6:.2f} µm, "
+                  f"CV: {self.CV.min():.1f} - {self.CV.max():.1f}%")
+            print(f"  Cristaux produits: {self.masse_cristaux.sum():.1f} kg")
+            print(f"  Solveur {methode}: {self.statistiques['n_evaluations']} "
+                  f"évaluations, {self.statistiques['n_pas']} pas, "
+                  f"{self.statistiques['temps_calcul']*1000:.1f} ms")
+    
+    def besoin_sirop(self, temps=None):
+        """
+        Masse cumulée de sirop soutirée au train d'évaporation.
+        
+        Chaque batch prélève sa masse de sirop à son démarrage.
+        
+        Args:
+            temps (array): Instants (s) (défaut: grille de la simulation)
+            
+        Returns:
+            np.array: Masse cumulée de sirop (kg)
+        """
+        temps = self.temps if temps is None else np.asarray(temps, dtype=float)
+        return (self.masse_batch * (temps[:, None] >= self.debuts)).sum(axis=1)
+    
+    def tracer_resultats(self, titre_supplement=''):
+        """
+        Trace les trajectoires des batchs et le besoin en sirop de la flotte.
+        
+        Args:
+            titre_supplement (str): Complément au titre
+        """
+        temps_h = self.temps / 3600
+        n = len(self.recettes)
+        couleurs = plt.cm.viridis(np.linspace(0, 1, n))
+        
+        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        for i in range(n):
+            en_cours = (self.temps >= self.debuts[i]) & (self.temps <= self.fins[i])
+            axes[0, 0].plot(temps_h[en_cours], self.temperature[en_cours, i],
+                            color=couleurs[i], linewidth=1.5)
+            axes[0, 1].plot(temps_h[en_cours], self.concentration[en_cours, i],
+                            color=couleurs[i], linewidth=1.5)
+        axes[0, 0].set_ylabel('Température (°C)', fontsize=12)
+        axes[0, 0].set_title('Profils de refroidissement', fontsize=13, fontweight='bold')
+        axes[0, 1].set_ylabel('Concentration (g/100g)', fontsize=12)
+        axes[0, 1].set_title('Concentration', fontsize=13, fontweight='bold')
+        
+        axes[1, 0].bar(np.arange(1, n + 1), self.L_50 * 1e6, color=couleurs)
+        axes[1, 0].set_xlabel('Batch', fontsize=12)
+        axes[1, 0].set_ylabel('Taille moyenne L50 (µm)', fontsize=12)
+        axes[1, 0].set_title('Taille moyenne en fin de batch', fontsize=13,
+                             fontweight='bold')
+        
+        axes[1, 1].step(temps_h, self.besoin_sirop() / 1000, where='post',
+                        color='blue', linewidth=2)
+        axes[1, 1].set_ylabel('Sirop soutiré cumulé (t)', fontsize=12)
+        axes[1, 1].set_title("Besoin en sirop du train d'évaporation", fontsize=13,
+                             fontweight='bold')
+        
+        for ax in (axes[0, 0], axes[0, 1], axes[1, 1]):
+            ax.set_xlabel('Temps (h)', fontsize=12)
+        for ax in axes.flat:
+            ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Flotte de {n} cristalliseurs {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'flotte_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module flotte de cristalliseurs ===")
+    
+    crist = CristalliseurBatch()
+    crist.C_0 = 88  # Sirop sursaturé en cours de refroidissement
+    crist.k_g = 1e-5  # Croissance rapide
+    crist.E_g = 20000
+    
+    # Coût d'une flotte de 1 et de 50 batchs décalés d'une heure
+    for n_batchs in (1, 50):
+        flotte = FlotteCristalliseurs(crist, recettes_decalees(n_batchs, 3600))
+        flotte.simuler(n_points=500)
+    
+    # Flotte hétérogène: profils, recettes et semences différents
+    recettes = recettes_decalees(8, 1800)
+    for i, recette in enumerate(recettes):
+        recette['profil'] = ('lineaire', 'exponentiel', 'optimal')[i % 3]
+        recette['masse_semence'] = 10.0 * i  # kg
+        recette['T_f'] = 30 + i
+    flotte = FlotteCristalliseurs(crist, recettes)
+    flotte.simuler(n_points=1000)
+    flotte.tracer_resultats(titre_supplement='Batchs décalés')
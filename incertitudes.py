@@ -0,0 +1,206 @@
+"""
+Module Incertitudes
+Propagation Monte Carlo des incertitudes sur les cinétiques de cristallisation
+Auteur: Projet PIC 2024-2025
+"""
+
+import copy
+import time
+import numpy as np
+from scipy.stats import qmc
+import matplotlib.pyplot as plt
+from cristallisation import CristalliseurBatch, simuler_lot
+from parallele import executer_taches
+from rendu import sauvegarder_figure
+
+
+def _simuler_lot(tache):
+    """Tâche de pool: simuler_lot(*tache)."""
+    return simuler_lot(*tache)
+
+
+def _simuler_echantillon(tache):
+    """
+    Tâche de pool: simulation individuelle d'un échantillon.
+    
+    Args:
+        tache (tuple): (cristalliseur, noms, valeurs, profil)
+        
+    Returns:
+        tuple: (L50 en m, CV en %)
+    """
+    cristalliseur, noms, valeurs, profil = tache
+    crist = copy.copy(cristalliseur)
+    for nom, valeur in zip(noms, valeurs):
+        setattr(crist, nom, valeur)
+    crist.simuler(profil=profil, n_points=2, methode='LSODA', verbose=False)
+    return crist.L_50, crist.CV
+
+
+class AnalyseIncertitudes:
+    """
+    Propagation des incertitudes des paramètres cinétiques sur L50 et CV.
+    
+    Les constantes k_b et k_g sont échantillonnées en échelle logarithmique
+    entre valeur/facteur et valeur·facteur; les ordres b, g et l'énergie
+    d'activation E_g uniformément à ±variation autour de leur valeur.
+    """
+    
+    def __init__(self, cristalliseur=None, facteur=3.0, variation=0.2):
+        """
+        Initialisation des plages d'incertitude.
+        
+        Args:
+            cristalliseur (CristalliseurBatch): Cristalliseur nominal
+            facteur (float): Facteur d'incertitude sur k_b et k_g
+            variation (float): Variation relative sur b, g et E_g
+        """
+        self.crist = cristalliseur if cristalliseur is not None else CristalliseurBatch()
+        
+        # Paramètre: (borne inférieure, borne supérieure, échelle)
+        self.plages = {}
+        for nom in ('k_b', 'k_g'):
+            valeur = getattr(self.crist, nom)
+            self.plages[nom] = (valeur / facteur, valeur * facteur, 'log')
+        for nom in ('b', 'g', 'E_g'):
+            valeur = getattr(self.crist, nom)
+            self.plages[nom] = (valeur * (1 - variation), valeur * (1 + variation),
+                                'lineaire')
+        
+        self.resultats = None
+    
+    def echantillonner(self, n_echantillons, methode='lhs', graine=0):
+        """
+        Tire les échantillons des paramètres incertains.
+        
+        Args:
+            n_echantillons (int): Nombre d'échantillons
+            methode (str): 'lhs' (hypercube latin) ou 'sobol'
+            graine (int): Graine du générateur
+            
+        Returns:
+            np.array: Échantillons (n_echantillons, nombre de paramètres)
+        """
+        d = len(self.plages)
+        if methode == 'lhs':
+            generateur = qmc.LatinHypercube(d=d, seed=graine)
+        elif methode == 'sobol':
+            generateur = qmc.Sobol(d=d, scramble=True, seed=graine)
+        else:
+            raise ValueError(f"Méthode d'échantillonnage inconnue: {methode}")
+        u = generateur.random(n_echantillons)
+        
+        echantillons = np.zeros_like(u)
+        for k, (bas, haut, echelle) in enumerate(self.plages.values()):
+            if echelle == 'log':
+                echantillons[:, k] = np.exp(np.log(bas) + u[:, k] * np.log(haut / bas))
+            else:
+                echantillons[:, k] = bas + u[:, k] * (haut - bas)
+        return echantillons
+    
+    def propager(self, n_echantillons=5000, profil='lineaire', echantillonnage='lhs',
+                 integration='vectorisee', n_workers=1, taille_lot=1000, graine=0,
+                 verbose=True):
+        """
+        Propage les incertitudes par Monte Carlo.
+        
+        Args:
+            n_echantillons (int): Nombre d'échantillons
+            profil (str): Profil de refroidissement
+            echantillonnage (str): 'lhs' ou 'sobol'
+            integration (str): 'vectorisee' (lots intégrés comme un système
+                empilé) ou 'individuelle' (une simulation par échantillon,
+                nécessaire pour le profil 'sursaturation_constante')
+            n_workers (int): Nombre de processus (None: nombre de cœurs)
+            taille_lot (int): Échantillons par système empilé
+            graine (int): Graine du générateur
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            dict: Échantillons, L50 (µm), CV (%) et percentiles
+        """
+        if verbose:
+            print(f"\nPropagation des incertitudes ({n_echantillons} échantillons, "
+                  f"{echantillonnage}, intégration {integration})...")
+        
+        noms = list(self.plages)
+        echantillons = self.echantillonner(n_echantillons, echantillonnage, graine)
+        self.crist.V_cristalliseur = self.crist.masse_batch / 1300
+        
+        debut = time.perf_counter()
+        if integration == 'vectorisee':
+            lots = [(self.crist, noms, echantillons[i:i + taille_lot], profil)
+                    for i in range(0, n_echantillons, taille_lot)]
+            resultats_lots = executer_taches(_simuler_lot, lots, n_workers=n_workers)
+            L_50 = np.concatenate([r[0] for r in resultats_lots])
+            CV = np.concatenate([r[1] for r in resultats_lots])
+        elif integration == 'individuelle':
+            taches = [(self.crist, noms, valeurs, profil) for valeurs in echantillons]
+            L_50, CV = np.array(executer_taches(_simuler_echantillon, taches,
+                                                n_workers=n_workers)).T
+        else:
+            raise ValueError(f"Mode d'intégration inconnu: {integration}")
+        duree_calcul = time.perf_counter() - debut
+        
+        niveaux = [5, 25, 50, 75, 95]
+        self.resultats = {
+            'noms': noms,
+            'echantillons': echantillons,
+            'L50': L_50 * 1e6,  # µm
+            'CV': CV,
+            'niveaux': niveaux,
+            'percentiles_L50': np.percentile(L_50 * 1e6, niveaux),
+            'percentiles_CV': np.percentile(CV, niveaux),
+            'temps_calcul': duree_calcul,
+        }
+        
+        if verbose:
+            print(f"  Temps de calcul: {duree_calcul:.1f} s")
+            print(f"\n  {'Percentile':<12} {'L50 (µm)':<12} {'CV (%)':<10}")
+            for niveau, L, cv in zip(niveaux, self.resultats['percentiles_L50'],
+                                     self.resultats['percentiles_CV']):
+                print(f"  P{niveau:<11} {L:<12.3f} {cv:<10.1f}")
+        
+        return self.resultats
+    
+    def tracer_distributions(self, titre_supplement=''):
+        """
+        Trace les histogrammes de L50 et CV.
+        
+        Args:
+            titre_supplement (str): Complément au titre
+        """
+        r = self.resultats
+        
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        for ax, cle, etiquette, couleur in [
+            (axes[0], 'L50', 'Taille moyenne L50 (µm)', 'blue'),
+            (axes[1], 'CV', 'Coefficient de variation CV (%)', 'green'),
+        ]:
+            ax.hist(r[cle], bins=50, color=couleur, alpha=0.7, edgecolor='black')
+            for valeur, style in zip(r[f'percentiles_{cle}'][[0, 2, 4]],
+                                     [':', '--', ':']):
+                ax.axvline(valeur, color='red', linestyle=style, linewidth=2)
+            ax.set_xlabel(etiquette, fontsize=12)
+            ax.set_ylabel("Nombre d'échantillons", fontsize=12)
+            ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Propagation des incertitudes (P5/P50/P95) {titre_supplement}',
+                     fontsize=15, fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'incertitudes_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module incertitudes ===")
+    
+    crist = CristalliseurBatch()
+    crist.C_0 = 88  # Sirop sursaturé en cours de refroidissement
+    crist.k_g = 1e-5  # Croissance rapide
+    crist.E_g = 20000
+    
+    analyse = AnalyseIncertitudes(crist, facteur=3.0, variation=0.2)
+    analyse.propager(n_echantillons=5000, profil='lineaire', n_workers=None)
+    analyse.tracer_distributions(titre_supplement='Profil linéaire')
@@ -71,6 +71,9 @@ def partie1_evaporation():
     print("\nAnalyse 3: Impact du débit d'alimentation")
     analyse.analyse_debit_alimentation(variation=0.20, n_points=15)
     
+    # Rendu différé des graphiques des quatre analyses, en parallèle
+    analyse.tracer_resultats(backend='processus')
+    
     return evap
 
 
@@ -156,7 +159,7 @@ def partie3_integration_optimisation(evap, crist_dims):
     print("\n" + "-" * 60)
     print("COMPARAISON DES CONFIGURATIONS")
     print("-" * 60)
-    eco.comparer_configurations()
+    eco.comparer_configurations(tracer=True)
 
 
 def generer_rapport_synthese(evap, crist_dims, resultats_eco):
@@ -0,0 +1,251 @@
+"""
+Module Noyaux Compilés
+Second membre et jacobien du modèle des moments compilés par Numba
+Auteur: Projet PIC 2024-2025
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:  # Numba optionnel: mêmes noyaux interprétés en Python
+    NUMBA_DISPONIBLE = False
+    
+    def njit(*args, **kwargs):
+        """Décorateur neutre remplaçant numba.njit."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fonction: fonction
+
+
+# Codes des profils de température (branches du noyau)
+PROFILS = {
+    'lineaire': 0,
+    'exponentiel': 1,
+    'optimal': 2,
+    'impose': 3,
+    'sursaturation_constante': 4,
+}
+
+# Ordre des paramètres du vecteur passé aux noyaux
+PARAMETRES = ('k_b', 'b', 'j', 'k_g', 'g', 'E_g', 'R', 'rho_cristaux', 'k_v',
+              'masse_batch', 'T_0', 'T_f', 'duree', 'S_cible')
+
+
+def parametres_noyau(cristalliseur):
+    """
+    Vecteur des paramètres d'un cristalliseur dans l'ordre de PARAMETRES.
+    
+    Args:
+        cristalliseur (CristalliseurBatch): Cristalliseur (paramètres scalaires)
+        
+    Returns:
+        np.array: Paramètres
+    """
+    valeurs = [cristalliseur.thermo.R if nom == 'R' else getattr(cristalliseur, nom)
+               for nom in PARAMETRES]
+    return np.array(valeurs, dtype=float)
+
+
+def arguments_noyau(cristalliseur, profil, echelle_log=False):
+    """
+    Arguments supplémentaires des noyaux pour un cristalliseur et un profil.
+    
+    Args:
+        cristalliseur (CristalliseurBatch): Cristalliseur
+        profil (str): Type de profil de température
+        echelle_log (bool): Moments représentés par leur logarithme
+        
+    Returns:
+        tuple: (paramètres, code du profil, temps imposés, T imposées, echelle_log)
+    """
+    if profil not in PROFILS:
+        raise ValueError(f"Profil non compilé: {profil}")
+    if profil == 'impose':
+        temps, T = (np.asarray(v, dtype=float) for v in cristalliseur.profil_impose)
+    else:
+        temps = T = np.zeros(1)
+    return (parametres_noyau(cristalliseur), PROFILS[profil], temps, T,
+            bool(echelle_log))
+
+
+@njit(cache=True)
+def solubilite(T_C):
+    """Solubilité du saccharose C* (g/100g), corrélation de thermodynamique.py."""
+    return 64.18 + 0.1337 * T_C + 5.52e-3 * T_C**2 - 9.73e-6 * T_C**3
+
+
+@njit(cache=True)
+def derivee_solubilite(T_C):
+    """Dérivée dC*/dT (g/100g/°C)."""
+    return 0.1337 + 2 * 5.52e-3 * T_C - 3 * 9.73e-6 * T_C**2
+
+
+@njit(cache=True)
+def temperature(t, C, p, code, temps_impose, T_impose):
+    """
+    Température du profil de refroidissement (mêmes formules que CristalliseurBatch).
+    
+    Args:
+        t (float): Temps (s)
+        C (float): Concentration (g/100g)
+        p (array): Paramètres (ordre de PARAMETRES)
+        code (int): Code du profil (PROFILS)
+        temps_impose (array): Temps du profil imposé (s)
+        T_impose (array): Températures du profil imposé (°C)
+        
+    Returns:
+        float: Température en °C
+    """
+    T_0, T_f, duree, S_cible = p[10], p[11], p[12], p[13]
+    if code == 0:
+        return T_0 - (T_0 - T_f) / duree * t
+    elif code == 1:
+        return T_f + (T_0 - T_f) * np.exp(-0.0003 * t)
+    elif code == 3:
+        return np.interp(t, temps_impose, T_impose)
+    elif code == 4:
+        # Inversion de la solubilité par Newton, bornée entre T_f et T_0
+        C_star = C / (1 + S_cible)
+        T_C = T_0
+        for _ in range(50):
+            correction = (solubilite(T_C) - C_star) / derivee_solubilite(T_C)
+            T_C = T_C - correction
+            if abs(correction) < 1e-10:
+                break
+        return min(max(T_C, T_f), T_0)
+    else:
+        return T_0 - (T_0 - T_f) * (t / duree)**0.8
+
+
+@njit(cache=True)
+def derivees(t, z, p, code, temps_impose, T_impose, echelle_log):
+    """
+    Second membre du modèle des moments au format solve_ivp.
+    
+    Args:
+        t (float): Temps (s)
+        z (array): État [m0, ..., C] ou [ln m0, ..., C]
+        p (array): Paramètres (ordre de PARAMETRES)
+        code (int): Code du profil (PROFILS)
+        temps_impose (array): Temps du profil imposé (s)
+        T_impose (array): Températures du profil imposé (°C)
+        echelle_log (bool): Moments représentés par leur logarithme
+        
+    Returns:
+        np.array: Dérivées de l'état
+    """
+    k_b, b, j, k_g, g, E_g, R, rho_c, k_v, masse = p[0], p[1], p[2], p[3], p[4], \
+        p[5], p[6], p[7], p[8], p[9]
+    m = np.empty(4)
+    for k in range(4):
+        m[k] = np.exp(z[k]) if echelle_log else z[k]
+    C = z[4]
+    
+    T_C = temperature(t, C, p, code, temps_impose, T_impose)
+    C_star = solubilite(T_C)
+    S = max((C - C_star) / C_star, 0.0)
+    m_T = m[3] * rho_c if m[3] > 0 else 1e-6
+    
+    B = k_b * S**b * m_T**j
+    G = k_g * S**g * np.exp(-E_g / (R * (T_C + 273.15)))
+    
+    dy = np.empty(5)
+    dy[0] = B
+    dy[1] = G * m[0]
+    dy[2] = 2 * G * m[1]
+    dy[3] = 3 * G * m[2]
+    dy[4] = -3 * k_v * rho_c * G * m[2] / masse * 100
+    if echelle_log:
+        for k in range(4):
+            dy[k] /= m[k]
+    return dy
+
+
+@njit(cache=True)
+def derivees_odeint(y, t, p, code, temps_impose, T_impose):
+    """Second membre au format odeint (variables linéaires)."""
+    return derivees(t, y, p, code, temps_impose, T_impose, False)
+
+
+@njit(cache=True)
+def jacobien(t, z, p, code, temps_impose, T_impose, echelle_log):
+    """
+    Jacobien analytique du modèle des moments au format solve_ivp.
+    
+    Args:
+        t (float): Temps (s)
+        z (array): État [m0, ..., C] ou [ln m0, ..., C]
+        p (array): Paramètres (ordre de PARAMETRES)
+        code (int): Code du profil (PROFILS)
+        temps_impose (array): Temps du profil imposé (s)
+        T_impose (array): Températures du profil imposé (°C)
+        echelle_log (bool): Moments représentés par leur logarithme
+        
+    Returns:
+        np.array: Matrice 5x5 du jacobien
+    """
+    k_b, b, j, k_g, g, E_g, R, rho_c, k_v, masse = p[0], p[1], p[2], p[3], p[4], \
+        p[5], p[6], p[7], p[8], p[9]
+    T_0, T_f, S_cible = p[10], p[11], p[13]
+    m = np.empty(4)
+    for k in range(4):
+        m[k] = np.exp(z[k]) if echelle_log else z[k]
+    m0, m1, m2, m3, C = m[0], m[1], m[2], m[3], z[4]
+    
+    T_C = temperature(t, C, p, code, temps_impose, T_impose)
+    T_K = T_C + 273.15
+    C_star = solubilite(T_C)
+    S = (C - C_star) / C_star
+    m_T = m3 * rho_c if m3 > 0 else 1e-6
+    terme_exp = np.exp(-E_g / (R * T_K))
+    S_pos = max(S, 0.0)
+    G = k_g * S_pos**g * terme_exp
+    K = 3 * k_v * rho_c / masse * 100
+    
+    J = np.zeros((5, 5))
+    dF_dT = np.zeros(5)
+    if S > 0:
+        dS_dC = 1 / C_star
+        dS_dT = -C / C_star**2 * derivee_solubilite(T_C)
+        dB_dS = k_b * b * S**(b - 1) * m_T**j
+        dG_dS = k_g * g * S**(g - 1) * terme_exp
+        if m3 > 0:
+            J[0, 3] = j * (k_b * S**b * m_T**j) / m3
+        
+        dG_dC = dG_dS * dS_dC
+        J[0, 4] = dB_dS * dS_dC
+        J[1, 4] = m0 * dG_dC
+        J[2, 4] = 2 * m1 * dG_dC
+        J[3, 4] = 3 * m2 * dG_dC
+        J[4, 2] = -K * G
+        J[4, 4] = -K * m2 * dG_dC
+        
+        dG_dT = dG_dS * dS_dT + G * E_g / (R * T_K**2)
+        dF_dT[0] = dB_dS * dS_dT
+        dF_dT[1] = m0 * dG_dT
+        dF_dT[2] = 2 * m1 * dG_dT
+        dF_dT[3] = 3 * m2 * dG_dT
+        dF_dT[4] = -K * m2 * dG_dT
+    J[1, 0] = G
+    J[2, 1] = 2 * G
+    J[3, 2] = 3 * G
+    
+    # Température dépendant de l'état (profil à sursaturation constante)
+    if code == 4 and T_f < T_C < T_0:
+        dT_dC = 1 / ((1 + S_cible) * derivee_solubilite(T_C))
+        for k in range(5):
+            J[k, 4] += dF_dT[k] * dT_dC
+    
+    if echelle_log:
+        # Changement de variables z = ln m : J_z = D⁻¹ J D - diag(f/m)
+        f = derivees(t, z, p, code, temps_impose, T_impose, True)
+        for i in range(5):
+            for k in range(5):
+                e_i = m[i] if i < 4 else 1.0
+                e_k = m[k] if k < 4 else 1.0
+                J[i, k] = J[i, k] * e_k / e_i
+        for k in range(4):
+            J[k, k] -= f[k]
+    return J
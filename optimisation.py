@@ -4,87 +4,305 @@ Analyses de sensibilité et optimisation technico-économique
 Auteur: Projet PIC 2024-2025
 """
 
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+from scipy.optimize import differential_evolution
 from evaporateurs import EvaporateurMultiplesEffets
-from cristallisation import CristalliseurBatch
+from cristallisation import CristalliseurBatch, dimensionner_cristalliseurs
+from parallele import executer_taches, EchecTache
+from cache import CacheEvaluations
+from rendu import sauvegarder_figure, rendre_figures
+
+
+def simuler_evaporateur(configuration):
+    """
+    Résout un évaporateur et renvoie ses indicateurs (fonction d'un balayage).
+    
+    Définie au niveau du module pour être exécutée dans un pool de processus.
+    
+    Args:
+        configuration (dict): 'n_effets' (3 par défaut) et attributs de
+            EvaporateurMultiplesEffets à modifier (P_vapeur, x_final, F, ...)
+            
+    Returns:
+        dict: Indicateurs (voir indicateurs_evaporateur)
+    """
+    configuration = dict(configuration)
+    evap = EvaporateurMultiplesEffets(n_effets=int(configuration.pop('n_effets', 3)))
+    for nom, valeur in configuration.items():
+        setattr(evap, nom, valeur)
+    evap.resoudre_bilans()
+    return indicateurs_evaporateur(evap)
+
+
+def indicateurs_evaporateur(evap):
+    """
+    Indicateurs d'un évaporateur résolu.
+    
+    Args:
+        evap (EvaporateurMultiplesEffets): Évaporateur après resoudre_bilans
+        
+    Returns:
+        dict: 'economie', 'surface_totale' (m²), 'vapeur_chauffe' (kg/h),
+            'vapeur_totale' (kg/h), 'temperature_effet1' (°C)
+    """
+    return {
+        'economie': evap.economie_vapeur(),
+        'surface_totale': np.sum(evap.A),
+        'vapeur_chauffe': evap.S,
+        'vapeur_totale': np.sum(evap.V),
+        'temperature_effet1': evap.T[0],
+    }
+
+
+def tracer_nombre_effets(donnees, nom_fichier='analyse_nombre_effets.png'):
+    """
+    Trace l'impact du nombre d'effets.
+    
+    Args:
+        donnees (dict): Résultats de AnalyseSensibilite.analyse_nombre_effets
+        nom_fichier (str): Fichier image
+        
+    Returns:
+        str: Fichier sauvegardé
+    """
+    n_effets_range = donnees['n_effets']
+    
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    
+    axes[0].plot(n_effets_range, donnees['economie'], 'o-', linewidth=2, markersize=10)
+    axes[0].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[0].set_ylabel('Économie de vapeur', fontsize=12)
+    axes[0].set_title('Économie de vapeur', fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    axes[1].plot(n_effets_range, donnees['surface_totale'], 's-', linewidth=2,
+                markersize=10, color='green')
+    axes[1].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
+    axes[1].set_title('Surface d\'échange totale', fontsize=13, fontweight='bold')
+    axes[1].grid(True, alpha=0.3)
+    
+    axes[2].plot(n_effets_range, donnees['vapeur_consommee'], '^-', linewidth=2,
+                markersize=10, color='red')
+    axes[2].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[2].set_ylabel('Vapeur consommée (kg/h)', fontsize=12)
+    axes[2].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
+    axes[2].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    return sauvegarder_figure(fig, nom_fichier)
+
+
+def tracer_pression_vapeur(donnees, nom_fichier='analyse_pression_vapeur.png'):
+    """
+    Trace l'impact de la pression de vapeur de chauffe.
+    
+    Args:
+        donnees (dict): Résultats de AnalyseSensibilite.analyse_pression_vapeur
+        nom_fichier (str): Fichier image
+        
+    Returns:
+        str: Fichier sauvegardé
+    """
+    P_range = donnees['pression']
+    
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    
+    axes[0].plot(P_range, donnees['economie'], linewidth=2, color='blue')
+    axes[0].set_xlabel('Pression vapeur (bar)', fontsize=12)
+    axes[0].set_ylabel('Économie de vapeur', fontsize=12)
+    axes[0].set_title('Impact sur l\'économie', fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    axes[1].plot(P_range, donnees['surface'], linewidth=2, color='green')
+    axes[1].set_xlabel('Pression vapeur (bar)', fontsize=12)
+    axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
+    axes[1].set_title('Impact sur les surfaces', fontsize=13, fontweight='bold')
+    axes[1].grid(True, alpha=0.3)
+    
+    axes[2].plot(P_range, donnees['temperature_effet1'], linewidth=2, color='red')
+    axes[2].set_xlabel('Pression vapeur (bar)', fontsize=12)
+    axes[2].set_ylabel('Température effet 1 (°C)', fontsize=12)
+    axes[2].set_title('Impact sur la température', fontsize=13, fontweight='bold')
+    axes[2].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    return sauvegarder_figure(fig, nom_fichier)
+
+
+def tracer_concentration_finale(donnees, nom_fichier='analyse_concentration.png'):
+    """
+    Trace l'impact de la concentration finale visée.
+    
+    Args:
+        donnees (dict): Résultats de AnalyseSensibilite.analyse_concentration_finale
+        nom_fichier (str): Fichier image
+        
+    Returns:
+        str: Fichier sauvegardé
+    """
+    x_range = donnees['concentration']
+    
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    
+    axes[0].plot(x_range, donnees['vapeur_totale'], linewidth=2, color='blue')
+    axes[0].set_xlabel('Concentration finale (%)', fontsize=12)
+    axes[0].set_ylabel('Vapeur totale produite (kg/h)', fontsize=12)
+    axes[0].set_title('Production de vapeur', fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    axes[1].plot(x_range, donnees['surface'], linewidth=2, color='green')
+    axes[1].set_xlabel('Concentration finale (%)', fontsize=12)
+    axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
+    axes[1].set_title('Surfaces d\'échange', fontsize=13, fontweight='bold')
+    axes[1].grid(True, alpha=0.3)
+    
+    axes[2].plot(x_range, donnees['vapeur_chauffe'], linewidth=2, color='red')
+    axes[2].set_xlabel('Concentration finale (%)', fontsize=12)
+    axes[2].set_ylabel('Vapeur de chauffe (kg/h)', fontsize=12)
+    axes[2].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
+    axes[2].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    return sauvegarder_figure(fig, nom_fichier)
+
+
+def tracer_debit_alimentation(donnees, nom_fichier='analyse_debit.png'):
+    """
+    Trace l'impact du débit d'alimentation.
+    
+    Args:
+        donnees (dict): Résultats de AnalyseSensibilite.analyse_debit_alimentation
+        nom_fichier (str): Fichier image
+        
+    Returns:
+        str: Fichier sauvegardé
+    """
+    variation_pct = donnees['variation']
+    
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    
+    axes[0].plot(variation_pct, donnees['vapeur_chauffe'], linewidth=2, color='blue')
+    axes[0].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
+    axes[0].set_xlabel('Variation débit (%)', fontsize=12)
+    axes[0].set_ylabel('Vapeur de chauffe (kg/h)', fontsize=12)
+    axes[0].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    axes[1].plot(variation_pct, donnees['surface'], linewidth=2, color='green')
+    axes[1].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
+    axes[1].set_xlabel('Variation débit (%)', fontsize=12)
+    axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
+    axes[1].set_title('Surfaces d\'échange', fontsize=13, fontweight='bold')
+    axes[1].grid(True, alpha=0.3)
+    
+    axes[2].plot(variation_pct, donnees['economie'], linewidth=2, color='red')
+    axes[2].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
+    axes[2].set_xlabel('Variation débit (%)', fontsize=12)
+    axes[2].set_ylabel('Économie de vapeur', fontsize=12)
+    axes[2].set_title('Économie de vapeur', fontsize=13, fontweight='bold')
+    axes[2].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    return sauvegarder_figure(fig, nom_fichier)
+
+
+# Fonction de tracé de chaque analyse de AnalyseSensibilite
+TRACES_SENSIBILITE = {
+    'nombre_effets': tracer_nombre_effets,
+    'pression_vapeur': tracer_pression_vapeur,
+    'concentration_finale': tracer_concentration_finale,
+    'debit_alimentation': tracer_debit_alimentation,
+}
 
 
 class AnalyseSensibilite:
     """
     Classe pour réaliser des analyses de sensibilité paramétriques.
+    
+    Les analyses calculent et renvoient leurs résultats (conservés dans
+    self.resultats) sans tracer; le rendu des graphiques est une étape
+    séparée (tracer=True ou tracer_resultats), qui peut être différée,
+    parallélisée ou omise.
     """
     
-    def __init__(self):
-        """Initialisation."""
+    def __init__(self, n_workers=None, backend='processus'):
+        """
+        Initialisation.
+        
+        Args:
+            n_workers (int): Nombre de workers des balayages (None: nombre de cœurs)
+            backend (str): Exécution des balayages: 'serie', 'threads' ou 'processus'
+        """
         self.resultats = {}
+        self.n_workers = n_workers
+        self.backend = backend
+    
+    def balayer(self, configurations):
+        """
+        Résout les évaporateurs d'un balayage (voir simuler_evaporateur).
+        
+        Les points sont répartis sur les workers; un point en échec est
+        signalé et donne des indicateurs NaN sans interrompre le balayage.
         
-    def analyse_nombre_effets(self, n_min=2, n_max=5):
+        Args:
+            configurations (list): Configurations (dict) des points
+            
+        Returns:
+            dict: Indicateurs de simuler_evaporateur, tableaux dans l'ordre des points
+        """
+        resultats = executer_taches(simuler_evaporateur, configurations,
+                                    n_workers=self.n_workers, backend=self.backend,
+                                    conserver_echecs=True)
+        
+        for resultat in resultats:
+            if isinstance(resultat, EchecTache):
+                print(f"  Échec du point {resultat.tache}: "
+                      f"{resultat.type_erreur}: {resultat.message}")
+        cles = ('economie', 'surface_totale', 'vapeur_chauffe', 'vapeur_totale',
+                'temperature_effet1')
+        return {cle: np.array([np.nan if isinstance(r, EchecTache) else r[cle]
+                               for r in resultats])
+                for cle in cles}
+    
+    def analyse_nombre_effets(self, n_min=2, n_max=5, tracer=False):
         """
         Analyse l'impact du nombre d'effets.
         
         Args:
             n_min (int): Nombre minimum d'effets
             n_max (int): Nombre maximum d'effets
+            tracer (bool): Rendu immédiat du graphique
+            
+        Returns:
+            dict: 'n_effets', 'economie', 'surface_totale', 'vapeur_consommee'
         """
         print("\n=== ANALYSE: Impact du nombre d'effets ===")
         
         n_effets_range = range(n_min, n_max + 1)
-        economies = []
-        surfaces_totales = []
-        vapeurs_consommees = []
-        
-        for n in n_effets_range:
-            print(f"\nSimulation avec {n} effets...")
-            evap = EvaporateurMultiplesEffets(n_effets=n)
-            evap.resoudre_bilans()
-            
-            economies.append(evap.economie_vapeur())
-            surfaces_totales.append(np.sum(evap.A))
-            vapeurs_consommees.append(evap.S)
+        print(f"\nSimulation avec {n_min} à {n_max} effets...")
+        indicateurs = self.balayer([{'n_effets': n} for n in n_effets_range])
         
         # Sauvegarde des résultats
         self.resultats['nombre_effets'] = {
             'n_effets': list(n_effets_range),
-            'economie': economies,
-            'surface_totale': surfaces_totales,
-            'vapeur_consommee': vapeurs_consommees
+            'economie': indicateurs['economie'],
+            'surface_totale': indicateurs['surface_totale'],
+            'vapeur_consommee': indicateurs['vapeur_chauffe']
         }
         
-        # Visualisation
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
-        
-        axes[0].plot(n_effets_range, economies, 'o-', linewidth=2, markersize=10)
-        axes[0].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[0].set_ylabel('Économie de vapeur', fontsize=12)
-        axes[0].set_title('Économie de vapeur', fontsize=13, fontweight='bold')
-        axes[0].grid(True, alpha=0.3)
-        
-        axes[1].plot(n_effets_range, surfaces_totales, 's-', linewidth=2, 
-                    markersize=10, color='green')
-        axes[1].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
-        axes[1].set_title('Surface d\'échange totale', fontsize=13, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
-        
-        axes[2].plot(n_effets_range, vapeurs_consommees, '^-', linewidth=2, 
-                    markersize=10, color='red')
-        axes[2].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[2].set_ylabel('Vapeur consommée (kg/h)', fontsize=12)
-        axes[2].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
-        axes[2].grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('analyse_nombre_effets.png', 
-                   dpi=300, bbox_inches='tight')
-        print("\nGraphique sauvegardé: analyse_nombre_effets.png")
-        
         # Résultats tabulaires
         df = pd.DataFrame(self.resultats['nombre_effets'])
         print("\n" + df.to_string(index=False))
+        
+        if tracer:
+            tracer_nombre_effets(self.resultats['nombre_effets'])
+        return self.resultats['nombre_effets']
     
-    def analyse_pression_vapeur(self, P_min=2.5, P_max=4.5, n_points=10):
+    def analyse_pression_vapeur(self, P_min=2.5, P_max=4.5, n_points=10, tracer=False):
         """
         Analyse l'impact de la pression de vapeur de chauffe.
         
@@ -92,58 +310,29 @@ class AnalyseSensibilite:
             P_min (float): Pression minimale (bar)
             P_max (float): Pression maximale (bar)
             n_points (int): Nombre de points
+            tracer (bool): Rendu immédiat du graphique
+            
+        Returns:
+            dict: 'pression', 'economie', 'surface', 'temperature_effet1'
         """
         print("\n=== ANALYSE: Impact de la pression de vapeur ===")
         
         P_range = np.linspace(P_min, P_max, n_points)
-        economies = []
-        surfaces = []
-        temperatures = []
-        
-        for P in P_range:
-            evap = EvaporateurMultiplesEffets(n_effets=3)
-            evap.P_vapeur = P
-            evap.resoudre_bilans()
-            
-            economies.append(evap.economie_vapeur())
-            surfaces.append(np.sum(evap.A))
-            temperatures.append(evap.T[0])  # Température premier effet
+        indicateurs = self.balayer([{'P_vapeur': P} for P in P_range])
         
         # Sauvegarde
         self.resultats['pression_vapeur'] = {
             'pression': P_range,
-            'economie': economies,
-            'surface': surfaces,
-            'temperature_effet1': temperatures
+            'economie': indicateurs['economie'],
+            'surface': indicateurs['surface_totale'],
+            'temperature_effet1': indicateurs['temperature_effet1']  # Température premier effet
         }
         
-        # Visualisation
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
-        
-        axes[0].plot(P_range, economies, linewidth=2, color='blue')
-        axes[0].set_xlabel('Pression vapeur (bar)', fontsize=12)
-        axes[0].set_ylabel('Économie de vapeur', fontsize=12)
-        axes[0].set_title('Impact sur l\'économie', fontsize=13, fontweight='bold')
-        axes[0].grid(True, alpha=0.3)
-        
-        axes[1].plot(P_range, surfaces, linewidth=2, color='green')
-        axes[1].set_xlabel('Pression vapeur (bar)', fontsize=12)
-        axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
-        axes[1].set_title('Impact sur les surfaces', fontsize=13, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
-        
-        axes[2].plot(P_range, temperatures, linewidth=2, color='red')
-        axes[2].set_xlabel('Pression vapeur (bar)', fontsize=12)
-        axes[2].set_ylabel('Température effet 1 (°C)', fontsize=12)
-        axes[2].set_title('Impact sur la température', fontsize=13, fontweight='bold')
-        axes[2].grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('analyse_pression_vapeur.png', 
-                   dpi=300, bbox_inches='tight')
-        print("\nGraphique sauvegardé: analyse_pression_vapeur.png")
+        if tracer:
+            tracer_pression_vapeur(self.resultats['pression_vapeur'])
+        return self.resultats['pression_vapeur']
     
-    def analyse_concentration_finale(self, x_min=60, x_max=70, n_points=10):
+    def analyse_concentration_finale(self, x_min=60, x_max=70, n_points=10, tracer=False):
         """
         Analyse l'impact de la concentration finale visée.
         
@@ -151,107 +340,114 @@ class AnalyseSensibilite:
             x_min (float): Concentration minimale (%)
             x_max (float): Concentration maximale (%)
             n_points (int): Nombre de points
+            tracer (bool): Rendu immédiat du graphique
+            
+        Returns:
+            dict: 'concentration' (%), 'vapeur_totale', 'surface', 'vapeur_chauffe'
         """
         print("\n=== ANALYSE: Impact de la concentration finale ===")
         
         x_range = np.linspace(x_min, x_max, n_points)
-        vapeurs_totales = []
-        surfaces = []
-        vapeurs_chauffe = []
-        
-        for x_final in x_range:
-            evap = EvaporateurMultiplesEffets(n_effets=3)
-            evap.x_final = x_final / 100  # Conversion en fraction
-            evap.resoudre_bilans()
-            
-            vapeurs_totales.append(np.sum(evap.V))
-            surfaces.append(np.sum(evap.A))
-            vapeurs_chauffe.append(evap.S)
-        
-        # Visualisation
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
-        
-        axes[0].plot(x_range, vapeurs_totales, linewidth=2, color='blue')
-        axes[0].set_xlabel('Concentration finale (%)', fontsize=12)
-        axes[0].set_ylabel('Vapeur totale produite (kg/h)', fontsize=12)
-        axes[0].set_title('Production de vapeur', fontsize=13, fontweight='bold')
-        axes[0].grid(True, alpha=0.3)
-        
-        axes[1].plot(x_range, surfaces, linewidth=2, color='green')
-        axes[1].set_xlabel('Concentration finale (%)', fontsize=12)
-        axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
-        axes[1].set_title('Surfaces d\'échange', fontsize=13, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
-        
-        axes[2].plot(x_range, vapeurs_chauffe, linewidth=2, color='red')
-        axes[2].set_xlabel('Concentration finale (%)', fontsize=12)
-        axes[2].set_ylabel('Vapeur de chauffe (kg/h)', fontsize=12)
-        axes[2].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
-        axes[2].grid(True, alpha=0.3)
+        indicateurs = self.balayer([{'x_final': x_final / 100}  # Conversion en fraction
+                                    for x_final in x_range])
+        
+        self.resultats['concentration_finale'] = {
+            'concentration': x_range,
+            'vapeur_totale': indicateurs['vapeur_totale'],
+            'surface': indicateurs['surface_totale'],
+            'vapeur_chauffe': indicateurs['vapeur_chauffe']
+        }
         
-        plt.tight_layout()
-        plt.savefig('analyse_concentration.png', 
-                   dpi=300, bbox_inches='tight')
-        print("\nGraphique sauvegardé: analyse_concentration.png")
+        if tracer:
+            tracer_concentration_finale(self.resultats['concentration_finale'])
+        return self.resultats['concentration_finale']
     
-    def analyse_debit_alimentation(self, variation=0.20, n_points=10):
+    def analyse_debit_alimentation(self, variation=0.20, n_points=10, tracer=False):
         """
         Analyse l'impact du débit d'alimentation (±variation).
         
         Args:
             variation (float): Variation relative (0.20 = ±20%)
             n_points (int): Nombre de points
+            tracer (bool): Rendu immédiat du graphique
+            
+        Returns:
+            dict: 'debit' (kg/h), 'variation' (%), 'vapeur_chauffe', 'surface', 'economie'
         """
         print("\n=== ANALYSE: Impact du débit d'alimentation ===")
         
         F_nominal = 20000
-        F_range = np.linspace(F_nominal * (1 - variation), 
-                            F_nominal * (1 + variation), 
+        F_range = np.linspace(F_nominal * (1 - variation),
+                            F_nominal * (1 + variation),
                             n_points)
         
-        vapeurs_chauffe = []
-        surfaces = []
-        economies = []
-        
-        for F in F_range:
-            evap = EvaporateurMultiplesEffets(n_effets=3)
-            evap.F = F
-            evap.resoudre_bilans()
-            
-            vapeurs_chauffe.append(evap.S)
-            surfaces.append(np.sum(evap.A))
-            economies.append(evap.economie_vapeur())
-        
-        # Visualisation
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+        indicateurs = self.balayer([{'F': F} for F in F_range])
         
-        variation_pct = (F_range / F_nominal - 1) * 100
-        
-        axes[0].plot(variation_pct, vapeurs_chauffe, linewidth=2, color='blue')
-        axes[0].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
-        axes[0].set_xlabel('Variation débit (%)', fontsize=12)
-        axes[0].set_ylabel('Vapeur de chauffe (kg/h)', fontsize=12)
-        axes[0].set_title('Consommation de vapeur', fontsize=13, fontweight='bold')
-        axes[0].grid(True, alpha=0.3)
+        self.resultats['debit_alimentation'] = {
+            'debit': F_range,
+            'variation': (F_range / F_nominal - 1) * 100,
+            'vapeur_chauffe': indicateurs['vapeur_chauffe'],
+            'surface': indicateurs['surface_totale'],
+            'economie': indicateurs['economie']
+        }
         
-        axes[1].plot(variation_pct, surfaces, linewidth=2, color='green')
-        axes[1].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
-        axes[1].set_xlabel('Variation débit (%)', fontsize=12)
-        axes[1].set_ylabel('Surface totale (m²)', fontsize=12)
-        axes[1].set_title('Surfaces d\'échange', fontsize=13, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
+        if tracer:
+            tracer_debit_alimentation(self.resultats['debit_alimentation'])
+        return self.resultats['debit_alimentation']
+    
+    def tracer_resultats(self, analyses=None, n_workers=None, backend='serie'):
+        """
+        Rend les graphiques des analyses déjà calculées.
         
-        axes[2].plot(variation_pct, economies, linewidth=2, color='red')
-        axes[2].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
-        axes[2].set_xlabel('Variation débit (%)', fontsize=12)
-        axes[2].set_ylabel('Économie de vapeur', fontsize=12)
-        axes[2].set_title('Économie de vapeur', fontsize=13, fontweight='bold')
-        axes[2].grid(True, alpha=0.3)
+        Args:
+            analyses (list): Noms des analyses (clés de self.resultats, None: toutes)
+            n_workers (int): Nombre de workers du rendu (None: nombre de cœurs)
+            backend (str): 'serie' ou 'processus' (rendu en parallèle)
+            
+        Returns:
+            list: Fichiers produits
+        """
+        if analyses is None:
+            analyses = list(self.resultats)
+        return rendre_figures([(TRACES_SENSIBILITE[nom], (self.resultats[nom],))
+                               for nom in analyses],
+                              n_workers=n_workers, backend=backend)
+
+
+def tracer_comparaison_economique(df, nom_fichier='comparaison_economique.png'):
+    """
+    Trace la comparaison économique des configurations.
+    
+    Args:
+        df (pd.DataFrame): Résultats de AnalyseEconomique.comparer_configurations
+        nom_fichier (str): Fichier image
         
-        plt.tight_layout()
-        plt.savefig('analyse_debit.png', 
-                   dpi=300, bbox_inches='tight')
-        print("\nGraphique sauvegardé: analyse_debit.png")
+    Returns:
+        str: Fichier sauvegardé
+    """
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    
+    axes[0].bar(df['n_effets'], df['TCI']/1e6, color='steelblue', edgecolor='black')
+    axes[0].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[0].set_ylabel('TCI (M€)', fontsize=12)
+    axes[0].set_title('Investissement', fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3, axis='y')
+    
+    axes[1].plot(df['n_effets'], df['cout_unitaire'], 'o-', 
+                linewidth=2, markersize=10, color='green')
+    axes[1].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[1].set_ylabel('Coût (€/tonne)', fontsize=12)
+    axes[1].set_title('Coût de production unitaire', fontsize=13, fontweight='bold')
+    axes[1].grid(True, alpha=0.3)
+    
+    axes[2].bar(df['n_effets'], df['VAN']/1e6, color='orange', edgecolor='black')
+    axes[2].set_xlabel('Nombre d\'effets', fontsize=12)
+    axes[2].set_ylabel('VAN (M€)', fontsize=12)
+    axes[2].set_title('Valeur actuelle nette', fontsize=13, fontweight='bold')
+    axes[2].grid(True, alpha=0.3, axis='y')
+    
+    plt.tight_layout()
+    return sauvegarder_figure(fig, nom_fichier)
 
 
 class AnalyseEconomique:
@@ -266,6 +462,7 @@ class AnalyseEconomique:
         self.prix_eau = 0.15  # €/m³
         self.prix_electricite = 0.12  # €/kWh
         self.salaire_operateur = 35  # €/h
+        self.prix_vente = 800  # €/tonne (hypothèse)
         
         # Paramètres généraux
         self.heures_fonctionnement = 8000  # h/an
@@ -277,15 +474,13 @@ class AnalyseEconomique:
         Calcule le coût d'investissement des évaporateurs.
         
         Args:
-            surfaces (array): Surfaces d'échange (m²) pour chaque effet
-            
+            surfaces (array): Surfaces d'échange (m²) pour chaque effet, sur le
+                dernier axe (..., n_effets); une surface nulle ne coûte rien
+                
         Returns:
-            float: Coût total (€)
+            float ou np.array: Coût total (€) par installation
         """
-        cout_total = 0
-        for A in surfaces:
-            cout_total += 15000 * (A ** 0.65)
-        return cout_total
+        return np.sum(15000 * np.asarray(surfaces, dtype=float) ** 0.65, axis=-1)
     
     def cout_investissement_cristalliseur(self, volume):
         """
@@ -322,9 +517,22 @@ class AnalyseEconomique:
         Returns:
             float: TCI (€)
         """
+        return self.investissement(evap.A, crist_dims['volume'])
+    
+    def investissement(self, surfaces, volume):
+        """
+        Coût total d'investissement (TCI) de une ou plusieurs installations.
+        
+        Args:
+            surfaces (array): Surfaces des effets (m²), forme (..., n_effets)
+            volume (float ou array): Volume du cristalliseur (m³)
+            
+        Returns:
+            float ou np.array: TCI (€)
+        """
         # Coût des équipements
-        C_evap = self.cout_investissement_evaporateurs(evap.A)
-        C_crist = self.cout_investissement_cristalliseur(crist_dims['volume'])
+        C_evap = self.cout_investissement_evaporateurs(surfaces)
+        C_crist = self.cout_investissement_cristalliseur(np.asarray(volume, dtype=float))
         C_ech = self.cout_investissement_echangeurs(50)  # Estimation
         
         C_equipements = C_evap + C_crist + C_ech
@@ -345,14 +553,39 @@ class AnalyseEconomique:
         Returns:
             dict: Détail des coûts (€/an)
         """
+        return self.exploitation(evap.S, crist_dims['puissance_agitation'])
+    
+    def exploitation(self, vapeur_chauffe, puissance_agitation, prix_vapeur=None,
+                     prix_electricite=None):
+        """
+        Coûts d'exploitation annuels de une ou plusieurs installations.
+        
+        Les arguments sont diffusés (broadcasting numpy) les uns contre les
+        autres: installations et scénarios de prix peuvent être combinés.
+        
+        Args:
+            vapeur_chauffe (float ou array): Débit de vapeur de chauffe (kg/h)
+            puissance_agitation (float ou array): Puissance d'agitation (kW)
+            prix_vapeur (float ou array): Prix de la vapeur (€/t, None: attribut)
+            prix_electricite (float ou array): Prix de l'électricité (€/kWh,
+                None: attribut)
+                
+        Returns:
+            dict: Détail des coûts (€/an)
+        """
+        if prix_vapeur is None:
+            prix_vapeur = self.prix_vapeur
+        if prix_electricite is None:
+            prix_electricite = self.prix_electricite
+        
         # Vapeur
-        cout_vapeur = (evap.S * self.heures_fonctionnement * 
-                      self.prix_vapeur / 1000)
+        cout_vapeur = (np.asarray(vapeur_chauffe, dtype=float) * self.heures_fonctionnement *
+                      np.asarray(prix_vapeur, dtype=float) / 1000)
         
         # Électricité (pompes + agitation)
-        P_elec_total = 100 + crist_dims['puissance_agitation']  # kW
-        cout_electricite = (P_elec_total * self.heures_fonctionnement * 
-                           self.prix_electricite)
+        P_elec_total = 100 + np.asarray(puissance_agitation, dtype=float)  # kW
+        cout_electricite = (P_elec_total * self.heures_fonctionnement *
+                           np.asarray(prix_electricite, dtype=float))
         
         # Eau de refroidissement (estimation)
         cout_eau = 10000  # €/an (estimation forfaitaire)
@@ -370,82 +603,142 @@ class AnalyseEconomique:
         
         return OPEX
     
-    def analyser_projet(self, n_effets=3):
+    def analyser_projet(self, n_effets=3, evap=None, crist_dims=None):
         """
         Analyse économique complète du projet.
         
         Args:
             n_effets (int): Nombre d'effets
+            evap: Évaporateur déjà résolu (None: simulé ici)
+            crist_dims (dict): Dimensions du cristalliseur (None: calculées ici)
         """
+        if evap is not None:
+            n_effets = evap.n_effets
         print("\n" + "="*70)
         print(f"ANALYSE TECHNICO-ÉCONOMIQUE - {n_effets} EFFETS")
         print("="*70)
         
         # Simulation évaporateur
-        evap = EvaporateurMultiplesEffets(n_effets=n_effets)
-        evap.resoudre_bilans()
+        if evap is None:
+            evap = EvaporateurMultiplesEffets(n_effets=n_effets)
+            evap.resoudre_bilans()
         
         # Simulation cristalliseur
-        crist = CristalliseurBatch()
-        crist_dims = crist.dimensionnement()
+        if crist_dims is None:
+            crist = CristalliseurBatch()
+            crist_dims = crist.dimensionnement()
+        
+        res = self.indicateurs(evap, crist_dims)
         
         # Investissement
-        TCI_total = self.TCI(evap, crist_dims)
         print(f"\nINVESTISSEMENT:")
         print(f"  Évaporateurs: {self.cout_investissement_evaporateurs(evap.A):,.0f} €")
         print(f"  Cristalliseur: {self.cout_investissement_cristalliseur(crist_dims['volume']):,.0f} €")
         print(f"  Échangeurs: {self.cout_investissement_echangeurs(50):,.0f} €")
-        print(f"  TCI total: {TCI_total:,.0f} €")
+        print(f"  TCI total: {res['TCI']:,.0f} €")
         
         # Exploitation
-        OPEX = self.OPEX_annuel(evap, crist_dims)
+        OPEX = res['detail_OPEX']
         print(f"\nEXPLOITATION ANNUELLE:")
         print(f"  Vapeur: {OPEX['vapeur']:,.0f} €/an")
         print(f"  Électricité: {OPEX['electricite']:,.0f} €/an")
         print(f"  Eau: {OPEX['eau']:,.0f} €/an")
         print(f"  Main d'œuvre: {OPEX['main_oeuvre']:,.0f} €/an")
         print(f"  OPEX total: {OPEX['total']:,.0f} €/an")
-        
-        # Maintenance
-        maintenance = 0.03 * TCI_total
-        print(f"  Maintenance (3% TCI): {maintenance:,.0f} €/an")
+        print(f"  Maintenance (3% TCI): {res['maintenance']:,.0f} €/an")
         
         # Production
-        production_annuelle = evap.L[-1] * self.heures_fonctionnement / 1000  # tonnes/an
         print(f"\nPRODUCTION:")
-        print(f"  Production annuelle: {production_annuelle:,.0f} tonnes/an")
-        
-        # Coût unitaire
-        amortissement = TCI_total / self.duree_vie
-        cout_total_annuel = OPEX['total'] + maintenance + amortissement
-        cout_unitaire = cout_total_annuel / production_annuelle
-        print(f"  Coût de production: {cout_unitaire:.2f} €/tonne")
+        print(f"  Production annuelle: {res['production']:,.0f} tonnes/an")
+        print(f"  Coût de production: {res['cout_unitaire']:.2f} €/tonne")
         
-        # ROI simplifié (hypothèse prix de vente)
-        prix_vente = 800  # €/tonne (hypothèse)
-        profit_annuel = (prix_vente - cout_unitaire) * production_annuelle
-        ROI = TCI_total / profit_annuel
+        # Rentabilité
         print(f"\nRENTABILITÉ:")
-        print(f"  Prix de vente (hypothèse): {prix_vente} €/tonne")
-        print(f"  Profit annuel: {profit_annuel:,.0f} €/an")
-        print(f"  ROI simple: {ROI:.2f} ans")
-        
-        # VAN
-        VAN = self.calculer_VAN(TCI_total, profit_annuel)
-        print(f"  VAN (15 ans, 8%): {VAN:,.0f} €")
+        print(f"  Prix de vente (hypothèse): {self.prix_vente} €/tonne")
+        print(f"  Profit annuel: {res['profit_annuel']:,.0f} €/an")
+        print(f"  ROI simple: {res['ROI']:.2f} ans")
+        print(f"  VAN ({self.duree_vie} ans, {self.taux_actualisation:.0%}): {res['VAN']:,.0f} €")
         
-        if VAN > 0:
+        if res['VAN'] > 0:
             print(f"\n✓ Projet RENTABLE (VAN > 0)")
         else:
             print(f"\n✗ Projet NON RENTABLE (VAN < 0)")
         
         print("="*70)
         
+        return {cle: res[cle] for cle in
+                ('TCI', 'OPEX', 'production', 'cout_unitaire', 'ROI', 'VAN')}
+    
+    def indicateurs(self, evap, crist_dims):
+        """
+        Indicateurs économiques d'une installation, sans affichage.
+        
+        Args:
+            evap: Instance de EvaporateurMultiplesEffets résolue
+            crist_dims: Dictionnaire avec dimensions cristalliseur
+            
+        Returns:
+            dict: 'TCI' (€), 'OPEX' (€/an), 'detail_OPEX', 'maintenance' (€/an),
+                'production' (t/an), 'cout_unitaire' (€/t), 'profit_annuel' (€/an),
+                'ROI' (ans), 'VAN' (€)
+        """
+        return self.indicateurs_scenarios(evap.A, evap.S, evap.L[-1], crist_dims['volume'],
+                                          crist_dims['puissance_agitation'])
+    
+    def indicateurs_scenarios(self, surfaces, vapeur_chauffe, debit_produit, volume,
+                              puissance_agitation, prix_vapeur=None,
+                              prix_electricite=None, prix_vente=None):
+        """
+        Indicateurs économiques vectorisés sur des lots de scénarios.
+        
+        Toutes les grandeurs sont des tableaux diffusés les uns contre les
+        autres (les surfaces portent les effets sur leur dernier axe): par
+        exemple des installations de forme (n, 1) croisées avec des prix de
+        forme (m,) donnent n × m scénarios calculés en une seule passe. La
+        VAN utilise le facteur d'annuité en forme fermée.
+        
+        Args:
+            surfaces (array): Surfaces des effets (m²), forme (..., n_effets)
+            vapeur_chauffe (float ou array): Débit de vapeur de chauffe (kg/h)
+            debit_produit (float ou array): Débit de sirop concentré (kg/h)
+            volume (float ou array): Volume du cristalliseur (m³)
+            puissance_agitation (float ou array): Puissance d'agitation (kW)
+            prix_vapeur (float ou array): Prix de la vapeur (€/t, None: attribut)
+            prix_electricite (float ou array): Prix de l'électricité (€/kWh,
+                None: attribut)
+            prix_vente (float ou array): Prix de vente du sucre (€/t, None: attribut)
+            
+        Returns:
+            dict: Mêmes clés que indicateurs(), valeurs de la forme diffusée
+        """
+        if prix_vente is None:
+            prix_vente = self.prix_vente
+        
+        TCI_total = self.investissement(surfaces, volume)
+        OPEX = self.exploitation(vapeur_chauffe, puissance_agitation,
+                                 prix_vapeur, prix_electricite)
+        maintenance = 0.03 * TCI_total
+        production_annuelle = (np.asarray(debit_produit, dtype=float) *
+                               self.heures_fonctionnement / 1000)  # tonnes/an
+        
+        # Coût unitaire
+        amortissement = TCI_total / self.duree_vie
+        cout_total_annuel = OPEX['total'] + maintenance + amortissement
+        cout_unitaire = cout_total_annuel / production_annuelle
+        
+        # ROI simplifié et VAN
+        profit_annuel = (np.asarray(prix_vente, dtype=float) - cout_unitaire) * production_annuelle
+        ROI = TCI_total / profit_annuel
+        VAN = self.calculer_VAN(TCI_total, profit_annuel)
+        
         return {
             'TCI': TCI_total,
             'OPEX': OPEX['total'],
+            'detail_OPEX': OPEX,
+            'maintenance': maintenance,
             'production': production_annuelle,
             'cout_unitaire': cout_unitaire,
+            'profit_annuel': profit_annuel,
             'ROI': ROI,
             'VAN': VAN
         }
@@ -455,20 +748,37 @@ class AnalyseEconomique:
         Calcule la valeur actuelle nette.
         
         Args:
-            TCI (float): Investissement initial
-            flux_annuel (float): Flux de trésorerie annuel
+            TCI (float ou array): Investissement initial
+            flux_annuel (float ou array): Flux de trésorerie annuel constant
             
         Returns:
-            float: VAN (€)
+            float ou np.array: VAN (€)
         """
-        VAN = -TCI
-        for i in range(1, self.duree_vie + 1):
-            VAN += flux_annuel / ((1 + self.taux_actualisation) ** i)
-        return VAN
+        return -TCI + flux_annuel * self.facteur_annuite()
     
-    def comparer_configurations(self):
+    def facteur_annuite(self):
+        """
+        Facteur d'annuité: somme des facteurs d'actualisation des années 1 à n,
+        (1 - (1 + r)^-n) / r (n si r = 0).
+        
+        Returns:
+            float: Facteur d'annuité (ans)
+        """
+        r, n = self.taux_actualisation, self.duree_vie
+        if r == 0:
+            return float(n)
+        return (1 - (1 + r) ** -n) / r
+    
+    def comparer_configurations(self, tracer=False):
         """
         Compare différentes configurations (nombre d'effets).
+        
+        Args:
+            tracer (bool): Rendu immédiat du graphique (voir
+                tracer_comparaison_economique)
+                
+        Returns:
+            pd.DataFrame: TCI, OPEX, coût unitaire, ROI et VAN par nombre d'effets
         """
         print("\n" + "="*70)
         print("COMPARAISON DES CONFIGURATIONS")
@@ -486,32 +796,8 @@ class AnalyseEconomique:
         
         print("\n" + df.to_string(index=False))
         
-        # Visualisation
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
-        
-        axes[0].bar(df['n_effets'], df['TCI']/1e6, color='steelblue', edgecolor='black')
-        axes[0].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[0].set_ylabel('TCI (M€)', fontsize=12)
-        axes[0].set_title('Investissement', fontsize=13, fontweight='bold')
-        axes[0].grid(True, alpha=0.3, axis='y')
-        
-        axes[1].plot(df['n_effets'], df['cout_unitaire'], 'o-', 
-                    linewidth=2, markersize=10, color='green')
-        axes[1].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[1].set_ylabel('Coût (€/tonne)', fontsize=12)
-        axes[1].set_title('Coût de production unitaire', fontsize=13, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
-        
-        axes[2].bar(df['n_effets'], df['VAN']/1e6, color='orange', edgecolor='black')
-        axes[2].set_xlabel('Nombre d\'effets', fontsize=12)
-        axes[2].set_ylabel('VAN (M€)', fontsize=12)
-        axes[2].set_title('Valeur actuelle nette', fontsize=13, fontweight='bold')
-        axes[2].grid(True, alpha=0.3, axis='y')
-        
-        plt.tight_layout()
-        plt.savefig('comparaison_economique.png', 
-                   dpi=300, bbox_inches='tight')
-        print("\nGraphique sauvegardé: comparaison_economique.png")
+        if tracer:
+            tracer_comparaison_economique(df)
         
         # Recommandation
         meilleur_idx = df['VAN'].idxmax()
@@ -519,6 +805,343 @@ class AnalyseEconomique:
         print(f"\nCONFIGURATION OPTIMALE: {int(meilleur['n_effets'])} effets")
         print(f"  VAN: {meilleur['VAN']:,.0f} €")
         print(f"  ROI: {meilleur['ROI']:.2f} ans")
+        
+        return df
+    
+    def monte_carlo_prix(self, evap=None, crist_dims=None, n_scenarios=1_000_000,
+                         volatilite_vapeur=0.25, volatilite_sucre=0.15, correlation=0.0,
+                         graine=0):
+        """
+        Risque prix par Monte Carlo sur le moteur vectorisé.
+        
+        Les prix de la vapeur et du sucre suivent des lois log-normales de
+        médianes les prix nominaux (attributs), éventuellement corrélées.
+        L'installation est simulée une seule fois; tous les scénarios sont
+        évalués en une passe par indicateurs_scenarios.
+        
+        Args:
+            evap: Évaporateur déjà résolu (None: 3 effets par défaut)
+            crist_dims (dict): Dimensions du cristalliseur (None: batch par défaut)
+            n_scenarios (int): Nombre de tirages
+            volatilite_vapeur (float): Écart-type du logarithme du prix de la vapeur
+            volatilite_sucre (float): Écart-type du logarithme du prix du sucre
+            correlation (float): Corrélation des logarithmes des deux prix
+            graine (int): Graine du générateur
+            
+        Returns:
+            dict: Tirages ('prix_vapeur', 'prix_vente', 'cout_unitaire', 'VAN'),
+                'statistiques' (DataFrame) et 'probabilite_VAN_negative'
+        """
+        print("\n" + "="*70)
+        print(f"RISQUE PRIX - MONTE CARLO ({n_scenarios:,} scénarios)")
+        print("="*70)
+        
+        if evap is None:
+            evap = EvaporateurMultiplesEffets(n_effets=3)
+            evap.resoudre_bilans()
+        if crist_dims is None:
+            crist_dims = CristalliseurBatch().dimensionnement()
+        
+        generateur = np.random.default_rng(graine)
+        z = generateur.standard_normal((2, n_scenarios))
+        z[1] = correlation * z[0] + np.sqrt(1 - correlation**2) * z[1]
+        prix_vapeur = self.prix_vapeur * np.exp(volatilite_vapeur * z[0])
+        prix_vente = self.prix_vente * np.exp(volatilite_sucre * z[1])
+        
+        debut = time.perf_counter()
+        res = self.indicateurs_scenarios(evap.A, evap.S, evap.L[-1], crist_dims['volume'],
+                                         crist_dims['puissance_agitation'],
+                                         prix_vapeur=prix_vapeur, prix_vente=prix_vente)
+        temps_calcul = time.perf_counter() - debut
+        
+        tirages = {'prix_vapeur': prix_vapeur, 'prix_vente': prix_vente,
+                   'cout_unitaire': res['cout_unitaire'], 'VAN': res['VAN']}
+        statistiques = pd.DataFrame({
+            nom: {'moyenne': valeurs.mean(), 'ecart_type': valeurs.std(),
+                  'P5': np.percentile(valeurs, 5), 'P50': np.percentile(valeurs, 50),
+                  'P95': np.percentile(valeurs, 95)}
+            for nom, valeurs in tirages.items()
+        }).T
+        probabilite = float(np.mean(res['VAN'] < 0))
+        
+        print("\n" + statistiques.to_string(float_format=lambda v: f"{v:,.4g}"))
+        print(f"\nProbabilité de VAN négative: {probabilite:.2%}")
+        print(f"Temps de calcul: {temps_calcul:.2f} s")
+        
+        return dict(tirages, statistiques=statistiques,
+                    probabilite_VAN_negative=probabilite)
+    
+    def tracer_monte_carlo(self, resultats):
+        """
+        Trace les distributions du coût de production et de la VAN.
+        
+        Args:
+            resultats (dict): Sortie de monte_carlo_prix
+        """
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        
+        axes[0].hist(resultats['cout_unitaire'], bins=100, color='green',
+                     edgecolor='black', linewidth=0.3)
+        axes[0].set_xlabel('Coût de production (€/tonne)', fontsize=12)
+        axes[0].set_ylabel('Nombre de scénarios', fontsize=12)
+        axes[0].set_title('Coût de production unitaire', fontsize=13, fontweight='bold')
+        axes[0].grid(True, alpha=0.3)
+        
+        axes[1].hist(resultats['VAN'] / 1e6, bins=100, color='orange',
+                     edgecolor='black', linewidth=0.3)
+        axes[1].axvline(0, color='red', linestyle='--', linewidth=2, label='VAN = 0')
+        for p in ('P5', 'P50', 'P95'):
+            axes[1].axvline(resultats['statistiques'].loc['VAN', p] / 1e6, color='black',
+                            linestyle=':', linewidth=1)
+        axes[1].set_xlabel('VAN (M€)', fontsize=12)
+        axes[1].set_ylabel('Nombre de scénarios', fontsize=12)
+        axes[1].set_title(f"VAN (P(VAN < 0) = {resultats['probabilite_VAN_negative']:.1%})",
+                          fontsize=13, fontweight='bold')
+        axes[1].legend()
+        axes[1].grid(True, alpha=0.3)
+        
+        plt.tight_layout()
+        sauvegarder_figure(fig, 'risque_prix.png')
+
+
+def construire_usine(point):
+    """
+    Construit l'usine d'un point de l'espace des paramètres et résout
+    l'évaporateur.
+    
+    Chaque paramètre est un attribut de AnalyseEconomique, de
+    EvaporateurMultiplesEffets ou de CristalliseurBatch (cherché dans cet
+    ordre).
+    
+    Args:
+        point (dict): Valeurs des paramètres (et 'n_effets', 3 par défaut)
+        
+    Returns:
+        tuple: (AnalyseEconomique, EvaporateurMultiplesEffets résolu,
+            CristalliseurBatch non simulé)
+    """
+    point = dict(point)
+    evap = EvaporateurMultiplesEffets(n_effets=int(point.pop('n_effets', 3)))
+    eco = AnalyseEconomique()
+    crist = CristalliseurBatch()
+    for nom, valeur in point.items():
+        for objet in (eco, evap, crist):
+            if hasattr(objet, nom):
+                setattr(objet, nom, valeur)
+                break
+        else:
+            raise ValueError(f"Paramètre inconnu: {nom}")
+    evap.resoudre_bilans()
+    return eco, evap, crist
+
+
+def evaluer_usine(point):
+    """
+    Indicateurs de l'usine pour un point de l'espace des paramètres.
+    
+    Les paramètres sont appliqués par construire_usine (la recette du
+    batch agit sur le dimensionnement du cristalliseur). Définie au niveau
+    du module pour un pool de processus.
+    
+    Args:
+        point (dict): Valeurs des paramètres (et 'n_effets', 3 par défaut)
+        
+    Returns:
+        dict: 'economie', 'surface_totale' (m²), 'cout_unitaire' (€/t),
+            'VAN' (€) et 'faisable' (bilans convergés, surfaces positives)
+    """
+    eco, evap, crist = construire_usine(point)
+    
+    crist_dims = dimensionner_cristalliseurs(crist.masse_batch, crist.duree,
+                                             crist.T_0, crist.T_f)
+    res = eco.indicateurs(evap, crist_dims)
+    
+    return {
+        'economie': float(evap.economie_vapeur()),
+        'surface_totale': float(np.sum(evap.A)),
+        'cout_unitaire': float(res['cout_unitaire']),
+        'VAN': float(res['VAN']),
+        'faisable': bool(evap.converge and np.all(evap.A > 0)),
+    }
+
+
+class OptimiseurTechnicoEconomique:
+    """
+    Optimisation technico-économique de l'usine (nombre d'effets entier et
+    variables continues).
+    
+    Pour chaque nombre d'effets, les variables continues sont optimisées
+    par évolution différentielle (sans dérivées: les bilans de
+    l'évaporateur donnent une réponse non lisse). La population de chaque
+    génération est évaluée en un lot, en parallèle et à travers un cache;
+    l'optimisation d'un nombre d'effets part de l'optimum du nombre
+    d'effets voisin déjà traité.
+    """
+    
+    # Variables continues par défaut: (borne inférieure, borne supérieure)
+    VARIABLES = {
+        'P_vapeur': (2.5, 4.5),  # bar
+        'x_final': (0.55, 0.70),  # fraction massique
+        'P_condenseur': (0.10, 0.25),  # bar - pression du dernier effet
+        'masse_batch': (3000, 8000),  # kg - recette du cristalliseur
+        'duree': (2 * 3600, 6 * 3600),  # s - recette du cristalliseur
+    }
+    
+    def __init__(self, variables=None, fichier_cache=None, n_workers=None,
+                 backend='processus'):
+        """
+        Initialisation.
+        
+        Args:
+            variables (dict): Nom -> (bas, haut) (None: VARIABLES)
+            fichier_cache (str): Cache .jsonl des évaluations (None: en mémoire)
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+        """
+        self.variables = dict(variables or self.VARIABLES)
+        self.cache = CacheEvaluations(fichier_cache, contexte='evaluer_usine')
+        self.n_workers = n_workers
+        self.backend = backend
+        self.historique = {}  # Meilleur objectif de chaque génération, par n_effets
+        self.resultats = None
+    
+    def objectif(self, X, n_effets, critere):
+        """
+        Objectif (à minimiser) d'une population de candidats.
+        
+        Args:
+            X (array): Candidats (nombre de variables, S), format vectorisé
+                de differential_evolution
+            n_effets (int): Nombre d'effets
+            critere (str): 'cout_unitaire' (minimisé) ou 'VAN' (maximisée)
+            
+        Returns:
+            np.array: Objectif (S,), infini pour un candidat non faisable
+        """
+        points = [dict(zip(self.variables, map(float, x)), n_effets=n_effets)
+                  for x in np.atleast_2d(X.T)]
+        resultats = self.cache.evaluer(evaluer_usine, points, taille_lot=len(points),
+                                       n_workers=self.n_workers, backend=self.backend,
+                                       verbose=False)
+        signe = -1 if critere == 'VAN' else 1
+        valeurs = np.array([signe * r[critere] if r['faisable'] else np.inf
+                            for r in resultats])
+        self.historique.setdefault(n_effets, []).append(valeurs.min())
+        return valeurs
+    
+    def optimiser(self, critere='cout_unitaire', n_effets=(2, 3, 4, 5), maxiter=30,
+                  popsize=10, graine=0):
+        """
+        Recherche la configuration optimale.
+        
+        Args:
+            critere (str): 'cout_unitaire' (minimisé) ou 'VAN' (maximisée)
+            n_effets (iterable): Nombres d'effets envisagés
+            maxiter (int): Générations de l'évolution différentielle
+            popsize (int): Taille de population (multiple du nombre de variables)
+            graine (int): Graine du générateur
+            
+        Returns:
+            dict: Optimum ('n_effets', variables, indicateurs), tableau par
+                nombre d'effets, évaluations du modèle et temps de calcul
+        """
+        if critere not in ('cout_unitaire', 'VAN'):
+            raise ValueError(f"Critère inconnu: {critere}")
+        print(f"\nOptimisation technico-économique ({critere}, "
+              f"{', '.join(self.variables)})...")
+        
+        debut = time.perf_counter()
+        appels_initiaux = self.cache.n_appels
+        bornes = list(self.variables.values())
+        x0 = None
+        lignes = []
+        self.historique = {}
+        for n in n_effets:
+            sol = differential_evolution(
+                self.objectif, bornes, args=(n, critere), x0=x0, maxiter=maxiter,
+                popsize=popsize, seed=graine, polish=False, vectorized=True,
+                updating='deferred')
+            if np.isfinite(sol.fun):
+                x0 = sol.x  # Départ de l'optimisation du nombre d'effets suivant
+            
+            # Optimum relu par le cache (déjà évalué pendant la recherche)
+            point = dict(zip(self.variables, map(float, sol.x)), n_effets=n)
+            indicateurs = self.cache.evaluer(evaluer_usine, [point], n_workers=1,
+                                             backend='serie', verbose=False)[0]
+            lignes.append({**point, **{cle: indicateurs[cle] for cle in
+                                       ('economie', 'surface_totale', 'cout_unitaire',
+                                        'VAN', 'faisable')}})
+            print(f"  {n} effets: {critere} = {indicateurs[critere]:,.2f} "
+                  f"({sol.nit} générations)")
+        
+        tableau = pd.DataFrame(lignes)
+        faisables = tableau[tableau['faisable']]
+        if faisables.empty:
+            raise RuntimeError("Aucune configuration faisable trouvée")
+        meilleur = (faisables[critere].idxmin() if critere == 'cout_unitaire'
+                    else faisables[critere].idxmax())
+        
+        self.resultats = {
+            'critere': critere,
+            'optimum': tableau.loc[meilleur].to_dict(),
+            'par_n_effets': tableau,
+            'n_evaluations': self.cache.n_appels - appels_initiaux,
+            'temps_calcul': time.perf_counter() - debut,
+        }
+        return self.resultats
+    
+    def afficher_resultats(self):
+        """
+        Affiche l'optimum et le coût de la recherche.
+        """
+        r = self.resultats
+        print("\n" + "="*70)
+        print(f"OPTIMUM TECHNICO-ÉCONOMIQUE ({r['critere']})")
+        print("="*70)
+        print("\n" + r['par_n_effets'].to_string(index=False,
+                                                 float_format=lambda v: f"{v:.4g}"))
+        
+        optimum = r['optimum']
+        print(f"\nCONFIGURATION OPTIMALE: {int(optimum['n_effets'])} effets")
+        for nom in self.variables:
+            print(f"  {nom}: {optimum[nom]:.4g}")
+        print(f"  Coût de production: {optimum['cout_unitaire']:.2f} €/tonne")
+        print(f"  VAN: {optimum['VAN']:,.0f} €")
+        print(f"\nÉvaluations du modèle: {r['n_evaluations']} "
+              f"(cache: {len(self.cache)} points)")
+        print(f"Temps de calcul: {r['temps_calcul']:.1f} s")
+        print("="*70)
+    
+    def tracer_resultats(self):
+        """
+        Trace la convergence et l'optimum par nombre d'effets.
+        """
+        r = self.resultats
+        signe = -1 if r['critere'] == 'VAN' else 1
+        
+        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        for n, historique in self.historique.items():
+            # Meilleur objectif atteint après chaque génération
+            meilleur = np.minimum.accumulate(historique)
+            axes[0].plot(np.arange(len(meilleur)), signe * meilleur, linewidth=2,
+                         label=f'{n} effets')
+        axes[0].set_xlabel('Génération', fontsize=12)
+        axes[0].set_ylabel(r['critere'], fontsize=12)
+        axes[0].set_title('Convergence', fontsize=13, fontweight='bold')
+        axes[0].legend()
+        axes[0].grid(True, alpha=0.3)
+        
+        tableau = r['par_n_effets']
+        axes[1].bar(tableau['n_effets'], tableau[r['critere']], color='steelblue',
+                    edgecolor='black')
+        axes[1].set_xlabel("Nombre d'effets", fontsize=12)
+        axes[1].set_ylabel(r['critere'], fontsize=12)
+        axes[1].set_title("Optimum par nombre d'effets", fontsize=13, fontweight='bold')
+        axes[1].grid(True, alpha=0.3, axis='y')
+        
+        plt.tight_layout()
+        nom_fichier = f"optimisation_technico_economique_{r['critere']}.png"
+        sauvegarder_figure(fig, nom_fichier)
 
 
 if __name__ == "__main__":
@@ -531,7 +1154,15 @@ if __name__ == "__main__":
     # analyse.analyse_pression_vapeur()
     # analyse.analyse_concentration_finale()
     # analyse.analyse_debit_alimentation()
+    analyse.tracer_resultats()  # Rendu séparé des calculs
     
     # Analyse économique
     # eco = AnalyseEconomique()
-    # eco.comparer_configurations()
+    # eco.comparer_configurations(tracer=True)
+    # eco.tracer_monte_carlo(eco.monte_carlo_prix(n_scenarios=1_000_000))
+    
+    # Optimisation technico-économique (coût de production minimal)
+    optimiseur = OptimiseurTechnicoEconomique(fichier_cache='optimisation.jsonl')
+    optimiseur.optimiser(critere='cout_unitaire', maxiter=20)
+    optimiseur.afficher_resultats()
+    optimiseur.tracer_resultats()
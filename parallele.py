@@ -0,0 +1,153 @@
+"""
+Module Parallèle
+Exécution d'études de simulation en série, en pool de threads ou de processus
+Auteur: Projet PIC 2024-2025
+"""
+
+import os
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+
+BACKENDS = ('serie', 'threads', 'processus')
+
+
+class EchecTache:
+    """
+    Échec d'une tâche, renvoyé à sa place dans les résultats.
+    """
+    
+    def __init__(self, tache, erreur):
+        """
+        Initialisation.
+        
+        Args:
+            tache: Arguments de la tâche en échec
+            erreur (Exception): Exception levée par la tâche
+        """
+        self.tache = tache
+        self.type_erreur = type(erreur).__name__
+        self.message = str(erreur)
+    
+    def __repr__(self):
+        return f"EchecTache({self.tache!r}, {self.type_erreur}: {self.message})"
+
+
+def _executer_protege(fonction, tache):
+    """Applique la fonction à une tâche en capturant son échec éventuel."""
+    try:
+        return fonction(tache)
+    except Exception as erreur:
+        return EchecTache(tache, erreur)
+
+
+def nombre_workers(n_workers=None, n_taches=None):
+    """
+    Nombre de workers à utiliser.
+    
+    Args:
+        n_workers (int): Nombre demandé (None: nombre de cœurs)
+        n_taches (int): Nombre de tâches (borne supérieure)
+        
+    Returns:
+        int: Nombre de workers (au moins 1)
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_taches is not None:
+        n_workers = min(n_workers, n_taches)
+    return max(1, n_workers)
+
+
+def executer_taches(fonction, taches, n_workers=None, taille_lot=None,
+                    backend='processus', conserver_echecs=False, pool=None):
+    """
+    Applique une fonction à une liste de tâches en série ou dans un pool.
+    
+    Les résultats sont renvoyés dans l'ordre des tâches, quel que soit
+    l'ordre de fin des workers. Avec le backend 'processus', la fonction doit
+    être définie au niveau d'un module (sérialisable par pickle); le backend
+    'threads' convient aux fonctions qui libèrent le GIL (NumPy, SciPy). Avec
+    un seul worker, les tâches sont exécutées en série sans créer de pool.
+    Un pool existant peut être fourni pour des appels répétés (itérations
+    d'un optimiseur): il n'est alors ni créé ni fermé ici.
+    
+    Args:
+        fonction (callable): Fonction appliquée à chaque tâche
+        taches (iterable): Arguments successifs de la fonction
+        n_workers (int): Nombre de workers (None: nombre de cœurs)
+        taille_lot (int): Tâches envoyées par échange avec un processus
+            (None: environ 4 lots par processus)
+        backend (str): 'serie', 'threads' ou 'processus'
+        conserver_echecs (bool): Une tâche en échec donne un EchecTache à sa
+            place au lieu d'interrompre l'étude
+        pool (Executor): Pool concurrent.futures réutilisé (remplace backend
+            et n_workers; None: pool créé pour cet appel)
+            
+    Returns:
+        list: Résultats, dans l'ordre des tâches
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inconnu: {backend} (choix: {', '.join(BACKENDS)})")
+    
+    taches = list(taches)
+    n_workers = nombre_workers(n_workers, len(taches))
+    if conserver_echecs:
+        fonction = functools.partial(_executer_protege, fonction)
+    
+    if pool is not None:
+        return list(pool.map(fonction, taches,
+                             chunksize=taille_lot or max(1, len(taches) // (4 * n_workers))))
+    
+    if backend == 'serie' or n_workers == 1:
+        return [fonction(tache) for tache in taches]
+    
+    if backend == 'threads':
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            return list(pool.map(fonction, taches))
+    
+    if taille_lot is None:
+        taille_lot = max(1, len(taches) // (4 * n_workers))
+    
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(fonction, taches, chunksize=taille_lot))
+
+
+def iterer_taches(fonction, taches, n_workers=None, backend='processus',
+                  conserver_echecs=False):
+    """
+    Applique une fonction à des tâches et produit les résultats dès leur fin.
+    
+    Contrairement à executer_taches, les résultats arrivent dans l'ordre de
+    fin des workers, accompagnés de l'indice de leur tâche: une étude longue
+    peut être affichée ou enregistrée au fil de l'eau.
+    
+    Args:
+        fonction (callable): Fonction appliquée à chaque tâche
+        taches (iterable): Arguments successifs de la fonction
+        n_workers (int): Nombre de workers (None: nombre de cœurs)
+        backend (str): 'serie', 'threads' ou 'processus'
+        conserver_echecs (bool): Une tâche en échec donne un EchecTache à sa
+            place au lieu d'interrompre l'étude
+            
+    Yields:
+        tuple: (indice de la tâche, résultat)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inconnu: {backend} (choix: {', '.join(BACKENDS)})")
+    
+    taches = list(taches)
+    n_workers = nombre_workers(n_workers, len(taches))
+    if conserver_echecs:
+        fonction = functools.partial(_executer_protege, fonction)
+    
+    if backend == 'serie' or n_workers == 1:
+        for indice, tache in enumerate(taches):
+            yield indice, fonction(tache)
+        return
+    
+    Pool = ThreadPoolExecutor if backend == 'threads' else ProcessPoolExecutor
+    with Pool(max_workers=n_workers) as pool:
+        futurs = {pool.submit(fonction, tache): indice for indice, tache in enumerate(taches)}
+        for futur in as_completed(futurs):
+            yield futurs[futur], futur.result()
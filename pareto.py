@@ -0,0 +1,383 @@
+"""
+Module Pareto
+Front de Pareto investissement / exploitation / qualité du produit
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from cristallisation import dimensionner_cristalliseurs
+from optimisation import construire_usine
+from cache import CacheEvaluations
+from rendu import sauvegarder_figure
+
+
+# Variables de conception par défaut: (borne inférieure, borne supérieure)
+VARIABLES = {
+    'n_effets': (2, 5),  # entier
+    'P_vapeur': (2.5, 4.5),  # bar
+    'P_condenseur': (0.10, 0.25),  # bar - pression du dernier effet
+    'masse_batch': (3000, 8000),  # kg - recette du cristalliseur
+    'duree': (2 * 3600, 6 * 3600),  # s - recette du cristalliseur
+    'T_f': (30, 45),  # °C - température finale du refroidissement
+    'masse_semence': (0, 50),  # kg - semence
+}
+
+# Sens des objectifs disponibles: 1 minimisé, -1 maximisé
+SENS_OBJECTIFS = {
+    'TCI': 1,  # €
+    'OPEX': 1,  # €/an
+    'CV': 1,  # %
+    'L50': -1,  # µm
+    'cout_unitaire': 1,  # €/t
+    'VAN': -1,  # €
+}
+
+
+def evaluer_conception(point):
+    """
+    Investissement, exploitation et qualité du produit d'une conception.
+    
+    L'usine est construite par construire_usine; le cristalliseur est
+    simulé (profil linéaire) pour la taille moyenne et la dispersion des
+    cristaux. Définie au niveau du module pour un pool de processus.
+    
+    Args:
+        point (dict): Valeurs des paramètres (et 'n_effets', 3 par défaut)
+        
+    Returns:
+        dict: 'TCI' (€), 'OPEX' (€/an), 'L50' (µm), 'CV' (%),
+            'cout_unitaire' (€/t), 'VAN' (€) et 'faisable'
+    """
+    eco, evap, crist = construire_usine(point)
+    crist_dims = dimensionner_cristalliseurs(crist.masse_batch, crist.duree,
+                                             crist.T_0, crist.T_f)
+    res = eco.indicateurs(evap, crist_dims)
+    
+    try:
+        crist.simuler(profil='lineaire', n_points=2, methode='LSODA', verbose=False)
+        L_50, CV, simule = crist.L_50 * 1e6, crist.CV, True
+    except Exception:
+        L_50, CV, simule = np.nan, np.nan, False
+    
+    return {
+        'TCI': float(res['TCI']),
+        'OPEX': float(res['OPEX']),
+        'L50': float(L_50),
+        'CV': float(CV),
+        'cout_unitaire': float(res['cout_unitaire']),
+        'VAN': float(res['VAN']),
+        'faisable': bool(evap.converge and np.all(evap.A > 0) and simule
+                         and np.isfinite(L_50) and np.isfinite(CV)),
+    }
+
+
+def rangs_non_domines(F):
+    """
+    Tri non dominé (rang de front de Pareto) d'un ensemble de points.
+    
+    La matrice de dominance de tous les couples est calculée en une
+    opération; les fronts sont ensuite retirés un à un.
+    
+    Args:
+        F (array): Objectifs à minimiser (n, nombre d'objectifs)
+        
+    Returns:
+        np.array: Rang de chaque point (0: front de Pareto)
+    """
+    F = np.asarray(F, dtype=float)
+    inferieur_egal = np.all(F[:, None, :] <= F[None, :, :], axis=2)
+    strictement = np.any(F[:, None, :] < F[None, :, :], axis=2)
+    domine = inferieur_egal & strictement  # domine[i, j]: i domine j
+    
+    rangs = np.full(len(F), -1)
+    n_dominants = domine.sum(axis=0)
+    rang = 0
+    while np.any(rangs < 0):
+        front = (n_dominants == 0) & (rangs < 0)
+        rangs[front] = rang
+        n_dominants = n_dominants - domine[front].sum(axis=0)
+        rang += 1
+    return rangs
+
+
+def distances_encombrement(F, rangs):
+    """
+    Distance d'encombrement de chaque point au sein de son front.
+    
+    Args:
+        F (array): Objectifs (n, nombre d'objectifs)
+        rangs (array): Rangs de rangs_non_domines
+        
+    Returns:
+        np.array: Distances (infinies aux extrémités de chaque front)
+    """
+    F = np.asarray(F, dtype=float)
+    distances = np.zeros(len(F))
+    for rang in np.unique(rangs):
+        membres = np.flatnonzero(rangs == rang)
+        if len(membres) <= 2:
+            distances[membres] = np.inf
+            continue
+        G = F[membres]
+        ordre = np.argsort(G, axis=0)
+        tries = np.take_along_axis(G, ordre, axis=0)
+        etendue = tries[-1] - tries[0]
+        etendue[etendue == 0] = 1
+        contributions = np.zeros_like(G)
+        contributions[1:-1] = (tries[2:] - tries[:-2]) / etendue
+        contributions[[0, -1]] = np.inf
+        cumul = np.zeros_like(G)
+        np.put_along_axis(cumul, ordre, contributions, axis=0)
+        distances[membres] = cumul.sum(axis=1)
+    return distances
+
+
+class FrontPareto:
+    """
+    Front de Pareto multi-objectif de la conception de l'usine.
+    
+    Algorithme génétique NSGA-II vectorisé: tri non dominé et distance
+    d'encombrement, sélection par tournoi binaire, croisement SBX et
+    mutation polynomiale opèrent sur toute la population à la fois. Le
+    nombre d'effets est une variable entière (arrondie). Chaque génération
+    est évaluée en un lot, en parallèle et à travers un cache; les
+    conceptions non faisables sont classées après toutes les conceptions
+    faisables.
+    """
+    
+    def __init__(self, variables=None, objectifs=('TCI', 'OPEX', 'CV'), reference=None,
+                 fichier_cache=None, n_workers=None, backend='processus'):
+        """
+        Initialisation.
+        
+        Args:
+            variables (dict): Nom -> (bas, haut) (None: VARIABLES); 'n_effets'
+                est arrondi à l'entier
+            objectifs (tuple): Objectifs parmi SENS_OBJECTIFS
+            reference (dict): Paramètres fixes appliqués à chaque conception
+                (ex. cinétique de cristallisation)
+            fichier_cache (str): Cache .jsonl des évaluations (None: en mémoire)
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+        """
+        inconnus = [nom for nom in objectifs if nom not in SENS_OBJECTIFS]
+        if inconnus:
+            raise ValueError(f"Objectifs inconnus: {inconnus} "
+                             f"(choix: {', '.join(SENS_OBJECTIFS)})")
+        self.variables = dict(variables or VARIABLES)
+        self.objectifs = tuple(objectifs)
+        self.reference = dict(reference or {})
+        self.cache = CacheEvaluations(fichier_cache, contexte='evaluer_conception')
+        self.n_workers = n_workers
+        self.backend = backend
+        self.historique = []  # Taille du front de Pareto après chaque génération
+        self.resultats = None
+    
+    def decoder(self, X):
+        """
+        Paramètres des conceptions d'une population.
+        
+        Args:
+            X (array): Population (n, nombre de variables), bornes réelles
+            
+        Returns:
+            list: Paramètres (dict) de chaque conception
+        """
+        points = []
+        for x in X:
+            point = dict(zip(self.variables, map(float, x)))
+            if 'n_effets' in point:
+                point['n_effets'] = int(round(point['n_effets']))
+            points.append(point)
+        return points
+    
+    def evaluer(self, X):
+        """
+        Évalue une population en un lot.
+        
+        Args:
+            X (array): Population (n, nombre de variables)
+            
+        Returns:
+            tuple: (objectifs à minimiser (n, nombre d'objectifs), faisabilité (n,),
+                résultats complets)
+        """
+        points = [dict(self.reference, **point) for point in self.decoder(X)]
+        resultats = self.cache.evaluer(evaluer_conception, points, taille_lot=len(points),
+                                       n_workers=self.n_workers, backend=self.backend,
+                                       verbose=False)
+        sens = np.array([SENS_OBJECTIFS[nom] for nom in self.objectifs])
+        F = np.array([[r[nom] for nom in self.objectifs] for r in resultats]) * sens
+        faisable = np.array([r['faisable'] for r in resultats])
+        return F, faisable, resultats
+    
+    @staticmethod
+    def classer(F, faisable):
+        """
+        Rangs et distances d'encombrement, conceptions non faisables en dernier.
+        
+        Args:
+            F (array): Objectifs à minimiser (n, nombre d'objectifs)
+            faisable (array): Faisabilité (n,)
+            
+        Returns:
+            tuple: (rangs (n,), distances (n,))
+        """
+        rangs = np.full(len(F), len(F))
+        distances = np.zeros(len(F))
+        if np.any(faisable):
+            rangs[faisable] = rangs_non_domines(F[faisable])
+            distances[faisable] = distances_encombrement(F[faisable], rangs[faisable])
+        return rangs, distances
+    
+    def optimiser(self, n_generations=30, taille_population=40, eta_croisement=15,
+                  eta_mutation=20, graine=0):
+        """
+        Construit le front de Pareto.
+        
+        Args:
+            n_generations (int): Nombre de générations
+            taille_population (int): Taille de la population (paire)
+            eta_croisement (float): Indice de distribution du croisement SBX
+            eta_mutation (float): Indice de distribution de la mutation polynomiale
+            graine (int): Graine du générateur
+            
+        Returns:
+            pd.DataFrame: Conceptions non dominées (variables et indicateurs)
+        """
+        print(f"\nFront de Pareto ({', '.join(self.objectifs)}; "
+              f"{taille_population} conceptions x {n_generations} générations)...")
+        
+        generateur = np.random.default_rng(graine)
+        bas, haut = np.array(list(self.variables.values()), dtype=float).T
+        if 'n_effets' in self.variables:
+            # Chaque entier occupe un intervalle de même largeur
+            k = list(self.variables).index('n_effets')
+            bas[k], haut[k] = bas[k] - 0.5 + 1e-9, haut[k] + 0.5 - 1e-9
+        n, d = taille_population + taille_population % 2, len(bas)
+        
+        debut = time.perf_counter()
+        appels_initiaux = self.cache.n_appels
+        X = bas + generateur.random((n, d)) * (haut - bas)
+        F, faisable, resultats = self.evaluer(X)
+        self.historique = []
+        
+        for generation in range(n_generations):
+            rangs, distances = self.classer(F, faisable)
+            
+            # Tournoi binaire: rang le plus faible, puis plus grande distance
+            a, b = generateur.integers(0, n, (2, n))
+            meilleur_a = (rangs[a] < rangs[b]) | ((rangs[a] == rangs[b]) &
+                                                  (distances[a] > distances[b]))
+            parents = X[np.where(meilleur_a, a, b)]
+            
+            # Croisement SBX des couples de parents (probabilité 0.9, 1/2 par variable)
+            p1, p2 = parents[0::2], parents[1::2]
+            u = generateur.random(p1.shape)
+            beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta_croisement + 1)),
+                            (1 / (2 * (1 - u))) ** (1 / (eta_croisement + 1)))
+            croiser = ((generateur.random(p1.shape) < 0.5) &
+                       (generateur.random((len(p1), 1)) < 0.9))
+            beta = np.where(croiser, beta, 1)
+            enfants = np.concatenate([0.5 * ((1 + beta) * p1 + (1 - beta) * p2),
+                                      0.5 * ((1 - beta) * p1 + (1 + beta) * p2)])
+            
+            # Mutation polynomiale (probabilité 1/d par variable)
+            u = generateur.random(enfants.shape)
+            delta = np.where(u < 0.5, (2 * u) ** (1 / (eta_mutation + 1)) - 1,
+                             1 - (2 * (1 - u)) ** (1 / (eta_mutation + 1)))
+            muter = generateur.random(enfants.shape) < 1 / d
+            enfants = np.clip(enfants + muter * delta * (haut - bas), bas, haut)
+            
+            # Sélection élitiste parmi parents et enfants
+            F_enfants, faisable_enfants, resultats_enfants = self.evaluer(enfants)
+            X = np.concatenate([X, enfants])
+            F = np.concatenate([F, F_enfants])
+            faisable = np.concatenate([faisable, faisable_enfants])
+            resultats = resultats + resultats_enfants
+            rangs, distances = self.classer(F, faisable)
+            survivants = np.lexsort((-distances, rangs))[:n]
+            X, F, faisable = X[survivants], F[survivants], faisable[survivants]
+            resultats = [resultats[i] for i in survivants]
+            
+            self.historique.append(int(np.sum(rangs[survivants] == 0)))
+        
+        rangs, _ = self.classer(F, faisable)
+        pareto = np.flatnonzero((rangs == 0) & faisable)
+        points = self.decoder(X[pareto])
+        front = pd.DataFrame([{**points[j], **{cle: resultats[i][cle] for cle in
+                                                SENS_OBJECTIFS}}
+                              for j, i in enumerate(pareto)])
+        front = front.drop_duplicates().sort_values(self.objectifs[0]).reset_index(drop=True)
+        
+        self.resultats = {
+            'front': front,
+            'n_evaluations': self.cache.n_appels - appels_initiaux,
+            'temps_calcul': time.perf_counter() - debut,
+        }
+        print(f"  {len(front)} conceptions non dominées, "
+              f"{self.resultats['n_evaluations']} évaluations du modèle, "
+              f"{self.resultats['temps_calcul']:.1f} s")
+        return front
+    
+    def afficher_resultats(self):
+        """
+        Affiche les conceptions non dominées.
+        """
+        print("\n" + "="*70)
+        print(f"FRONT DE PARETO ({', '.join(self.objectifs)})")
+        print("="*70)
+        front = self.resultats['front']
+        colonnes = list(self.variables) + list(SENS_OBJECTIFS)
+        print("\n" + front[colonnes].to_string(index=False,
+                                               float_format=lambda v: f"{v:.4g}"))
+        print(f"\nÉvaluations du modèle: {self.resultats['n_evaluations']} "
+              f"(cache: {len(self.cache)} points)")
+    
+    def tracer_front(self, titre_supplement=''):
+        """
+        Trace les projections du front de Pareto deux objectifs à la fois.
+        
+        Args:
+            titre_supplement (str): Texte additionnel pour le titre
+            
+        Returns:
+            str: Fichier sauvegardé
+        """
+        front = self.resultats['front']
+        couples = [(i, j) for i in range(len(self.objectifs))
+                   for j in range(i + 1, len(self.objectifs))]
+        fig, axes = plt.subplots(1, len(couples), figsize=(6 * len(couples), 5),
+                                 squeeze=False)
+        couleur = front['n_effets'] if 'n_effets' in front else None
+        
+        for ax, (i, j) in zip(axes[0], couples):
+            x, y = self.objectifs[i], self.objectifs[j]
+            nuage = ax.scatter(front[x], front[y], c=couleur, cmap='viridis', s=50,
+                               edgecolor='black')
+            ax.set_xlabel(x, fontsize=12)
+            ax.set_ylabel(y, fontsize=12)
+            ax.set_title(f'{y} / {x}', fontsize=13, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+        if couleur is not None:
+            fig.colorbar(nuage, ax=axes[0].tolist(), label="Nombre d'effets")
+        
+        plt.suptitle(f'Front de Pareto {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        
+        nom_fichier = f'pareto_{titre_supplement.replace(" ", "_")}.png'
+        return sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module Pareto ===")
+    
+    # Cinétique de cristallisation active (croissance et nucléation marquées)
+    front = FrontPareto(reference={'C_0': 88, 'k_g': 1e-5, 'E_g': 20000},
+                        fichier_cache='pareto.jsonl')
+    front.optimiser(n_generations=20, taille_population=40)
+    front.afficher_resultats()
+    front.tracer_front(titre_supplement='TCI OPEX CV')
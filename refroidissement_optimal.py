@@ -0,0 +1,438 @@
+"""
+Module Refroidissement Optimal
+Optimisation dynamique de la trajectoire de température par collocation
+orthogonale sur éléments finis (Radau IIA)
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+from scipy.optimize import minimize, LinearConstraint, NonlinearConstraint, Bounds
+import matplotlib.pyplot as plt
+from cristallisation import CristalliseurBatch
+from rendu import sauvegarder_figure
+
+
+class OptimiseurRefroidissement:
+    """
+    Optimisation de la trajectoire de refroidissement T(t) d'un batch.
+    
+    Le modèle des moments de CristalliseurBatch (moments en échelle
+    logarithmique et concentration) est discrétisé par collocation de
+    Radau IIA à 3 points sur n_intervalles éléments finis. La température
+    est continue et linéaire par morceaux entre les bornes des éléments.
+    Le problème non linéaire creux obtenu est résolu par
+    scipy.optimize.minimize (méthode 'trust-constr'), avec jacobiens des
+    contraintes creux et hessien du lagrangien bloc-diagonal.
+    """
+    
+    def __init__(self, cristalliseur=None, n_intervalles=50, vitesse_max=None):
+        """
+        Initialisation de l'optimiseur.
+        
+        Args:
+            cristalliseur (CristalliseurBatch): Modèle de cinétiques utilisé
+            n_intervalles (int): Nombre d'intervalles de commande
+            vitesse_max (float): Vitesse de refroidissement maximale (°C/h),
+                par défaut 3 fois la pente du profil linéaire
+        """
+        self.crist = cristalliseur if cristalliseur is not None else CristalliseurBatch()
+        self.n_intervalles = n_intervalles
+        self.h = self.crist.duree / n_intervalles  # s - Longueur d'un élément
+        
+        if vitesse_max is None:
+            vitesse_max = 3 * (self.crist.T_0 - self.crist.T_f) / (self.crist.duree / 3600)
+        self.vitesse_max = vitesse_max  # °C/h
+        
+        # Points de Radau IIA (K = 3) et matrice de dérivation de Lagrange
+        racine6 = np.sqrt(6)
+        self.tau = np.array([0, (4 - racine6) / 10, (4 + racine6) / 10, 1])
+        self.K = len(self.tau) - 1
+        puissances = np.arange(self.K + 1)
+        V = self.tau[:, None] ** puissances
+        V_derivee = puissances * self.tau[:, None] ** np.maximum(puissances - 1, 0)
+        self.D = V_derivee @ np.linalg.inv(V)
+        
+        self.n_points = n_intervalles * self.K + 1  # Points d'état partagés
+        self.n_etats = 5 * self.n_points
+        self.n_variables = self.n_etats + n_intervalles + 1
+        
+        # Temps des points d'état et des bornes des éléments
+        elements = np.arange(n_intervalles)
+        self.temps_points = np.append(
+            ((elements[:, None] + self.tau[None, :-1]) * self.h).ravel(),
+            self.crist.duree
+        )
+        self.temps_controle = np.linspace(0, self.crist.duree, n_intervalles + 1)
+        
+        self.y0 = np.append(self.crist.moments_initiaux(), self.crist.C_0)
+        self.T_optimal = None
+        self.L_50 = 0
+        self.CV = 0
+        self.statistiques = {}
+        self._cache = (None, None)
+        
+        # Volume nécessaire au modèle (comme dans CristalliseurBatch.simuler)
+        self.crist.V_cristalliseur = self.crist.masse_batch / 1300
+    
+    def _indices(self):
+        """
+        Indices des points d'état et des températures de chaque collocation.
+        
+        Returns:
+            tuple: (points (N, K), températures gauche/droite (N, K))
+        """
+        elements = np.arange(self.n_intervalles)[:, None]
+        points = elements * self.K + np.arange(1, self.K + 1)[None, :]
+        return points, np.broadcast_to(elements, points.shape)
+    
+    def _dynamique(self, x):
+        """
+        Second membre en variables logarithmiques aux points de collocation.
+        
+        Args:
+            x (array): Vecteur des variables de décision
+            
+        Returns:
+            tuple: (g (N, K, 5), ∂g/∂état (N, K, 5, 5), ∂g/∂T (N, K, 5))
+        """
+        if self._cache[0] is not None and np.array_equal(self._cache[0], x):
+            return self._cache[1]
+        
+        P = x[:self.n_etats].reshape(self.n_points, 5)
+        T = x[self.n_etats:]
+        points, gauche = self._indices()
+        tau = self.tau[1:][None, :]
+        T_C = (1 - tau) * T[gauche] + tau * T[gauche + 1]
+        
+        resultat = self.crist.dynamique_logarithmique(P[points], T_C)
+        self._cache = (x.copy(), resultat)
+        return resultat
+    
+    def contraintes_collocation(self, x):
+        """
+        Résidus de collocation Σ D_jl X_l - h g(X_j, T_j) sur tous les éléments.
+        
+        Args:
+            x (array): Vecteur des variables de décision
+            
+        Returns:
+            np.array: Résidus (N·K·5)
+        """
+        P = x[:self.n_etats].reshape(self.n_points, 5)
+        g, _, _ = self._dynamique(x)
+        
+        elements = np.arange(self.n_intervalles)[:, None] * self.K
+        X = P[elements + np.arange(self.K + 1)[None, :]]  # (N, K+1, 5)
+        derivee = np.einsum('jl,ilk->ijk', self.D[1:], X)
+        return (derivee - self.h * g).ravel()
+    
+    def jacobien_collocation(self, x):
+        """
+        Jacobien creux des résidus de collocation.
+        
+        Args:
+            x (array): Vecteur des variables de décision
+            
+        Returns:
+            scipy.sparse.csr_matrix: Jacobien (N·K·5, n_variables)
+        """
+        _, J_etat, J_T = self._dynamique(x)
+        points, gauche = self._indices()
+        N, K = points.shape
+        lignes = np.arange(N * K * 5).reshape(N, K, 5)
+        
+        # Matrice de dérivation (même composante k, points l de l'élément)
+        debut = (np.arange(N) * K)[:, None, None, None]
+        l = np.arange(K + 1)[None, None, :, None]
+        k = np.arange(5)[None, None, None, :]
+        lig_D = np.broadcast_to(lignes[:, :, None, :], (N, K, K + 1, 5))
+        col_D = np.broadcast_to(5 * (debut + l) + k, (N, K, K + 1, 5))
+        val_D = np.broadcast_to(self.D[1:][None, :, :, None], (N, K, K + 1, 5))
+        
+        # Dynamique au point de collocation
+        lig_g = np.broadcast_to(lignes[..., None], (N, K, 5, 5))
+        col_g = 5 * points[..., None, None] + np.arange(5)[None, None, None, :]
+        col_g = np.broadcast_to(col_g, (N, K, 5, 5))
+        val_g = -self.h * J_etat
+        
+        # Température linéaire entre les bornes de l'élément
+        tau = self.tau[1:][None, :, None]
+        lig_T = np.concatenate([lignes, lignes], axis=-1)
+        col_T = self.n_etats + np.concatenate([
+            np.broadcast_to(gauche[..., None], (N, K, 5)),
+            np.broadcast_to(gauche[..., None] + 1, (N, K, 5))
+        ], axis=-1)
+        val_T = -self.h * np.concatenate([(1 - tau) * J_T, tau * J_T], axis=-1)
+        
+        lig = np.concatenate([lig_D.ravel(), lig_g.ravel(), lig_T.ravel()])
+        col = np.concatenate([col_D.ravel(), col_g.ravel(), col_T.ravel()])
+        val = np.concatenate([val_D.ravel(), val_g.ravel(), val_T.ravel()])
+        return sparse.coo_matrix((val, (lig, col)),
+                                 shape=(N * K * 5, self.n_variables)).tocsr()
+    
+    def hessien_collocation(self, x, v):
+        """
+        Hessien de Σ v_r c_r(x), bloc-diagonal par point de collocation.
+        
+        Les blocs 6x6 (état, température locale) sont obtenus par
+        différences finies centrées des gradients analytiques, puis
+        projetés sur les températures aux bornes des éléments.
+        
+        Args:
+            x (array): Vecteur des variables de décision
+            v (array): Multiplicateurs de Lagrange des contraintes
+            
+        Returns:
+            scipy.sparse.csr_matrix: Hessien (n_variables, n_variables)
+        """
+        P = x[:self.n_etats].reshape(self.n_points, 5)
+        T = x[self.n_etats:]
+        points, gauche = self._indices()
+        lam = -self.h * v.reshape(self.n_intervalles, self.K, 5)
+        tau = np.broadcast_to(self.tau[1:][None, :], points.shape)
+        etats = P[points]
+        T_C = (1 - tau) * T[gauche] + tau * T[gauche + 1]
+        
+        # Différences finies du gradient local (λ·∂g/∂état, λ·∂g/∂T)
+        H = np.zeros(points.shape + (6, 6))
+        for a in range(6):
+            if a < 5:
+                pas = 1e-6 * np.maximum(np.abs(etats[..., a]), 1.0)
+            else:
+                pas = np.full(points.shape, 1e-4)
+            gradients = []
+            for signe in (1, -1):
+                e, T_p = etats.copy(), T_C.copy()
+                if a < 5:
+                    e[..., a] += signe * pas
+                else:
+                    T_p += signe * pas
+                _, J_e, J_t = self.crist.dynamique_logarithmique(e, T_p)
+                gradients.append(np.concatenate([
+                    np.einsum('...k,...kl->...l', lam, J_e),
+                    np.sum(lam * J_t, axis=-1, keepdims=True)
+                ], axis=-1))
+            H[..., a, :] = (gradients[0] - gradients[1]) / (2 * pas[..., None])
+        H = 0.5 * (H + np.swapaxes(H, -1, -2))
+        
+        # Variables locales -> variables globales (états, T_i, T_i+1)
+        M = np.zeros(points.shape + (6, 7))
+        M[..., np.arange(5), np.arange(5)] = 1
+        M[..., 5, 5] = 1 - tau
+        M[..., 5, 6] = tau
+        blocs = np.einsum('...ai,...ab,...bj->...ij', M, H, M)
+        indices = np.concatenate([
+            5 * points[..., None] + np.arange(5),
+            self.n_etats + gauche[..., None] + np.arange(2)
+        ], axis=-1)
+        lig = np.broadcast_to(indices[..., :, None], blocs.shape)
+        col = np.broadcast_to(indices[..., None, :], blocs.shape)
+        
+        return sparse.coo_matrix(
+            (blocs.ravel(), (lig.ravel(), col.ravel())),
+            shape=(self.n_variables, self.n_variables)
+        ).tocsr()
+    
+    def gradient_objectif(self, objectif='CV'):
+        """
+        Gradient (constant) de l'objectif sur l'état final.
+        
+        'CV' minimise ln(m0·m2/m1²) = ln(1 + CV²); 'L50' maximise ln(m1/m0).
+        
+        Args:
+            objectif (str): 'CV' ou 'L50'
+            
+        Returns:
+            np.array: Gradient par rapport aux variables de décision
+        """
+        c = np.zeros(self.n_variables)
+        final = 5 * (self.n_points - 1)
+        if objectif == 'CV':
+            c[final:final + 3] = [1, -2, 1]
+        elif objectif == 'L50':
+            c[final:final + 2] = [1, -1]
+        else:
+            raise ValueError(f"Objectif inconnu: {objectif}")
+        return c
+    
+    def initialisation(self):
+        """
+        Point de départ: simulation du profil de refroidissement linéaire.
+        
+        Returns:
+            np.array: Vecteur initial des variables de décision
+        """
+        T = self.crist.profil_temperature_lineaire(self.temps_controle)
+        
+        def second_membre(t, z):
+            T_C = np.interp(t, self.temps_controle, T)
+            return self.crist.dynamique_logarithmique(z, T_C)[0]
+        
+        def jacobien(t, z):
+            T_C = np.interp(t, self.temps_controle, T)
+            return self.crist.dynamique_logarithmique(z, T_C)[1]
+        
+        z0 = np.append(np.log(self.y0[:4]), self.y0[4])
+        sol = solve_ivp(second_membre, (0, self.crist.duree), z0, method='Radau',
+                        jac=jacobien, t_eval=self.temps_points, rtol=1e-6,
+                        atol=1e-8)
+        if not sol.success:
+            raise RuntimeError(f"Échec de l'initialisation: {sol.message}")
+        return np.concatenate([sol.y.T.ravel(), T])
+    
+    def optimiser(self, objectif='CV', max_iterations=300, echelle_objectif=1e3,
+                  verbose=True):
+        """
+        Résout le problème d'optimisation dynamique.
+        
+        L'objectif varie peu entre trajectoires admissibles (quelques
+        centièmes sur ln(1 + CV²)) devant les résidus de collocation: il est
+        multiplié par echelle_objectif, sans quoi trust-constr atteint
+        max_iterations avant le critère d'optimalité.
+        
+        Args:
+            objectif (str): 'CV' (minimiser le coefficient de variation) ou
+                'L50' (maximiser la taille moyenne)
+            max_iterations (int): Nombre maximal d'itérations
+            echelle_objectif (float): Facteur d'échelle de l'objectif
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            scipy.optimize.OptimizeResult: Résultat de l'optimiseur
+        """
+        if verbose:
+            print(f"\nOptimisation du refroidissement (objectif {objectif}, "
+                  f"{self.n_intervalles} intervalles)...")
+        
+        N = self.n_intervalles
+        c = echelle_objectif * self.gradient_objectif(objectif)
+        x0 = self.initialisation()
+        
+        # État initial et températures de début et de fin de batch fixés
+        A_fixe = sparse.lil_matrix((7, self.n_variables))
+        for k in range(5):
+            A_fixe[k, k] = 1
+        A_fixe[5, self.n_etats] = 1
+        A_fixe[6, self.n_etats + N] = 1
+        valeurs = np.append(np.append(np.log(self.y0[:4]), self.y0[4]),
+                            [self.crist.T_0, self.crist.T_f])
+        
+        # Refroidissement monotone à vitesse limitée: -v_max·h <= T_i+1 - T_i <= 0
+        A_vitesse = sparse.diags([-np.ones(N), np.ones(N)], [0, 1],
+                                 shape=(N, N + 1))
+        A_vitesse = sparse.hstack([sparse.csr_matrix((N, self.n_etats)), A_vitesse])
+        chute_max = self.vitesse_max * self.h / 3600
+        
+        lb = np.full(self.n_variables, -np.inf)
+        ub = np.full(self.n_variables, np.inf)
+        lb[self.n_etats:] = self.crist.T_f
+        ub[self.n_etats:] = self.crist.T_0
+        
+        contraintes = [
+            NonlinearConstraint(self.contraintes_collocation, 0, 0,
+                                jac=self.jacobien_collocation,
+                                hess=self.hessien_collocation),
+            LinearConstraint(A_fixe.tocsr(), valeurs, valeurs),
+            LinearConstraint(A_vitesse.tocsr(), -chute_max, 0),
+        ]
+        zero = sparse.csr_matrix((self.n_variables, self.n_variables))
+        
+        debut = time.perf_counter()
+        resultat = minimize(lambda x: c @ x, x0, jac=lambda x: c,
+                            hess=lambda x: zero, method='trust-constr',
+                            bounds=Bounds(lb, ub), constraints=contraintes,
+                            options={'maxiter': max_iterations, 'gtol': 1e-6,
+                                     'xtol': 1e-10})
+        duree_calcul = time.perf_counter() - debut
+        
+        self.x_optimal = resultat.x
+        self.T_optimal = resultat.x[self.n_etats:]
+        etats = resultat.x[:self.n_etats].reshape(self.n_points, 5)
+        m0, m1, m2 = np.exp(etats[-1, :3])
+        self.L_50 = m1 / m0
+        self.CV = np.sqrt(max(m2 * m0 / m1**2 - 1, 0)) * 100
+        self.statistiques = {
+            'objectif': objectif,
+            'statut': resultat.status,
+            'converge': resultat.status in (1, 2),  # Critère gtol ou xtol atteint
+            'n_iterations': resultat.nit,
+            'n_evaluations': resultat.nfev,
+            'violation_contraintes': resultat.constr_violation,
+            'temps_calcul': duree_calcul,
+        }
+        
+        if verbose:
+            print(f"  {resultat.message}")
+            print(f"  Itérations: {resultat.nit}, violation des contraintes: "
+                  f"{resultat.constr_violation:.1e}, {duree_calcul:.2f} s")
+            print(f"  Taille moyenne L50: {self.L_50*1e6:.1f} µm")
+            print(f"  Coefficient de variation CV: {self.CV:.1f}%")
+        if not self.statistiques['converge']:
+            print(f"Attention: optimisation non convergée ({resultat.message}); "
+                  f"trajectoire non optimale")
+        
+        return resultat
+    
+    def valider(self, methode='Radau', verbose=True):
+        """
+        Simule le profil optimal avec CristalliseurBatch (profil 'impose').
+        
+        Args:
+            methode (str): Intégrateur solve_ivp
+            verbose (bool): Affichage des résultats
+            
+        Returns:
+            CristalliseurBatch: Cristalliseur simulé
+            
+        Raises:
+            RuntimeError: Optimisation absente ou non convergée
+        """
+        if not self.statistiques.get('converge', False):
+            raise RuntimeError("Pas de trajectoire optimale convergée à valider "
+                               "(voir optimiser et statistiques['statut'])")
+        self.crist.profil_impose = (self.temps_controle, self.T_optimal)
+        self.crist.simuler(profil='impose', n_points=500, methode=methode,
+                           echelle_log=True, verbose=verbose)
+        return self.crist
+    
+    def tracer_trajectoire(self, titre_supplement=''):
+        """
+        Trace la trajectoire de température optimale et le profil linéaire.
+        
+        Args:
+            titre_supplement (str): Complément au titre
+        """
+        temps_h = self.temps_controle / 3600
+        
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(temps_h, self.T_optimal, 'b-o', markersize=3, linewidth=2,
+                label=f"Optimal ({self.statistiques.get('objectif', '')})")
+        ax.plot(temps_h, self.crist.profil_temperature_lineaire(self.temps_controle),
+                'r--', linewidth=2, label='Linéaire')
+        ax.set_xlabel('Temps (h)', fontsize=12)
+        ax.set_ylabel('Température (°C)', fontsize=12)
+        ax.set_title(f'Trajectoire de refroidissement optimale {titre_supplement}',
+                     fontsize=14, fontweight='bold')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        plt.tight_layout()
+        nom_fichier = f'refroidissement_optimal_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module refroidissement optimal ===")
+    
+    crist = CristalliseurBatch()
+    crist.C_0 = 90  # Sirop sursaturé dès le départ
+    crist.k_g = 1e-5  # Croissance rapide
+    crist.E_g = 20000
+    
+    optimiseur = OptimiseurRefroidissement(crist, n_intervalles=50)
+    optimiseur.optimiser(objectif='CV')
+    optimiseur.valider()
+    optimiseur.tracer_trajectoire(titre_supplement='CV')
@@ -0,0 +1,62 @@
+"""
+Module Rendu
+Sauvegarde des figures et rendu différé, éventuellement parallèle, des graphiques
+Auteur: Projet PIC 2024-2025
+"""
+
+import matplotlib.pyplot as plt
+from parallele import executer_taches
+
+
+def sauvegarder_figure(fig, nom_fichier):
+    """
+    Sauvegarde une figure (300 dpi) puis la ferme.
+    
+    La figure est retirée de pyplot: des rendus répétés ne conservent pas
+    les figures précédentes en mémoire.
+    
+    Args:
+        fig (Figure): Figure matplotlib
+        nom_fichier (str): Fichier image
+        
+    Returns:
+        str: Fichier sauvegardé
+    """
+    fig.savefig(nom_fichier, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"\nGraphique sauvegardé: {nom_fichier}")
+    return nom_fichier
+
+
+def _rendre(trace):
+    """
+    Exécute un tracé (fonction, arguments) dans un worker.
+    
+    Args:
+        trace (tuple): Fonction de tracé de niveau module et ses arguments
+        
+    Returns:
+        str: Fichier produit par la fonction de tracé
+    """
+    fonction, arguments = trace
+    return fonction(*arguments)
+
+
+def rendre_figures(traces, n_workers=None, backend='processus'):
+    """
+    Rend un ensemble de graphiques à partir de données déjà calculées.
+    
+    Chaque tracé crée, sauvegarde et ferme sa propre figure; le rendu peut
+    donc être différé après les calculs, réparti sur plusieurs processus ou
+    omis. pyplot n'étant pas sûr entre threads, préférer les backends
+    'serie' ou 'processus'.
+    
+    Args:
+        traces (list): Tuples (fonction, arguments), fonctions de niveau module
+        n_workers (int): Nombre de workers (None: nombre de cœurs)
+        backend (str): 'serie', 'threads' ou 'processus'
+        
+    Returns:
+        list: Fichiers produits, dans l'ordre des tracés
+    """
+    return executer_taches(_rendre, list(traces), n_workers=n_workers, backend=backend)
@@ -0,0 +1,181 @@
+"""
+Module Reprise
+Points de reprise des simulations longues (intégration par segments)
+Auteur: Projet PIC 2024-2025
+"""
+
+import os
+import time
+import hashlib
+import numpy as np
+from scipy.integrate import solve_ivp
+
+
+def _empreinte_element(empreinte, element):
+    """
+    Ajoute un élément à une empreinte en cours.
+    
+    Les tuples, listes et dictionnaires sont parcourus récursivement: les
+    tableaux qu'ils contiennent sont hachés par leur contenu binaire et non
+    par leur repr (tronquée par NumPy au-delà de 1000 éléments).
+    
+    Args:
+        empreinte: Objet hashlib en cours
+        element: Tableau, scalaire, chaîne ou séquence de ceux-ci
+    """
+    if isinstance(element, np.ndarray):
+        empreinte.update(repr(element.shape).encode())
+        empreinte.update(np.ascontiguousarray(element, dtype=float).tobytes())
+    elif isinstance(element, (tuple, list)):
+        empreinte.update(b'(')
+        for sous_element in element:
+            _empreinte_element(empreinte, sous_element)
+        empreinte.update(b')')
+    elif isinstance(element, dict):
+        _empreinte_element(empreinte, sorted(element.items()))
+    else:
+        empreinte.update(repr(element).encode())
+    empreinte.update(b'|')
+
+
+def signature(*elements):
+    """
+    Empreinte d'une configuration de simulation.
+    
+    Un point de reprise n'est réutilisé que pour la même empreinte
+    (paramètres, état initial, grille de sortie et options du solveur).
+    
+    Args:
+        *elements: Tableaux, scalaires, chaînes, ou tuples, listes et
+            dictionnaires de ceux-ci
+        
+    Returns:
+        str: Empreinte hexadécimale (SHA-256)
+    """
+    empreinte = hashlib.sha256()
+    for element in elements:
+        _empreinte_element(empreinte, element)
+    return empreinte.hexdigest()
+
+
+def sauvegarder_point(fichier, **tableaux):
+    """
+    Écrit un point de reprise (format .npz compressé).
+    
+    L'écriture passe par un fichier temporaire renommé ensuite: un arrêt
+    pendant la sauvegarde laisse intact le point de reprise précédent.
+    
+    Args:
+        fichier (str): Chemin du point de reprise (.npz)
+        **tableaux: Tableaux à sauvegarder
+    """
+    temporaire = fichier + '.tmp'
+    with open(temporaire, 'wb') as f:
+        np.savez_compressed(f, **tableaux)
+    os.replace(temporaire, fichier)
+
+
+def charger_point(fichier, empreinte):
+    """
+    Lit un point de reprise s'il existe.
+    
+    Args:
+        fichier (str): Chemin du point de reprise (.npz)
+        empreinte (str): Empreinte attendue de la configuration
+        
+    Returns:
+        dict: Tableaux du point de reprise (None si le fichier n'existe pas)
+    """
+    if not os.path.exists(fichier):
+        return None
+    with np.load(fichier) as donnees:
+        point = {cle: donnees[cle] for cle in donnees.files}
+    if str(point['signature']) != empreinte:
+        raise ValueError(f"Point de reprise incompatible avec la configuration: {fichier}")
+    return point
+
+
+def integrer_par_segments(fonction, t_span, z0, t_eval, methode, fichier,
+                          intervalle, empreinte, jac=None, args=(), rtol=1e-6,
+                          atol=1e-8, temps_calcul_max=None):
+    """
+    Intègre un système d'EDO par segments avec un point de reprise après chacun.
+    
+    Chaque segment [t_k, t_k+1] est une intégration solve_ivp partant de
+    l'état final du segment précédent, avec comme premier pas le dernier pas
+    accepté. Le point de reprise contient l'état, ce pas, les sorties déjà
+    calculées et les statistiques: une reprise reproduit exactement
+    l'intégration ininterrompue.
+    
+    Args:
+        fonction (callable): Second membre f(t, z, *args)
+        t_span (tuple): Intervalle d'intégration (t0, tf)
+        z0 (array): État initial
+        t_eval (array): Instants de sortie (croissants, dans t_span)
+        methode (str): Méthode solve_ivp ('LSODA', 'BDF', 'Radau')
+        fichier (str): Chemin du point de reprise (.npz)
+        intervalle (float): Durée simulée d'un segment (s)
+        empreinte (str): Empreinte de la configuration (voir signature)
+        jac (callable): Jacobien jac(t, z, *args)
+        args (tuple): Arguments supplémentaires de fonction et jac
+        rtol (float): Tolérance relative
+        atol (float or array): Tolérance absolue
+        temps_calcul_max (float): Arrêt volontaire après le segment au cours
+            duquel ce temps de calcul (s) est dépassé (None: sans limite)
+            
+    Returns:
+        dict: 'termine', 'solution' (len(t_eval), n), 't' (temps atteint),
+            'n_evaluations', 'n_jacobiens', 'n_pas', 'n_segments'
+    """
+    t0, tf = t_span
+    bornes = np.append(np.arange(t0, tf, intervalle), tf)
+    t_eval = np.asarray(t_eval, dtype=float)
+    
+    point = charger_point(fichier, empreinte)
+    if point is None:
+        point = {
+            'signature': np.array(empreinte),
+            'segment': np.array(0),
+            'z': np.asarray(z0, dtype=float),
+            'premier_pas': np.array(np.nan),
+            'solution': np.full((len(t_eval), len(z0)), np.nan),
+            'compteurs': np.zeros(3, dtype=int),  # évaluations, jacobiens, pas
+        }
+    
+    debut = time.perf_counter()
+    segment = int(point['segment'])
+    while segment < len(bornes) - 1:
+        a, b = bornes[segment], bornes[segment + 1]
+        premier_pas = float(point['premier_pas'])
+        sol = solve_ivp(fonction, (a, b), point['z'], method=methode, jac=jac,
+                        args=args, rtol=rtol, atol=atol, dense_output=True,
+                        first_step=None if np.isnan(premier_pas) else min(premier_pas, b - a))
+        if not sol.success:
+            raise RuntimeError(f"Échec de l'intégration ({methode}) sur le segment "
+                               f"[{a:.0f}, {b:.0f}] s: {sol.message}")
+        
+        # Sorties du segment (le dernier segment inclut tf)
+        dans_segment = (t_eval >= a) & ((t_eval < b) | (b == tf))
+        if np.any(dans_segment):
+            point['solution'][dans_segment] = sol.sol(t_eval[dans_segment]).T
+        
+        segment += 1
+        point['segment'] = np.array(segment)
+        point['z'] = sol.y[:, -1]
+        point['premier_pas'] = np.array(sol.t[-1] - sol.t[-2])
+        point['compteurs'] = point['compteurs'] + [sol.nfev, sol.njev, len(sol.t) - 1]
+        sauvegarder_point(fichier, **point)
+        
+        if temps_calcul_max is not None and time.perf_counter() - debut > temps_calcul_max:
+            break
+    
+    n_evaluations, n_jacobiens, n_pas = (int(n) for n in point['compteurs'])
+    return {
+        'termine': segment == len(bornes) - 1,
+        'solution': point['solution'],
+        't': bornes[segment],
+        'n_evaluations': n_evaluations,
+        'n_jacobiens': n_jacobiens,
+        'n_pas': n_pas,
+        'n_segments': len(bornes) - 1,
+    }
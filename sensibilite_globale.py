@@ -0,0 +1,266 @@
+"""
+Module Sensibilité Globale
+Effets élémentaires de Morris et indices de Sobol des indicateurs de l'usine
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+import matplotlib.pyplot as plt
+from optimisation import evaluer_usine
+from cache import CacheEvaluations
+from rendu import sauvegarder_figure
+
+
+# Facteurs par défaut: (borne inférieure, borne supérieure)
+FACTEURS = {
+    'P_vapeur': (2.5, 4.5),  # bar
+    'x_final': (0.55, 0.70),  # fraction massique
+    'F': (16000, 24000),  # kg/h
+    'R_f': (0.0001, 0.0004),  # m²·K/W
+    'prix_vapeur': (15, 35),  # €/tonne
+    'prix_electricite': (0.08, 0.16),  # €/kWh
+    'prix_vente': (600, 1000),  # €/tonne
+}
+
+# Indicateurs de l'usine analysés
+INDICATEURS = ('economie', 'surface_totale', 'cout_unitaire', 'VAN')
+
+
+class AnalyseSensibiliteGlobale:
+    """
+    Analyse de sensibilité globale (Morris, Sobol) des indicateurs de l'usine.
+    
+    Les facteurs varient ensemble dans leurs plages, ce qui révèle les
+    interactions ignorées par les balayages un facteur à la fois. Tous les
+    points d'une méthode sont générés d'abord puis évalués par lots; les
+    évaluations sont conservées dans un cache persistant.
+    """
+    
+    def __init__(self, facteurs=None, n_effets=3, fichier_cache=None, taille_lot=100,
+                 n_workers=None, backend='processus'):
+        """
+        Initialisation.
+        
+        Args:
+            facteurs (dict): Nom -> (bas, haut) (None: FACTEURS)
+            n_effets (int): Nombre d'effets de l'évaporateur
+            fichier_cache (str): Cache .jsonl des évaluations (None: en mémoire)
+            taille_lot (int): Points évalués entre deux écritures du cache
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+        """
+        self.facteurs = dict(facteurs or FACTEURS)
+        self.n_effets = n_effets
+        self.cache = CacheEvaluations(fichier_cache, contexte='evaluer_usine')
+        self.taille_lot = taille_lot
+        self.n_workers = n_workers
+        self.backend = backend
+        self.resultats = {}
+    
+    def evaluer(self, u):
+        """
+        Évalue les indicateurs en des points de l'hypercube unité.
+        
+        Args:
+            u (array): Points (n, nombre de facteurs) dans [0, 1]
+            
+        Returns:
+            np.array: Indicateurs (n, len(INDICATEURS))
+        """
+        bas, haut = np.array(list(self.facteurs.values()), dtype=float).T
+        X = bas + u * (haut - bas)
+        points = [dict(zip(self.facteurs, map(float, x)), n_effets=self.n_effets)
+                  for x in X]
+        resultats = self.cache.evaluer(evaluer_usine, points, taille_lot=self.taille_lot,
+                                       n_workers=self.n_workers, backend=self.backend)
+        return np.array([[r[cle] for cle in INDICATEURS] for r in resultats])
+    
+    def morris(self, n_trajectoires=20, n_niveaux=4, graine=0):
+        """
+        Effets élémentaires de Morris (criblage).
+        
+        Chaque trajectoire part d'un point de la grille à n_niveaux niveaux
+        et déplace un facteur à la fois d'un pas Δ = p / (2 (p - 1)), dans un
+        ordre aléatoire: (d + 1) évaluations par trajectoire. Les effets sont
+        exprimés pour une variation du facteur sur toute sa plage.
+        
+        Args:
+            n_trajectoires (int): Nombre de trajectoires
+            n_niveaux (int): Nombre de niveaux p de la grille (pair)
+            graine (int): Graine du générateur
+            
+        Returns:
+            dict: Indicateur -> DataFrame (mu, mu_etoile, sigma) par facteur
+        """
+        d = len(self.facteurs)
+        print(f"\nMéthode de Morris ({n_trajectoires} trajectoires, "
+              f"{n_trajectoires * (d + 1)} évaluations)...")
+        
+        generateur = np.random.default_rng(graine)
+        delta = n_niveaux / (2 * (n_niveaux - 1))
+        niveaux = np.arange(n_niveaux) / (n_niveaux - 1)
+        
+        trajectoires = np.empty((n_trajectoires, d + 1, d))
+        ordres = np.empty((n_trajectoires, d), dtype=int)
+        for r in range(n_trajectoires):
+            x = generateur.choice(niveaux, size=d)
+            ordres[r] = generateur.permutation(d)
+            trajectoires[r, 0] = x
+            for k, i in enumerate(ordres[r]):
+                x = x.copy()
+                x[i] += delta if x[i] + delta <= 1 + 1e-12 else -delta
+                trajectoires[r, k + 1] = x
+        
+        debut = time.perf_counter()
+        y = self.evaluer(trajectoires.reshape(-1, d)).reshape(n_trajectoires, d + 1, -1)
+        temps_calcul = time.perf_counter() - debut
+        
+        # Effet élémentaire de chaque pas: variation de y / pas signé
+        effets = np.empty((n_trajectoires, d, len(INDICATEURS)))
+        for r in range(n_trajectoires):
+            pas = np.diff(trajectoires[r], axis=0).sum(axis=1)
+            effets[r, ordres[r]] = np.diff(y[r], axis=0) / pas[:, None]
+        
+        self.resultats['morris'] = {
+            indicateur: pd.DataFrame({
+                'mu': effets[:, :, k].mean(axis=0),
+                'mu_etoile': np.abs(effets[:, :, k]).mean(axis=0),
+                'sigma': effets[:, :, k].std(axis=0, ddof=1),
+            }, index=list(self.facteurs))
+            for k, indicateur in enumerate(INDICATEURS)
+        }
+        print(f"  Temps de calcul: {temps_calcul:.1f} s")
+        return self.resultats['morris']
+    
+    def sobol(self, n_base=256, n_bootstrap=200, graine=0):
+        """
+        Indices de Sobol du premier ordre et totaux (échantillonnage de Saltelli).
+        
+        Deux matrices A et B de n_base points (suite de Sobol brouillée) et
+        les d matrices A_B^i (colonne i de B) donnent n_base (d + 2)
+        évaluations. Estimateurs de Saltelli (2010) pour S_i et de Jansen
+        pour S_Ti; intervalles de confiance à 95 % par bootstrap.
+        
+        Args:
+            n_base (int): Points de base (arrondi à la puissance de 2 supérieure)
+            n_bootstrap (int): Rééchantillonnages pour les intervalles de confiance
+            graine (int): Graine du générateur
+            
+        Returns:
+            dict: Indicateur -> DataFrame (S1, S1_ic, ST, ST_ic) par facteur
+        """
+        d = len(self.facteurs)
+        m = int(np.ceil(np.log2(n_base)))
+        n = 2**m
+        print(f"\nIndices de Sobol ({n} points de base, {n * (d + 2)} évaluations)...")
+        
+        u = qmc.Sobol(d=2 * d, scramble=True, seed=graine).random_base2(m)
+        A, B = u[:, :d], u[:, d:]
+        AB = np.repeat(A[np.newaxis], d, axis=0)
+        for i in range(d):
+            AB[i, :, i] = B[:, i]
+        
+        debut = time.perf_counter()
+        y = self.evaluer(np.concatenate([A, B, AB.reshape(-1, d)]))
+        temps_calcul = time.perf_counter() - debut
+        # Sorties centrées: même espérance des estimateurs, variance bien plus
+        # faible quand la moyenne domine l'écart-type (économie de vapeur)
+        y = y - y[:2 * n].mean(axis=0)
+        y_A, y_B, y_AB = y[:n], y[n:2 * n], y[2 * n:].reshape(d, n, -1)
+        
+        def indices(lignes):
+            a, b, ab = y_A[lignes], y_B[lignes], y_AB[:, lignes]
+            variance = np.concatenate([a, b]).var(axis=0)
+            S1 = np.mean(b * (ab - a), axis=1) / variance
+            ST = 0.5 * np.mean((a - ab)**2, axis=1) / variance
+            return S1, ST
+        
+        S1, ST = indices(np.arange(n))
+        generateur = np.random.default_rng(graine)
+        tirages = [indices(generateur.integers(0, n, n)) for _ in range(n_bootstrap)]
+        S1_ic = 1.96 * np.std([t[0] for t in tirages], axis=0)
+        ST_ic = 1.96 * np.std([t[1] for t in tirages], axis=0)
+        
+        self.resultats['sobol'] = {
+            indicateur: pd.DataFrame({
+                'S1': S1[:, k], 'S1_ic': S1_ic[:, k],
+                'ST': ST[:, k], 'ST_ic': ST_ic[:, k],
+            }, index=list(self.facteurs))
+            for k, indicateur in enumerate(INDICATEURS)
+        }
+        print(f"  Temps de calcul: {temps_calcul:.1f} s")
+        return self.resultats['sobol']
+    
+    def afficher_resultats(self):
+        """
+        Affiche les résultats des méthodes exécutées.
+        """
+        titres = {'morris': 'EFFETS ÉLÉMENTAIRES DE MORRIS',
+                  'sobol': 'INDICES DE SOBOL'}
+        for methode, resultats in self.resultats.items():
+            print("\n" + "="*70)
+            print(titres[methode])
+            print("="*70)
+            for indicateur, df in resultats.items():
+                print(f"\n{indicateur}:")
+                print(df.to_string(float_format=lambda v: f"{v:.4g}"))
+        print(f"\nÉvaluations du modèle: {self.cache.n_appels} "
+              f"(cache: {len(self.cache)} points)")
+    
+    def tracer_resultats(self, titre_supplement=''):
+        """
+        Trace les indices de Sobol et le plan (mu*, sigma) de Morris.
+        
+        Args:
+            titre_supplement (str): Texte additionnel pour le titre
+        """
+        methodes = list(self.resultats)
+        fig, axes = plt.subplots(len(methodes), len(INDICATEURS),
+                                 figsize=(5 * len(INDICATEURS), 4.5 * len(methodes)),
+                                 squeeze=False)
+        noms = list(self.facteurs)
+        positions = np.arange(len(noms))
+        
+        for ligne, methode in enumerate(methodes):
+            for k, indicateur in enumerate(INDICATEURS):
+                ax = axes[ligne, k]
+                df = self.resultats[methode][indicateur]
+                if methode == 'sobol':
+                    ax.bar(positions - 0.2, df['S1'], 0.4, yerr=df['S1_ic'],
+                           color='steelblue', edgecolor='black', label='S1')
+                    ax.bar(positions + 0.2, df['ST'], 0.4, yerr=df['ST_ic'],
+                           color='orange', edgecolor='black', label='ST')
+                    ax.set_xticks(positions)
+                    ax.set_xticklabels(noms, rotation=45, ha='right')
+                    ax.set_ylabel('Indice de Sobol', fontsize=11)
+                    ax.legend()
+                else:
+                    ax.scatter(df['mu_etoile'], df['sigma'], s=60, color='red')
+                    for nom in noms:
+                        ax.annotate(nom, (df.loc[nom, 'mu_etoile'], df.loc[nom, 'sigma']),
+                                    fontsize=9, xytext=(3, 3), textcoords='offset points')
+                    ax.set_xlabel('μ*', fontsize=11)
+                    ax.set_ylabel('σ', fontsize=11)
+                ax.set_title(f'{indicateur} ({methode})', fontsize=13, fontweight='bold')
+                ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Sensibilité globale {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'sensibilite_globale_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module sensibilité globale ===")
+    
+    # Cache persistant: relancer le script ne répète pas les évaluations
+    analyse = AnalyseSensibiliteGlobale(fichier_cache='sensibilite_globale.jsonl')
+    analyse.morris(n_trajectoires=20)
+    analyse.sobol(n_base=128)
+    analyse.afficher_resultats()
+    analyse.tracer_resultats(titre_supplement='Usine 3 effets')
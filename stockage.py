@@ -0,0 +1,157 @@
+"""
+Module Stockage
+Stockage sur disque (SQLite) des résultats de balayages, indexé par empreinte des paramètres
+Auteur: Projet PIC 2024-2025
+"""
+
+import sqlite3
+import numpy as np
+import pandas as pd
+from reprise import signature
+
+
+def _valeur_sql(valeur):
+    """Valeur Python native (les scalaires NumPy ne sont pas acceptés par sqlite3)."""
+    if isinstance(valeur, np.generic):
+        valeur = valeur.item()
+    if isinstance(valeur, float) and np.isnan(valeur):
+        return None
+    return valeur
+
+
+class StockageResultats:
+    """
+    Table de résultats sur disque, une ligne par point, une colonne par
+    paramètre ou indicateur.
+    
+    Chaque point est identifié par l'empreinte de ses paramètres (clé
+    primaire): les points déjà stockés sont reconnus sans relire la table,
+    et les lectures se font par requêtes SQL (colonnes, conditions, blocs)
+    sans charger toute la table en mémoire. Les colonnes sont ajoutées au
+    fil des écritures.
+    """
+    
+    def __init__(self, fichier, table='resultats'):
+        """
+        Ouverture (ou création) de la base.
+        
+        Args:
+            fichier (str): Fichier SQLite
+            table (str): Nom de la table
+        """
+        self.fichier = fichier
+        self.table = table
+        self.connexion = sqlite3.connect(fichier)
+        self.connexion.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (cle TEXT PRIMARY KEY)')
+        self.connexion.commit()
+        self.colonnes = [ligne[1] for ligne in
+                         self.connexion.execute(f'PRAGMA table_info("{table}")')]
+    
+    @staticmethod
+    def cle(contexte, point):
+        """
+        Clé d'un point (empreinte du contexte et des paramètres).
+        
+        Args:
+            contexte (str or tuple): Réglages fixes de l'étude (chaînes, scalaires,
+                tableaux ou séquences de ceux-ci)
+            point (dict): Paramètres du point
+            
+        Returns:
+            str: Clé hexadécimale
+        """
+        return signature(contexte, *sorted((nom, float(valeur))
+                                           for nom, valeur in point.items()))
+    
+    def __len__(self):
+        return self.connexion.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+    
+    def cles_presentes(self, cles, taille_bloc=500, condition=None):
+        """
+        Clés déjà stockées parmi une liste de clés.
+        
+        Args:
+            cles (list): Clés recherchées
+            taille_bloc (int): Clés par requête
+            condition (str): Condition supplémentaire sur les lignes retenues
+                (ex. 'erreur IS NULL')
+            
+        Returns:
+            set: Clés présentes dans la table
+        """
+        cles = list(cles)
+        presentes = set()
+        for debut in range(0, len(cles), taille_bloc):
+            bloc = cles[debut:debut + taille_bloc]
+            requete = (f'SELECT cle FROM "{self.table}" WHERE cle IN '
+                       f'({", ".join("?" * len(bloc))})')
+            if condition is not None:
+                requete += f' AND ({condition})'
+            presentes.update(ligne[0] for ligne in self.connexion.execute(requete, bloc))
+        return presentes
+    
+    def ajouter(self, df):
+        """
+        Écrit des points (remplace les points de même clé) et valide la transaction.
+        
+        Args:
+            df (pd.DataFrame): Points, avec une colonne 'cle'
+        """
+        for nom in df.columns:
+            if nom not in self.colonnes:
+                type_sql = 'REAL' if pd.api.types.is_numeric_dtype(df[nom]) else 'TEXT'
+                self.connexion.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{nom}" {type_sql}')
+                self.colonnes.append(nom)
+        
+        colonnes = ', '.join(f'"{nom}"' for nom in df.columns)
+        requete = (f'INSERT OR REPLACE INTO "{self.table}" ({colonnes}) '
+                   f'VALUES ({", ".join("?" * len(df.columns))})')
+        lignes = [[_valeur_sql(valeur) for valeur in ligne]
+                  for ligne in df.itertuples(index=False, name=None)]
+        with self.connexion:
+            self.connexion.executemany(requete, lignes)
+    
+    def lire(self, colonnes=None, condition=None, parametres=(), taille_bloc=None):
+        """
+        Lit des points par requête SQL.
+        
+        Args:
+            colonnes (list): Colonnes lues (None: toutes)
+            condition (str): Clause WHERE (ex. 'economie > ? AND erreur IS NULL')
+            parametres (tuple): Valeurs des '?' de la condition
+            taille_bloc (int): Lecture par blocs de ce nombre de lignes
+            
+        Returns:
+            pd.DataFrame, ou itérateur de DataFrame si taille_bloc est donné
+        """
+        selection = '*' if colonnes is None else ', '.join(f'"{nom}"' for nom in colonnes)
+        requete = f'SELECT {selection} FROM "{self.table}"'
+        if condition is not None:
+            requete += f' WHERE {condition}'
+        return pd.read_sql_query(requete, self.connexion, params=parametres,
+                                 chunksize=taille_bloc)
+    
+    def lire_cles(self, cles, taille_bloc=500):
+        """
+        Lit les points d'une liste de clés.
+        
+        Args:
+            cles (list): Clés des points
+            taille_bloc (int): Clés par requête
+            
+        Returns:
+            pd.DataFrame: Points trouvés (index: clé)
+        """
+        cles = list(cles)
+        blocs = []
+        for debut in range(0, len(cles), taille_bloc):
+            bloc = cles[debut:debut + taille_bloc]
+            blocs.append(self.lire(condition=f'cle IN ({", ".join("?" * len(bloc))})',
+                                   parametres=bloc))
+        if not blocs:
+            return pd.DataFrame(columns=self.colonnes).set_index('cle')
+        return pd.concat(blocs).set_index('cle')
+    
+    def fermer(self):
+        """Ferme la connexion à la base."""
+        self.connexion.close()
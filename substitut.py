@@ -0,0 +1,343 @@
+"""
+Module Substitut
+Modèle de substitution (fonctions de base radiales) des indicateurs de l'usine
+Auteur: Projet PIC 2024-2025
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+from scipy.spatial.distance import cdist
+import matplotlib.pyplot as plt
+from sensibilite_globale import FACTEURS, INDICATEURS
+from optimisation import evaluer_usine
+from cache import CacheEvaluations
+from rendu import sauvegarder_figure
+
+
+class ModeleSubstitution:
+    """
+    Substitut des indicateurs de l'usine (évaporateur et analyse économique).
+    
+    Interpolation par fonctions de base radiales cubiques φ(r) = r³ avec
+    terme linéaire, dans l'hypercube unité des facteurs et sur des sorties
+    centrées réduites, entraîné sur les points faisables du modèle complet.
+    Les erreurs de validation croisée (un point retiré) sont exactes et sans
+    réajustement (formule de Rippa). Hors de la région de confiance (hors
+    des plages, ou là où l'erreur de validation des points d'entraînement
+    voisins dépasse la tolérance), le modèle complet est évalué à la place
+    du substitut.
+    """
+    
+    def __init__(self, facteurs=None, n_effets=3, lissage=None, tolerance=0.1, n_voisins=8,
+                 fichier_cache=None, n_workers=None, backend='processus'):
+        """
+        Initialisation.
+        
+        Args:
+            facteurs (dict): Nom -> (bas, haut) (None: FACTEURS de sensibilite_globale)
+            n_effets (int): Nombre d'effets de l'évaporateur
+            lissage (float): Régularisation de l'interpolation, relative à la
+                moyenne de φ entre points d'entraînement (None: valeur
+                minimisant l'erreur de validation croisée)
+            tolerance (float): Erreur de validation maximale dans la région de
+                confiance (fraction de l'écart-type de chaque indicateur)
+            n_voisins (int): Points d'entraînement voisins sur lesquels l'erreur
+                de validation locale est estimée
+            fichier_cache (str): Cache .jsonl des évaluations du modèle complet
+            n_workers (int): Nombre de workers (None: nombre de cœurs)
+            backend (str): 'serie', 'threads' ou 'processus'
+        """
+        self.facteurs = dict(facteurs or FACTEURS)
+        self.n_effets = n_effets
+        self.lissage = lissage
+        self.tolerance = tolerance
+        self.n_voisins = n_voisins
+        self.cache = CacheEvaluations(fichier_cache, contexte='evaluer_usine')
+        self.n_workers = n_workers
+        self.backend = backend
+        
+        self.bas, self.haut = np.array(list(self.facteurs.values()), dtype=float).T
+        self.u = np.empty((0, len(self.facteurs)))  # Points d'entraînement (unité)
+        self.y = np.empty((0, len(INDICATEURS)))  # Sorties du modèle complet
+        self.n_infaisables = 0  # Points évalués exclus de l'entraînement
+    
+    def modele_complet(self, X):
+        """
+        Évalue le modèle complet (evaluer_usine) avec cache.
+        
+        Args:
+            X (array): Facteurs (n, d) en unités physiques
+            
+        Returns:
+            tuple: (indicateurs (n, len(INDICATEURS)), masque (n,) des points
+                faisables)
+        """
+        points = [dict(zip(self.facteurs, map(float, x)), n_effets=self.n_effets)
+                  for x in np.atleast_2d(X)]
+        resultats = self.cache.evaluer(evaluer_usine, points, n_workers=self.n_workers,
+                                       backend=self.backend, verbose=False)
+        return (np.array([[r[cle] for cle in INDICATEURS] for r in resultats]),
+                np.array([bool(r['faisable']) for r in resultats]))
+    
+    def entrainer(self, n_points=256, graine=0):
+        """
+        Entraîne le substitut sur une suite de Sobol brouillée.
+        
+        Args:
+            n_points (int): Nombre d'évaluations du modèle complet
+            graine (int): Graine du générateur
+            
+        Returns:
+            pd.DataFrame: Erreurs de validation croisée (voir erreurs_validation)
+        """
+        print(f"\nEntraînement du substitut ({n_points} évaluations du modèle complet)...")
+        u = qmc.Sobol(d=len(self.facteurs), scramble=True, seed=graine).random(n_points)
+        self.ajouter_points(u)
+        return self.erreurs_validation()
+    
+    def ajouter_points(self, u):
+        """
+        Évalue le modèle complet en de nouveaux points et réajuste le substitut.
+        
+        Les points non faisables (bilans non convergés) ne sont pas retenus
+        pour l'entraînement.
+        
+        Args:
+            u (array): Points (n, d) de l'hypercube unité
+        """
+        debut = time.perf_counter()
+        y, faisable = self.modele_complet(self.bas + u * (self.haut - self.bas))
+        self.temps_modele = (time.perf_counter() - debut) / len(u)
+        if not np.all(faisable):
+            print(f"  {np.sum(~faisable)} points non faisables exclus de l'entraînement")
+        self.n_infaisables += int(np.sum(~faisable))
+        self.u = np.vstack([self.u, u[faisable]])
+        self.y = np.vstack([self.y, y[faisable]])
+        self._ajuster()
+    
+    def _ajuster(self):
+        """
+        Résout le système d'interpolation et calcule les erreurs de validation croisée.
+        """
+        n, d = self.u.shape
+        self.moyenne = self.y.mean(axis=0)
+        self.ecart_type = self.y.std(axis=0)
+        self.ecart_type[self.ecart_type == 0] = 1
+        y = (self.y - self.moyenne) / self.ecart_type
+        
+        # Système augmenté [[Φ + λI, P], [Pᵀ, 0]] [c; a] = [y; 0]
+        P = np.hstack([np.ones((n, 1)), self.u])
+        M = np.zeros((n + d + 1, n + d + 1))
+        M[:n, :n] = cdist(self.u, self.u)**3
+        M[:n, n:] = P
+        M[n:, :n] = P.T
+        second_membre = np.vstack([y, np.zeros((d + 1, y.shape[1]))])
+        echelle = M[:n, :n].sum() / (n * (n - 1))  # λ relatif à la moyenne de φ
+        
+        def validation(lissage):
+            M_inv = np.linalg.inv(M + np.diag(np.r_[np.full(n, lissage * echelle),
+                                                    np.zeros(d + 1)]))
+            coefficients = M_inv @ second_membre
+            # Validation croisée exacte (Rippa): e_i = c_i / (M⁻¹)_ii
+            residus = coefficients[:n] / np.diag(M_inv)[:n, np.newaxis]
+            return np.mean(residus**2), coefficients, residus
+        
+        if self.lissage is not None:
+            essais = {self.lissage: validation(self.lissage)}
+        else:
+            essais = {lissage: validation(lissage) for lissage in np.logspace(-8, 2, 11)}
+            # Grille prolongée tant que le minimum est sur un bord (au-delà de
+            # 1e8, le substitut se réduit au terme linéaire)
+            while True:
+                meilleur = min(essais, key=lambda lissage: essais[lissage][0])
+                if meilleur == max(essais) and meilleur < 1e8:
+                    essais[meilleur * 10] = validation(meilleur * 10)
+                elif meilleur == min(essais) and meilleur > 1e-12:
+                    essais[meilleur / 10] = validation(meilleur / 10)
+                else:
+                    break
+        
+        self.lissage_retenu = min(essais, key=lambda lissage: essais[lissage][0])
+        _, coefficients, residus = essais[self.lissage_retenu]
+        self.poids, self.polynome = coefficients[:n], coefficients[n:]
+        self.residus_validation = residus * self.ecart_type
+        self.erreurs_reduites = np.abs(residus)
+        
+        erreurs = self.erreurs_validation()['rmse_relatif']
+        hors_tolerance = erreurs[erreurs > self.tolerance]
+        if len(hors_tolerance):
+            detail = ', '.join(f"{nom} {valeur:.0%}" for nom, valeur in hors_tolerance.items())
+            print(f"Attention: erreur de validation du substitut supérieure à la tolérance "
+                  f"({self.tolerance:.0%} de l'écart-type): {detail}. Substitut peu fiable, "
+                  f"repli fréquent sur le modèle complet")
+    
+    def erreurs_validation(self):
+        """
+        Erreurs de validation croisée (un point retiré) par indicateur.
+        
+        Returns:
+            pd.DataFrame: 'rmse', 'rmse_relatif' (rapporté à l'écart-type de
+                l'indicateur) et 'erreur_max', par indicateur
+        """
+        e = self.residus_validation
+        return pd.DataFrame({
+            'rmse': np.sqrt(np.mean(e**2, axis=0)),
+            'rmse_relatif': np.sqrt(np.mean(e**2, axis=0)) / self.ecart_type,
+            'erreur_max': np.abs(e).max(axis=0),
+        }, index=list(INDICATEURS))
+    
+    def predire_substitut(self, u):
+        """
+        Prédiction du substitut seul (sans contrôle de la région de confiance).
+        
+        L'erreur locale est l'erreur de validation croisée quadratique moyenne
+        (réduite) des n_voisins points d'entraînement les plus proches, pour
+        l'indicateur le moins bien prédit.
+        
+        Args:
+            u (array): Points (n, d) de l'hypercube unité
+            
+        Returns:
+            tuple: (indicateurs (n, len(INDICATEURS)), erreur locale (n,))
+        """
+        r = cdist(u, self.u)
+        y = r**3 @ self.poids + self.polynome[0] + u @ self.polynome[1:]
+        k = min(self.n_voisins, len(self.u))
+        voisins = np.argpartition(r, k - 1, axis=1)[:, :k]
+        erreur_locale = np.sqrt(np.mean(self.erreurs_reduites[voisins]**2, axis=1)).max(axis=1)
+        return y * self.ecart_type + self.moyenne, erreur_locale
+    
+    def predire(self, X, repli=True):
+        """
+        Prédit les indicateurs, avec repli sur le modèle complet hors de la
+        région de confiance.
+        
+        Args:
+            X (array): Facteurs (n, d) ou (d,) en unités physiques, dans
+                l'ordre de self.facteurs
+            repli (bool): Évaluer le modèle complet hors de la région de
+                confiance (sinon: prédiction du substitut partout)
+                
+        Returns:
+            tuple: (indicateurs (n, len(INDICATEURS)), masque (n,) des points
+                prédits par le substitut)
+        """
+        u = (np.atleast_2d(X) - self.bas) / (self.haut - self.bas)
+        y, erreur_locale = self.predire_substitut(u)
+        confiance = np.all((u >= 0) & (u <= 1), axis=1) & (erreur_locale <= self.tolerance)
+        if repli and not np.all(confiance):
+            y[~confiance] = self.modele_complet(np.atleast_2d(X)[~confiance])[0]
+        return y, confiance
+    
+    def raffiner(self, n_points=32, n_candidats=4096, graine=1):
+        """
+        Échantillonnage adaptatif: ajoute des points là où l'erreur est élevée.
+        
+        L'erreur d'un candidat est estimée par l'erreur de validation croisée
+        (réduite, toutes sorties) de son plus proche point d'entraînement,
+        pondérée par la distance à ce point. Les candidats sont choisis un à
+        un, la distance étant mise à jour après chaque choix, puis évalués
+        ensemble par le modèle complet.
+        
+        Args:
+            n_points (int): Nombre de points ajoutés
+            n_candidats (int): Candidats tirés dans l'hypercube (Sobol)
+            graine (int): Graine du générateur
+            
+        Returns:
+            pd.DataFrame: Erreurs de validation croisée après raffinement
+        """
+        print(f"\nRaffinement adaptatif ({n_points} points)...")
+        candidats = qmc.Sobol(d=len(self.facteurs), scramble=True,
+                              seed=graine).random(n_candidats)
+        erreur_points = np.linalg.norm(self.residus_validation / self.ecart_type, axis=1)
+        
+        distances = cdist(candidats, self.u)
+        voisin = distances.argmin(axis=1)
+        distance = distances[np.arange(n_candidats), voisin]
+        erreur = erreur_points[voisin]
+        
+        choisis = []
+        for _ in range(n_points):
+            k = int(np.argmax(erreur * distance))
+            choisis.append(k)
+            distance = np.minimum(distance, np.linalg.norm(candidats - candidats[k], axis=1))
+            erreur = np.where(distance == 0, 0, erreur)
+        
+        self.ajouter_points(candidats[choisis])
+        return self.erreurs_validation()
+    
+    def afficher_resultats(self):
+        """
+        Affiche les erreurs de validation et les temps d'évaluation.
+        """
+        print("\n" + "="*70)
+        print(f"MODÈLE DE SUBSTITUTION ({len(self.u)} points d'entraînement, "
+              f"{self.n_infaisables} non faisables exclus)")
+        print("="*70)
+        print("\nValidation croisée (un point retiré):")
+        print(self.erreurs_validation().to_string(float_format=lambda v: f"{v:.4g}"))
+        
+        u = qmc.Sobol(d=len(self.facteurs), scramble=True, seed=99).random(4096)
+        debut = time.perf_counter()
+        _, erreur_locale = self.predire_substitut(u)
+        temps_lot = (time.perf_counter() - debut) / len(u)
+        debut = time.perf_counter()
+        for point in u[:200]:
+            self.predire_substitut(point[np.newaxis])
+        temps_point = (time.perf_counter() - debut) / 200
+        
+        print(f"\nTemps par évaluation:")
+        print(f"  Modèle complet: {self.temps_modele*1e3:.2f} ms")
+        print(f"  Substitut (point isolé): {temps_point*1e6:.1f} µs")
+        print(f"  Substitut (lot de {len(u)} points): {temps_lot*1e6:.2f} µs")
+        print(f"Lissage (relatif): {self.lissage_retenu:.1e}")
+        print(f"Région de confiance (erreur locale ≤ {self.tolerance:.0%}): "
+              f"{np.mean(erreur_locale <= self.tolerance):.1%} du domaine")
+        print("="*70)
+    
+    def tracer_validation(self, titre_supplement=''):
+        """
+        Trace les prédictions de validation croisée contre le modèle complet.
+        
+        Args:
+            titre_supplement (str): Texte additionnel pour le titre
+        """
+        fig, axes = plt.subplots(1, len(INDICATEURS), figsize=(5 * len(INDICATEURS), 4.5))
+        prediction = self.y - self.residus_validation
+        for k, (ax, indicateur) in enumerate(zip(axes, INDICATEURS)):
+            ax.scatter(self.y[:, k], prediction[:, k], s=10, alpha=0.6)
+            bornes = [self.y[:, k].min(), self.y[:, k].max()]
+            ax.plot(bornes, bornes, 'r--', linewidth=1.5)
+            ax.set_xlabel(f'{indicateur} (modèle complet)', fontsize=11)
+            ax.set_ylabel(f'{indicateur} (substitut, validation)', fontsize=11)
+            ax.set_title(indicateur, fontsize=13, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+        
+        plt.suptitle(f'Validation croisée du substitut {titre_supplement}', fontsize=15,
+                     fontweight='bold')
+        plt.tight_layout()
+        
+        nom_fichier = f'substitut_{titre_supplement.replace(" ", "_")}.png'
+        sauvegarder_figure(fig, nom_fichier)
+
+
+if __name__ == "__main__":
+    print("=== Test du module substitut ===")
+    
+    substitut = ModeleSubstitution(fichier_cache='substitut.jsonl')
+    print(substitut.entrainer(n_points=256).to_string())
+    print(substitut.raffiner(n_points=64).to_string())
+    substitut.afficher_resultats()
+    substitut.tracer_validation(titre_supplement='Usine 3 effets')
+    
+    # Point hors des plages: évalué par le modèle complet
+    X = np.array([[3.5, 0.65, 20000, 0.0002, 25, 0.12, 800],
+                  [5.0, 0.65, 20000, 0.0002, 25, 0.12, 800]])
+    y, confiance = substitut.predire(X)
+    for x, valeurs, dans in zip(X, y, confiance):
+        print(f"\nP_vapeur = {x[0]} bar ({'substitut' if dans else 'modèle complet'}):")
+        for indicateur, valeur in zip(INDICATEURS, valeurs):
+            print(f"  {indicateur}: {valeur:.4g}")
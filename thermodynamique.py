@@ -183,6 +183,42 @@ class ProprietesThermodynamiques:
                   9.73e-6 * T_C**3)
         return C_star
     
+    def derivee_solubilite(self, T_C):
+        """
+        Calcule la dérivée de la solubilité par rapport à la température.
+        
+        Args:
+            T_C (float): Température en °C
+            
+        Returns:
+            float: dC*/dT en g/100g/°C
+        """
+        dC_star = (0.1337 + 
+                   2 * 5.52e-3 * T_C - 
+                   3 * 9.73e-6 * T_C**2)
+        return dC_star
+    
+    def temperature_solubilite(self, C_star, T_init=50.0, tol=1e-10):
+        """
+        Inverse la corrélation de solubilité (méthode de Newton).
+        
+        Args:
+            C_star (float ou array): Solubilité visée en g/100g solution
+            T_init (float): Estimation initiale en °C
+            tol (float): Tolérance sur la température en °C
+            
+        Returns:
+            float ou array: Température de saturation en °C
+        """
+        T_C = np.full_like(np.asarray(C_star, dtype=float), T_init)
+        for _ in range(50):
+            correction = ((self.solubilite_saccharose(T_C) - C_star) / 
+                          self.derivee_solubilite(T_C))
+            T_C = T_C - correction
+            if np.all(np.abs(correction) < tol):
+                break
+        return T_C if T_C.ndim else float(T_C)
+    
     def sursaturation_relative(self, C, T_C):
         """
         Calcule la sursaturation relative.
@@ -225,6 +261,9 @@ def test_thermodynamique():
     print("\nTest 4: Solubilité du saccharose")
     C_star = thermo.solubilite_saccharose(60)
     print(f"C*(60°C) = {C_star:.2f} g/100g")
+    T_inv = thermo.temperature_solubilite(C_star)
+    print(f"T(C* = {C_star:.2f}) = {T_inv:.2f} °C (attendu: 60 °C)")
+    assert abs(T_inv - 60) < 1e-6, "Erreur inversion solubilité"
     
     # Test 5: Capacité calorifique
     print("\nTest 5: Capacité calorifique")